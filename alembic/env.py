@@ -8,6 +8,7 @@ from seedx_support_backend.infrastructure.database import Base
 from seedx_support_backend.users.models import User
 from seedx_support_backend.tickets.models import Ticket
 from seedx_support_backend.messages.models import Message
+from seedx_support_backend.ai.models import TicketSummary
 
 
 target_metadata = Base.metadata
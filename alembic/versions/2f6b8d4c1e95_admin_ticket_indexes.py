@@ -0,0 +1,36 @@
+"""admin ticket indexes
+
+Revision ID: 2f6b8d4c1e95
+Revises: 7a4f0b3e9d21
+Create Date: 2026-10-18 13:48:09.224871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6b8d4c1e95'
+down_revision: Union[str, None] = '7a4f0b3e9d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # keyset order of GET /admin/tickets, unfiltered and filtered by status;
+    # the user filter is served by ix_tickets_user_id_created_at
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tickets_created_at', 'tickets', ['created_at', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_tickets_status_created_at', 'tickets', ['status', 'created_at', 'id'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tickets_status_created_at', table_name='tickets', postgresql_concurrently=True)
+        op.drop_index('ix_tickets_created_at', table_name='tickets', postgresql_concurrently=True)
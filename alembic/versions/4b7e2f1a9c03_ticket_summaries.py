@@ -0,0 +1,37 @@
+"""ticket summaries
+
+Revision ID: 4b7e2f1a9c03
+Revises: e3d9c6478de1
+Create Date: 2026-10-18 09:12:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2f1a9c03'
+down_revision: Union[str, None] = 'e3d9c6478de1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ticket_summaries',
+    sa.Column('ticket_id', sa.UUID(), nullable=False),
+    sa.Column('summary', sa.String(), nullable=False),
+    sa.Column('summarized_until', sa.DateTime(), nullable=True),
+    sa.Column('last_message_id', sa.UUID(), nullable=True),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ticket_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ticket_summaries')
@@ -0,0 +1,77 @@
+"""ticket inbox aggregates
+
+Revision ID: 7a4f0b3e9d21
+Revises: c52a8e0f6d17
+Create Date: 2026-10-18 13:02:41.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4f0b3e9d21'
+down_revision: Union[str, None] = 'c52a8e0f6d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+
+
+def backfill() -> None:
+    """
+    Fill the aggregates of existing tickets, walking tickets.id in batches
+    so each short transaction only locks the rows of its own batch.
+    Must run inside autocommit_block().
+    """
+    conn = op.get_bind()
+    stmt = sa.text("""
+        WITH batch AS (
+            SELECT id FROM tickets
+            WHERE CAST(:last AS uuid) IS NULL OR id > CAST(:last AS uuid)
+            ORDER BY id LIMIT :batch
+        ), filled AS (
+            UPDATE tickets t SET
+                message_count = agg.message_count,
+                last_message_at = last.created_at,
+                last_message_preview = left(last.content, 140),
+                last_message_is_ai = last.is_ai
+            FROM (
+                SELECT ticket_id, count(*) AS message_count FROM messages
+                WHERE ticket_id IN (SELECT id FROM batch)
+                GROUP BY ticket_id
+            ) agg
+            JOIN LATERAL (
+                SELECT created_at, content, is_ai FROM messages m
+                WHERE m.ticket_id = agg.ticket_id
+                ORDER BY created_at DESC, id DESC
+                LIMIT 1
+            ) last ON true
+            WHERE t.id = agg.ticket_id
+        )
+        SELECT id FROM batch ORDER BY id DESC LIMIT 1
+    """)
+    last = None
+    while (last := conn.execute(stmt, {"last": last, "batch": BACKFILL_BATCH}).scalar()) is not None:
+        pass
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tickets', sa.Column('last_message_at', sa.DateTime(), nullable=True))
+    op.add_column('tickets', sa.Column('last_message_preview', sa.String(), nullable=True))
+    op.add_column('tickets', sa.Column('last_message_is_ai', sa.Boolean(), server_default='false', nullable=False))
+    # backfill from existing messages; new messages keep these current
+    with op.get_context().autocommit_block():
+        backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tickets', 'last_message_is_ai')
+    op.drop_column('tickets', 'last_message_preview')
+    op.drop_column('tickets', 'last_message_at')
+    op.drop_column('tickets', 'message_count')
@@ -0,0 +1,37 @@
+"""keyset pagination indexes
+
+Revision ID: 9d1c5e7b2a48
+Revises: 4b7e2f1a9c03
+Create Date: 2026-10-18 10:04:17.552930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d1c5e7b2a48'
+down_revision: Union[str, None] = '4b7e2f1a9c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (fk, created_at, id) covers both the foreign key lookups and the
+    # (created_at, id) keyset order of the paginated listings
+    # CONCURRENTLY cannot run in a transaction, and keeps the tables writable while building
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tickets_user_id_created_at', 'tickets', ['user_id', 'created_at', 'id'], unique=False,
+                        postgresql_concurrently=True)
+        op.create_index('ix_messages_ticket_id_created_at', 'messages', ['ticket_id', 'created_at', 'id'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_messages_ticket_id_created_at', table_name='messages', postgresql_concurrently=True)
+        op.drop_index('ix_tickets_user_id_created_at', table_name='tickets', postgresql_concurrently=True)
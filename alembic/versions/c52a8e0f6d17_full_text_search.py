@@ -0,0 +1,97 @@
+"""full text search
+
+Revision ID: c52a8e0f6d17
+Revises: 9d1c5e7b2a48
+Create Date: 2026-10-18 11:26:53.804116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52a8e0f6d17'
+down_revision: Union[str, None] = '9d1c5e7b2a48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TICKETS_VECTOR = (
+    "setweight(to_tsvector('english'::regconfig, coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce({row}description, '')), 'B')"
+)
+MESSAGES_VECTOR = "to_tsvector('english'::regconfig, coalesce({row}content, ''))"
+BACKFILL_BATCH = 5000
+
+
+def create_trigger(table: str, columns: str, vector: str) -> None:
+    # BEFORE trigger rather than a GENERATED column: adding a stored generated
+    # column rewrites the whole table under an ACCESS EXCLUSIVE lock
+    op.execute(f"""
+        CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {vector.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"""
+        CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE OF {columns} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+    """)
+
+
+def backfill(table: str, vector: str) -> None:
+    """
+    Fill search_vector for existing rows, one short transaction per batch,
+    walking the primary key so no batch rescans rows already filled.
+    Must run inside autocommit_block().
+    """
+    conn = op.get_bind()
+    stmt = sa.text(f"""
+        WITH batch AS (
+            SELECT id FROM {table}
+            WHERE CAST(:last AS uuid) IS NULL OR id > CAST(:last AS uuid)
+            ORDER BY id LIMIT :batch
+        ), filled AS (
+            UPDATE {table} SET search_vector = {vector.format(row="")}
+            WHERE id IN (SELECT id FROM batch) AND search_vector IS NULL
+        )
+        SELECT id FROM batch ORDER BY id DESC LIMIT 1
+    """)
+    last = None
+    while (last := conn.execute(stmt, {"last": last, "batch": BACKFILL_BATCH}).scalar()) is not None:
+        pass
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # plain nullable columns are a catalog-only change; the triggers cover new
+    # and edited rows from here on, the backfill covers the existing ones
+    op.add_column('tickets', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.add_column('messages', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    create_trigger('tickets', 'title, description', TICKETS_VECTOR)
+    create_trigger('messages', 'content', MESSAGES_VECTOR)
+    with op.get_context().autocommit_block():
+        backfill('tickets', TICKETS_VECTOR)
+        backfill('messages', MESSAGES_VECTOR)
+        op.create_index('ix_tickets_search_vector', 'tickets', ['search_vector'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_messages_search_vector', 'messages', ['search_vector'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_messages_search_vector', table_name='messages', postgresql_concurrently=True)
+        op.drop_index('ix_tickets_search_vector', table_name='tickets', postgresql_concurrently=True)
+    op.execute("DROP TRIGGER messages_search_vector ON messages")
+    op.execute("DROP TRIGGER tickets_search_vector ON tickets")
+    op.execute("DROP FUNCTION messages_search_vector_update()")
+    op.execute("DROP FUNCTION tickets_search_vector_update()")
+    op.drop_column('messages', 'search_vector')
+    op.drop_column('tickets', 'search_vector')
@@ -1,31 +1,61 @@
 # src/app.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 # point at your package’s middleware
 from middleware import setup_middlewares
+from config import settings
 
 # import the routers (they’re all defined as `router = APIRouter(prefix=...)` in their modules)
-from seedx_support_backend.users.resource    import router as auth_router
-from seedx_support_backend.tickets.resource  import router as tickets_router
-from seedx_support_backend.messages.resource import router as messages_router
-from seedx_support_backend.ai.resource       import router as ai_response_router
+from seedx_support_backend.users import resource as auth_resource
+from seedx_support_backend.tickets import resource as tickets_resource
+from seedx_support_backend.messages import resource as messages_resource
+from seedx_support_backend.ai import resource as ai_response_resource
+from seedx_support_backend.search import resource as search_resource
+from seedx_support_backend.admin import resource as admin_resource
+from seedx_support_backend.monitoring.resource import router as monitoring_router
+from seedx_support_backend.ai.dependencies import create_ai_service
+from seedx_support_backend.users.hashing import password_hasher
+from seedx_support_backend.infrastructure.events import ticket_events
+from seedx_support_backend.infrastructure.replicas import replica_set
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one AIService (and its pooled upstream client) per worker
+    app.state.ai_service = create_ai_service()
+    # one LISTEN connection per worker for /tickets/{id}/events
+    await ticket_events.start()
+    # health checks of DATABASE_READ_URLS, if any
+    await replica_set.start()
+    try:
+        yield
+    finally:
+        await replica_set.stop()
+        await ticket_events.stop()
+        await app.state.ai_service.aclose()
+        password_hasher.shutdown()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Support Assistant API")
+    app = FastAPI(title="Support Assistant API", lifespan=lifespan)
 
     # CORS + auth
     setup_middlewares(app)
 
     # each router already has its own prefix:
-    #   auth_router    → /auth
-    #   tickets_router → /tickets
-    #   messages_router→ /tickets/{ticket_id}/messages
-    #   ai_response_router → /tickets/{ticket_id}/ai-response
-    app.include_router(auth_router)
-    app.include_router(tickets_router)
-    app.include_router(messages_router)
-    app.include_router(ai_response_router)
+    #   auth    → /auth
+    #   tickets → /tickets
+    #   messages→ /tickets/{ticket_id}/messages
+    #   ai_response → /tickets/{ticket_id}/ai-response
+    #   search  → /search
+    #   admin   → /admin
+    # DATABASE_ASYNC swaps every module to its AsyncSession twin (`async_router`).
+    router_attr = "async_router" if settings.DATABASE_ASYNC else "router"
+    for module in (auth_resource, tickets_resource, messages_resource, ai_response_resource, search_resource, admin_resource):
+        app.include_router(getattr(module, router_attr))
+    app.include_router(monitoring_router)
 
     return app
 app = create_app()
@@ -0,0 +1,29 @@
+"""
+Micro-benchmarks for the API's hot paths, run from src/:
+
+  python -m benchmarks.serialization --rows 10000
+
+Each module prints one line per variant. Times are the best of several runs,
+so they measure the code path rather than scheduler noise.
+"""
+import time
+from typing import Callable
+
+
+def best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Lowest wall time of `repeat` calls to `fn`, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def report(label: str, seconds: float, items: int | None = None):
+    line = f"{label:<32} {seconds * 1000:9.2f} ms"
+    if items:
+        line += f"  {items / seconds:12,.0f} items/s"
+    print(line)
@@ -0,0 +1,109 @@
+"""
+Upstream time-to-first-token through AIProvider against a local stand-in
+streaming server: a fresh httpx client per request (cold: new TCP
+connection each time) against the shared keep-alive pool (warm).
+
+  python -m benchmarks.ai_ttft --requests 200 --setup-ms 20
+
+--setup-ms delays the first response on every new connection, standing in
+for the DNS and TLS round trips a real upstream costs.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+
+import httpx
+
+from seedx_support_backend.ai.providers import AIProvider, create_http_client
+
+CHUNKS = 5
+
+
+class StandInUpstream:
+    """
+    HTTP/1.1 keep-alive server streaming CHUNKS SSE events per request.
+    """
+    def __init__(self, setup_delay: float):
+        self.setup_delay = setup_delay
+        self.connections = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        new_connection = True
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = next(
+                    (int(line.split(b":", 1)[1]) for line in head.split(b"\r\n") if line.lower().startswith(b"content-length:")),
+                    0,
+                )
+                await reader.readexactly(length)
+                if new_connection:
+                    await asyncio.sleep(self.setup_delay)
+                    new_connection = False
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+                for i in range(CHUNKS):
+                    event = f'data: {{"content": "token{i} "}}\n\n'.encode()
+                    writer.write(b"%x\r\n%s\r\n" % (len(event), event))
+                done = b"data: [DONE]\n\n"
+                writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(done), done))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def ttft(provider: AIProvider) -> float:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first = None
+    async for chunk in provider.stream("prompt"):
+        if first is None:
+            first = loop.time() - started
+    return first
+
+
+async def cold(url: str) -> float:
+    provider = AIProvider("cold", url, "key", client=httpx.AsyncClient(timeout=None))
+    try:
+        return await ttft(provider)
+    finally:
+        await provider.aclose()
+
+
+def summary(label: str, samples: list[float], connections: int):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<8} p50 {statistics.median(ordered) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms  {connections} connections")
+
+
+async def run(requests: int, setup_delay: float):
+    upstream = StandInUpstream(setup_delay)
+    server = await asyncio.start_server(upstream.handle, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+    async with server:
+        samples = [await cold(url) for _ in range(requests)]
+        summary("cold", samples, upstream.connections)
+
+        upstream.connections = 0
+        warm = AIProvider("warm", url, "key", client=create_http_client())
+        try:
+            await ttft(warm)  # open the pooled connection
+            samples = [await ttft(warm) for _ in range(requests)]
+        finally:
+            await warm.aclose()
+        summary("warm", samples, upstream.connections)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--setup-ms", type=float, default=0.0, help="simulated setup cost per new connection")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.requests, args.setup_ms / 1000))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Requests per second through the pure ASGI AuthMiddleware against the
+BaseHTTPMiddleware it replaced, on a bare FastAPI app behind httpx's ASGI
+transport. The user comes from the user cache in both, so the numbers
+measure the middleware, not the database.
+
+  python -m benchmarks.auth_middleware --requests 5000 --concurrency 50
+
+/me returns a small JSON body; /stream sends --chunks chunks, the shape of
+an SSE response.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from middleware import OPEN_PATHS, AuthMiddleware
+from seedx_support_backend.users.auth import create_access_token, decode_token
+from seedx_support_backend.users.cache import user_cache
+from seedx_support_backend.users.core import Role, UserPublic
+
+
+class BaseHTTPAuthMiddleware(BaseHTTPMiddleware):
+    """
+    The BaseHTTPMiddleware AuthMiddleware replaced, kept here as the baseline.
+    """
+    async def dispatch(self, request: Request, call_next: Callable):
+        if any(request.url.path.startswith(p) for p in OPEN_PATHS):
+            return await call_next(request)
+
+        auth: str | None = request.headers.get("Authorization")
+        if not auth or not auth.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+        token = auth.split(" ", 1)[1]
+
+        try:
+            user = user_cache.get(decode_token(token).get("sub"))
+        except Exception:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        if user is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+        request.state.user = user
+        return await call_next(request)
+
+
+def create_bench_app(middleware: type | None, chunks: int) -> FastAPI:
+    app = FastAPI()
+    if middleware is not None:
+        app.add_middleware(middleware)
+
+    @app.get("/me")
+    def me(request: Request):
+        return {"id": str(request.state.user.id) if middleware else None}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            for i in range(chunks):
+                yield f"data: {i}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+async def load(app: FastAPI, path: str, token: str, requests: int, concurrency: int) -> float:
+    """
+    Wall time of `requests` GETs of `path`, at most `concurrency` in flight.
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(client: httpx.AsyncClient):
+        async with gate:
+            response = await client.get(path, headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path}: {response.status_code}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(*(one(client) for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client) for _ in range(requests)))
+        return time.perf_counter() - started
+
+
+async def run(token: str, requests: int, concurrency: int, chunks: int):
+    variants = (("none", None), ("BaseHTTPMiddleware", BaseHTTPAuthMiddleware), ("ASGI AuthMiddleware", AuthMiddleware))
+    for path in ("/me", "/stream"):
+        for label, middleware in variants:
+            seconds = await load(create_bench_app(middleware, chunks), path, token, requests, concurrency)
+            print(f"{path:<8} {label:<20} {requests / seconds:9,.0f} req/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--chunks", type=int, default=100, help="chunks per /stream response")
+    args = parser.parse_args(argv)
+
+    now = datetime.now(timezone.utc)
+    user = UserPublic(name="bench", email="bench@example.com", id=uuid.uuid4(), role=Role.USER, created_at=now, updated_at=now)
+    user_cache.put(user.id, user)
+    asyncio.run(run(create_access_token({"sub": str(user.id)}), args.requests, args.concurrency, args.chunks))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
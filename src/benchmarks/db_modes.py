@@ -0,0 +1,102 @@
+"""
+Request throughput of the sync routers (psycopg2 sessions on the threadpool)
+against the DATABASE_ASYNC routers (asyncpg AsyncSession), with 500
+concurrent GET /tickets requests against DATABASE_URL. The app runs
+in-process behind httpx's ASGI transport, so both modes pay the same client
+overhead. A throwaway user and tickets are created and deleted afterwards.
+
+  python -m benchmarks.db_modes --requests 5000 --concurrency 500
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete
+
+import config
+from app import create_app
+from seedx_support_backend.infrastructure.database import (
+    SessionLocal, async_engine, async_pool_metrics, engine, pool_metrics,
+)
+from seedx_support_backend.tickets.models import Ticket
+from seedx_support_backend.users.auth import create_access_token
+from seedx_support_backend.users.models import User
+
+TICKETS = 20
+
+
+async def load(app, token: str, requests: int, concurrency: int) -> tuple[float, list[float], int]:
+    """
+    Send `requests` GETs, at most `concurrency` in flight; returns the wall
+    time, per-request latencies and the number of non-200 responses.
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failures = 0
+
+    async def one(client: httpx.AsyncClient):
+        nonlocal failures
+        async with gate:
+            started = time.perf_counter()
+            response = await client.get("/tickets", headers=headers)
+            latencies.append(time.perf_counter() - started)
+            failures += response.status_code != 200
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await asyncio.gather(*(one(client) for _ in range(min(concurrency, 50))))  # warm the pools
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client) for _ in range(requests)))
+        return time.perf_counter() - started, latencies, failures
+
+
+def summary(label: str, seconds: float, latencies: list[float], failures: int, checkouts: int):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<8} {len(ordered) / seconds:9,.0f} req/s"
+        f"  p50 {statistics.median(ordered) * 1000:8.2f} ms  p95 {p95 * 1000:8.2f} ms  {failures} errors  {checkouts} pool checkouts"
+    )
+
+
+async def run(token: str, requests: int, concurrency: int):
+    for label, use_async in (("sync", False), ("async", True)):
+        # create_app and AuthMiddleware read the flag from `config`, not `src.config`
+        config.settings.DATABASE_ASYNC = use_async
+        pool = async_pool_metrics if use_async else pool_metrics
+        before = pool.checkouts
+        result = await load(create_app(), token, requests, concurrency)
+        summary(label, *result, pool.checkouts - before)
+    await async_engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        user = User(name="bench", email=f"bench-{uuid.uuid4()}@example.com", hashed_password="-")
+        db.add(user)
+        db.flush()
+        db.add_all(Ticket(title=f"bench {i}", description="db modes benchmark", user_id=user.id) for i in range(TICKETS))
+        db.commit()
+        try:
+            asyncio.run(run(create_access_token({"sub": str(user.id)}), args.requests, args.concurrency))
+        finally:
+            db.rollback()
+            db.execute(delete(Ticket).where(Ticket.user_id == user.id))
+            db.execute(delete(User).where(User.id == user.id))
+            db.commit()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
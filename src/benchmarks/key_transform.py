@@ -0,0 +1,89 @@
+"""
+Key-case conversion of nested JSON documents: the former recursive
+convert_dict_to_camel_case, transform_keys + json.dumps, and the streaming
+to_json_transformed that never builds a converted copy.
+
+  python -m benchmarks.key_transform --sizes 1 50    # document sizes in MB
+"""
+import argparse
+import json
+import re
+import sys
+import time
+import tracemalloc
+
+from seedx_support_backend.infrastructure.json import convert_to_camel_case, to_json_transformed, transform_keys
+
+from . import best_of, report
+
+
+def recursive_convert_key(s):
+    return re.compile("((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))").sub(r"_\1", s).lower()
+
+
+def recursive_convert(value):
+    """
+    The implementation transform_keys replaced, kept here as the baseline.
+    """
+    if isinstance(value, dict):
+        return {recursive_convert_key(k): recursive_convert(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [recursive_convert(v) for v in value]
+    return value
+
+
+def record(i: int) -> dict:
+    return {
+        "ticketId": f"00000000-0000-0000-0000-{i:012x}",
+        "createdAt": "2025-01-01T00:00:00",
+        "lastMessageIsAi": i % 2 == 0,
+        "HTTPStatus": 200,
+        "metaData": {"sourceChannel": "email", "priorityLevel": i % 5, "tagList": ["billingIssue", "needsReply"]},
+        "messageList": [
+            {"authorId": f"user-{i % 97}", "isAi": j % 2 == 1, "contentText": "Printer jams on page two " * 2}
+            for j in range(3)
+        ],
+    }
+
+
+def document(megabytes: float) -> dict:
+    per_record = len(json.dumps(record(0)))
+    rows = max(1, int(megabytes * 2**20 / per_record))
+    return {"pageInfo": {"totalCount": rows}, "itemList": [record(i) for i in range(rows)]}
+
+
+def peak_bytes(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 50], help="document sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory", action="store_true", help="also report peak allocations (slow)")
+    args = parser.parse_args(argv)
+
+    for megabytes in args.sizes:
+        doc = document(megabytes)
+        expected = json.dumps(recursive_convert(doc), separators=(",", ":"))
+        assert json.loads(to_json_transformed(doc)) == json.loads(expected)
+        print(f"{megabytes:g} MB document ({len(expected) / 2**20:.1f} MB out)")
+        variants = (
+            ("recursive + json.dumps", lambda: json.dumps(recursive_convert(doc))),
+            ("transform_keys + json.dumps", lambda: json.dumps(transform_keys(doc))),
+            ("to_json_transformed", lambda: to_json_transformed(doc)),
+        )
+        for label, fn in variants:
+            convert_to_camel_case.cache_clear()
+            report(f"  {label}", best_of(fn, args.repeat))
+            if args.memory:
+                print(f"  {'':<32} {peak_bytes(fn) / 2**20:9.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
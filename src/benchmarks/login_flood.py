@@ -0,0 +1,122 @@
+"""
+A flood of concurrent POST /auth/login requests, with bcrypt run inline on
+the event loop and through PasswordHasher's process pool, while a probe
+client times GET /tickets. Runs create_app() in-process against
+DATABASE_URL; a throwaway user is created and deleted afterwards.
+
+  python -m benchmarks.login_flood --logins 200 --concurrency 32
+
+Reports logins/s and the p50/p95 latency of the probe requests; "idle" is
+the probe with no logins in flight.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete
+
+from app import create_app
+from seedx_support_backend.infrastructure.database import SessionLocal, engine
+from seedx_support_backend.users.auth import create_access_token, hash_password, verify_and_update_password
+from seedx_support_backend.users.hashing import PasswordHasher, password_hasher
+from seedx_support_backend.users.models import User
+from src.config import settings
+
+PASSWORD = "correct horse battery staple"
+
+
+async def inline_verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+    """
+    bcrypt straight on the event loop, the baseline the process pool replaced.
+    """
+    return verify_and_update_password(password, hashed)
+
+
+async def probe(client: httpx.AsyncClient, token: str, stop: asyncio.Event, interval: float) -> list[float]:
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/tickets", headers=headers)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def flood(client: httpx.AsyncClient, email: str, logins: int, concurrency: int) -> tuple[float, int]:
+    """
+    Wall time of `logins` logins, at most `concurrency` in flight, and the number that failed.
+    """
+    gate = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with gate:
+            response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+            failures += response.status_code != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - started, failures
+
+
+def summary(label: str, latencies: list[float], logins: int = 0, seconds: float = 0.0, failures: int = 0):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    rate = f"{logins / seconds:7.1f} logins/s  {failures} failed" if logins else f"{'-':>7} logins/s"
+    print(f"{label:<14} {rate:<28} GET /tickets p50 {statistics.median(ordered) * 1000:8.2f} ms  p95 {p95 * 1000:8.2f} ms")
+
+
+async def run(email: str, token: str, logins: int, concurrency: int, interval: float):
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        stop = asyncio.Event()
+        idle = asyncio.create_task(probe(client, token, stop, interval))
+        await asyncio.sleep(1.0)
+        stop.set()
+        summary("idle", await idle)
+
+        for label, patched in (("inline bcrypt", True), ("process pool", False)):
+            original = PasswordHasher.averify_and_update
+            if patched:
+                PasswordHasher.averify_and_update = inline_verify_and_update
+            try:
+                await client.post("/auth/login", json={"email": email, "password": PASSWORD})  # start the pool
+                stop = asyncio.Event()
+                probing = asyncio.create_task(probe(client, token, stop, interval))
+                seconds, failures = await flood(client, email, logins, concurrency)
+                stop.set()
+                summary(label, await probing, logins, seconds, failures)
+            finally:
+                PasswordHasher.averify_and_update = original
+    password_hasher.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32, help=f"at most PASSWORD_HASH_MAX_PENDING ({settings.PASSWORD_HASH_MAX_PENDING}) avoids 503s")
+    parser.add_argument("--probe-interval-ms", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        user = User(name="bench", email=f"bench-{uuid.uuid4()}@example.com", hashed_password=hash_password(PASSWORD))
+        db.add(user)
+        db.commit()
+        try:
+            token = create_access_token({"sub": str(user.id)})
+            asyncio.run(run(user.email, token, args.logins, args.concurrency, args.probe_interval_ms / 1000))
+        finally:
+            db.rollback()
+            db.execute(delete(User).where(User.id == user.id))
+            db.commit()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
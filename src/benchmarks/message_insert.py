@@ -0,0 +1,64 @@
+"""
+Batch vs per-row message inserts against DATABASE_URL. A throwaway user and
+ticket are created and deleted again afterwards.
+
+  python -m benchmarks.message_insert --rows 5000
+"""
+import argparse
+import sys
+import time
+import uuid
+
+from sqlalchemy import delete
+
+from seedx_support_backend.infrastructure.database import SessionLocal
+from seedx_support_backend.messages.core import MessageCreate
+from seedx_support_backend.messages.models import Message
+from seedx_support_backend.messages.repository import MessageRepository
+from seedx_support_backend.messages.service import MessageService
+from seedx_support_backend.tickets.models import Ticket
+from seedx_support_backend.users.models import User
+from src.config import settings
+
+from . import report
+
+
+def per_row(svc: MessageService, ticket_id: uuid.UUID, author_id: uuid.UUID, msgs: list[MessageCreate]):
+    for m in msgs:
+        svc.add_message(ticket_id, author_id, m)
+
+
+def batched(svc: MessageService, ticket_id: uuid.UUID, author_id: uuid.UUID, msgs: list[MessageCreate]):
+    for start in range(0, len(msgs), settings.MESSAGE_BATCH_MAX):
+        svc.add_messages(ticket_id, author_id, msgs[start:start + settings.MESSAGE_BATCH_MAX])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    msgs = [MessageCreate(content=f"message {i} " * 8) for i in range(args.rows)]
+    with SessionLocal() as db:
+        user = User(name="bench", email=f"bench-{uuid.uuid4()}@example.com", hashed_password="-")
+        db.add(user)
+        db.flush()
+        ticket = Ticket(title="bench", description="message insert benchmark", user_id=user.id)
+        db.add(ticket)
+        db.commit()
+        try:
+            svc = MessageService(MessageRepository(db))
+            for label, insert in (("per-row add_message", per_row), ("add_messages batches", batched)):
+                started = time.perf_counter()
+                insert(svc, ticket.id, user.id, msgs)
+                report(label, time.perf_counter() - started, args.rows)
+        finally:
+            db.rollback()
+            db.execute(delete(Message).where(Message.ticket_id == ticket.id))
+            db.execute(delete(Ticket).where(Ticket.id == ticket.id))
+            db.execute(delete(User).where(User.id == user.id))
+            db.commit()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
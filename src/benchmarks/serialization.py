@@ -0,0 +1,88 @@
+"""
+Serialization of a 10k-row listing: FastAPI's response_model path against
+ConverterJSONResponse, plus the per-instance size of the slotted DTOs.
+
+  python -m benchmarks.serialization --rows 10000
+"""
+import argparse
+import dataclasses
+import datetime
+import json
+import sys
+import tracemalloc
+import uuid
+
+from pydantic import TypeAdapter
+
+from seedx_support_backend.infrastructure.json import ConverterJSONResponse, precompile_unstructure
+from seedx_support_backend.messages.core import MessagePage, MessageRead
+from seedx_support_backend.tickets.core import TicketPage, TicketRead
+
+from . import best_of, report
+
+
+def messages(rows: int) -> MessagePage:
+    now = datetime.datetime(2025, 1, 1)
+    ticket_id, author_id = uuid.uuid4(), uuid.uuid4()
+    return MessagePage(
+        [
+            MessageRead(uuid.uuid4(), now + datetime.timedelta(seconds=i), ticket_id, author_id, f"message {i} " * 8)
+            for i in range(rows)
+        ],
+        next_cursor="cursor",
+    )
+
+
+def tickets(rows: int) -> TicketPage:
+    now = datetime.datetime(2025, 1, 1)
+    user_id = uuid.uuid4()
+    return TicketPage(
+        [
+            TicketRead(f"ticket {i}", "description " * 8, uuid.uuid4(), "open", now, now, user_id)
+            for i in range(rows)
+        ],
+        next_cursor="cursor",
+    )
+
+
+def response_model_body(adapter: TypeAdapter, page) -> bytes:
+    """
+    What FastAPI does for a dataclass returned under response_model: asdict,
+    re-validate, dump to JSON-able python, then json.dumps in JSONResponse.
+    """
+    content = adapter.dump_python(adapter.validate_python(dataclasses.asdict(page)), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def instance_bytes(build, rows: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    page = build(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del page
+    return (after - before) / rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    converter = ConverterJSONResponse.converter
+    precompile_unstructure(converter, MessageRead, MessagePage, TicketRead, TicketPage)
+    for name, build, cls, page_cls in (
+        ("messages", messages, MessageRead, MessagePage),
+        ("tickets", tickets, TicketRead, TicketPage),
+    ):
+        page = build(args.rows)
+        adapter = TypeAdapter(page_cls)
+        assert json.loads(response_model_body(adapter, page)) == json.loads(ConverterJSONResponse(page).body)
+        print(f"{args.rows} {name}, {instance_bytes(build, args.rows):.0f} B/row, __dict__: {hasattr(page.items[0], '__dict__')}")
+        report("  response_model", best_of(lambda: response_model_body(adapter, page), args.repeat), args.rows)
+        report("  ConverterJSONResponse", best_of(lambda: ConverterJSONResponse(page), args.repeat), args.rows)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
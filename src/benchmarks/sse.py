@@ -0,0 +1,73 @@
+"""
+SSE framing of AI streams: the former one-frame-per-chunk
+json.dumps({"content": chunk}) framing against SSEWriter in coalesce and
+passthrough mode, on synthetic OpenAI-style token streams.
+
+  python -m benchmarks.sse --streams 200 --tokens 300 --burst 4 --gap-ms 20
+
+Tokens arrive in bursts of --burst chunks, --gap-ms apart. Reports process
+CPU per stream, frames per stream and frames/s written across all streams.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import AsyncIterator, Callable
+
+from seedx_support_backend.ai.sse import SSEWriter
+from src.config import settings
+
+
+async def tokens(count: int, burst: int, gap: float) -> AsyncIterator[str]:
+    for i in range(count):
+        yield json.dumps({"choices": [{"index": 0, "delta": {"content": f"token{i} "}}]})
+        if (i + 1) % burst == 0:
+            await asyncio.sleep(gap)
+
+
+async def per_chunk_frames(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    The framing SSEWriter replaced, kept here as the baseline.
+    """
+    async for chunk in chunks:
+        yield f"data: {json.dumps({'content': chunk})}\n\n"
+
+
+async def drain(frames: AsyncIterator[str]) -> int:
+    count = 0
+    async for _ in frames:
+        count += 1
+    return count
+
+
+async def measure(label: str, framing: Callable, streams: int, count: int, burst: int, gap: float):
+    cpu_started, started = time.process_time(), time.perf_counter()
+    frames = sum(await asyncio.gather(*(drain(framing(tokens(count, burst, gap))) for _ in range(streams))))
+    cpu, wall = time.process_time() - cpu_started, time.perf_counter() - started
+    print(
+        f"{label:<12} cpu_ms_per_stream {cpu * 1000 / streams:8.3f}"
+        f"  frames/stream {frames / streams:7.1f}  frames/s {frames / wall:10,.0f}"
+    )
+
+
+async def run(streams: int, count: int, burst: int, gap: float, flush: float):
+    await measure("per-chunk", per_chunk_frames, streams, count, burst, gap)
+    for mode in ("coalesce", "passthrough"):
+        writer = SSEWriter(mode=mode, flush_interval=flush)
+        await measure(mode, writer.frames, streams, count, burst, gap)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=300, help="chunks per stream")
+    parser.add_argument("--burst", type=int, default=4, help="chunks arriving together")
+    parser.add_argument("--gap-ms", type=float, default=20.0, help="pause between bursts")
+    parser.add_argument("--flush-ms", type=float, default=settings.AI_SSE_FLUSH_MS)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.streams, args.tokens, args.burst, args.gap_ms / 1000, args.flush_ms / 1000))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+COPY-based bulk export/import of users, tickets and messages.
+
+  python bulk.py export messages messages.csv --user-id <uuid> --since 2025-01-01
+  python bulk.py import messages messages.csv
+  python bulk.py import messages messages.bin --format binary --chunk-rows 100000
+
+Import tables in order (users, tickets, messages). An interrupted import is
+resumed from `<file>.checkpoint` when run again.
+"""
+import argparse
+import uuid
+from datetime import datetime
+
+from seedx_support_backend.infrastructure.bulk import (
+    FORMATS,
+    TABLES,
+    ExportFilter,
+    export_table,
+    import_table,
+)
+from seedx_support_backend.infrastructure.database import engine
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="COPY a table to a file")
+    export.add_argument("table", choices=TABLES)
+    export.add_argument("path")
+    export.add_argument("--format", choices=FORMATS, default="csv")
+    export.add_argument("--user-id", type=uuid.UUID)
+    export.add_argument("--since", type=datetime.fromisoformat, help="created_at >= (ISO date/time)")
+    export.add_argument("--until", type=datetime.fromisoformat, help="created_at < (ISO date/time)")
+
+    load = sub.add_parser("import", help="COPY a file into a table")
+    load.add_argument("table", choices=TABLES)
+    load.add_argument("path")
+    load.add_argument("--format", choices=FORMATS, default="csv")
+    load.add_argument("--chunk-rows", type=int, default=50_000)
+    load.add_argument("--checkpoint", help="defaults to <path>.checkpoint")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = engine.raw_connection()
+    try:
+        if args.command == "export":
+            flt = ExportFilter(user_id=args.user_id, since=args.since, until=args.until)
+            with open(args.path, "wb") as out:
+                export_table(conn, args.table, out, args.format, flt)
+        else:
+            with open(args.path, "rb") as f:
+                import_table(
+                    conn,
+                    args.table,
+                    f,
+                    args.format,
+                    checkpoint_path=args.checkpoint or f"{args.path}.checkpoint",
+                    chunk_rows=args.chunk_rows,
+                )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
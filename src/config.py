@@ -2,10 +2,93 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # When enabled the routers run on an AsyncSession (asyncpg) instead of
+    # blocking psycopg2 sessions dispatched to the threadpool.
+    DATABASE_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str | None = None
+    # Connection pool, per worker process and per engine (sync / async)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_TIMEOUT: float = 30.0
+    # Optional read replicas (comma separated URLs) for read-only endpoints
+    DATABASE_READ_URLS: str = ""
+    REPLICA_HEALTH_INTERVAL_SECONDS: float = 5.0
+    REPLICA_HEALTH_TIMEOUT_SECONDS: float = 2.0
+    # After a write, the user's reads stay on the primary this long
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    # Keyset-paginated listings (GET /tickets, GET /tickets/{id}/messages)
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+    # Rows fetched per server-side cursor round trip in NDJSON streaming mode
+    STREAM_BATCH_SIZE: int = 500
+    # Upper bound on POST /tickets/{id}/messages:batch
+    MESSAGE_BATCH_MAX: int = 1000
+    # GET /admin/tickets counts exactly up to this many rows, then uses the planner estimate
+    ADMIN_EXACT_COUNT_MAX: int = 10000
+    # Comment line sent on idle GET /tickets/{id}/events streams
+    TICKET_EVENTS_HEARTBEAT_SECONDS: float = 15.0
     JWT_SECRET: str
+    JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # bcrypt cost and the process pool that runs it
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Authenticated-user cache used by validate_token (per worker)
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 300.0
     GROK_API_KEY: str
     GROK_API_URL: str
+    # Pooled upstream client shared by the AIService singleton
+    AI_HTTP2: bool = True
+    AI_MAX_CONNECTIONS: int = 100
+    AI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    AI_KEEPALIVE_EXPIRY: float = 30.0
+    # Extra upstreams as a JSON list of {"name", "url", "api_key", "model"};
+    # empty means the single GROK_API_URL endpoint
+    AI_PROVIDERS: list[dict] = []
+    AI_TTFT_EWMA_ALPHA: float = 0.2
+    # Start a second provider when the first has no token after its p95 TTFT
+    AI_HEDGE: bool = False
+    AI_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    # Upstream deadlines (seconds), retries before the first chunk, circuit breaker
+    AI_CONNECT_TIMEOUT: float = 5.0
+    AI_FIRST_TOKEN_TIMEOUT: float = 20.0
+    AI_IDLE_TIMEOUT: float = 15.0
+    AI_RETRIES: int = 2
+    AI_RETRY_BACKOFF_SECONDS: float = 0.25
+    AI_BREAKER_WINDOW: int = 50
+    AI_BREAKER_MIN_REQUESTS: int = 10
+    AI_BREAKER_ERROR_RATE: float = 0.5
+    AI_BREAKER_COOLDOWN_SECONDS: float = 30.0
+    # SSE writer: "coalesce" merges decoded deltas, "passthrough" forwards upstream payloads
+    AI_SSE_MODE: str = "coalesce"
+    AI_SSE_FLUSH_MS: float = 50.0
+    AI_SSE_FLUSH_BYTES: int = 1024
+    AI_SSE_HEARTBEAT_SECONDS: float = 15.0
+    # Admission control for AI streams (per worker): concurrent upstream streams,
+    # a bounded FIFO wait queue, and a per-user token bucket
+    AI_MAX_CONCURRENT_STREAMS: int = 50
+    AI_QUEUE_SIZE: int = 100
+    AI_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    AI_USER_STREAMS_PER_MINUTE: float = 10.0
+    AI_USER_STREAM_BURST: float = 3.0
+    # Prompt windowing: recent turns verbatim, older ones in a rolling summary
+    AI_PROMPT_TOKEN_BUDGET: int = 3000
+    AI_SUMMARY_TOKEN_BUDGET: int = 800
+    AI_PROMPT_RECENT_TURNS: int = 12
+    AI_SUMMARY_LINE_CHARS: int = 240
+    # Retrieval of similar resolved tickets into the prompt (local hashing
+    # vectors, memory-mapped index shared by the workers)
+    AI_RETRIEVAL_ENABLED: bool = False
+    AI_RETRIEVAL_INDEX_DIR: str = "data/ticket_index"
+    AI_RETRIEVAL_DIM: int = 256
+    AI_RETRIEVAL_TOP_K: int = 3
+    AI_RETRIEVAL_MIN_SCORE: float = 0.3
+    AI_RETRIEVAL_SHARED: bool = False
+    AI_RETRIEVAL_TOKEN_BUDGET: int = 300
     ALLOWED_ORIGINS: str
 
     class Config:
@@ -1,16 +1,23 @@
 # src/middleware.py
 
-from typing import Callable
+import re
 
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from config import settings
-from seedx_support_backend.infrastructure.database import get_db
-from seedx_support_backend.users.repository import UserRepository
-from seedx_support_backend.users.service import UserService
+from seedx_support_backend.infrastructure.database import SessionLocal, AsyncSessionLocal
+from seedx_support_backend.infrastructure.replicas import SAFE_METHODS, recent_writes
+from seedx_support_backend.users.auth import decode_token
+from seedx_support_backend.users.cache import user_cache
+from seedx_support_backend.users.core import UserPublic
+from seedx_support_backend.users.repository import UserRepository, AsyncUserRepository
+from seedx_support_backend.users.service import UserService, AsyncUserService
 from seedx_support_backend.users.models import User
 
 
@@ -33,36 +40,89 @@ def setup_cors(app: FastAPI):
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+OPEN_PATHS = ("/auth/signup", "/auth/login", "/openapi.json", "/docs", "/docs/oauth2-redirect")
 
-class AuthMiddleware(BaseHTTPMiddleware):
+
+def _load_user_sync(payload: dict) -> UserPublic:
+    db = SessionLocal()
+    try:
+        return UserService(repo=UserRepository(db)).load_user(payload)
+    finally:
+        db.close()
+
+
+async def load_user(payload: dict) -> UserPublic:
+    """
+    Resolve a user on a cache miss with a short-lived session checked out
+    from the pool for this request only.
+    """
+    if settings.DATABASE_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await AsyncUserService(AsyncUserRepository(db)).load_user(payload)
+    return await run_in_threadpool(_load_user_sync, payload)
+
+
+class AuthMiddleware:
     """
-    Middleware that extracts a Bearer token, validates it, and attaches the User
-    object to request.state.user.  Skips auth for login/signup/docs paths.
+    Pure ASGI middleware that extracts a Bearer token, validates it, and
+    attaches the user to request.state.user. Skips auth for login/signup/docs
+    paths. Response bodies pass through untouched, so SSE streams are not
+    buffered; successful writes get the read-your-writes cookie header.
     """
-    def __init__(self, app: FastAPI, user_svc: UserService):
-        super().__init__(app)
-        self.user_svc = user_svc
+    def __init__(self, app: ASGIApp, open_paths: tuple[str, ...] = OPEN_PATHS):
+        self.app = app
+        # prefix match, anchored at the start of the path
+        self.open_paths = re.compile("|".join(re.escape(p) for p in open_paths))
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        # Skip authentication for open endpoints
-        open_paths = ["/auth/signup", "/auth/login", "/openapi.json", "/docs", "/docs/oauth2-redirect"]
-        if any(request.url.path.startswith(p) for p in open_paths):
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or self.open_paths.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
         # Extract and validate Bearer token
-        auth: str | None = request.headers.get("Authorization")
+        auth = Headers(scope=scope).get("authorization")
         if not auth or not auth.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
+            await self._reject(scope, receive, send, "Missing or invalid Authorization header")
+            return
         token = auth.split(" ", 1)[1]
 
         try:
-            user = self.user_svc.validate_token(token)
+            payload = decode_token(token)
+            user = user_cache.get(payload.get("sub"))
+            if user is None:
+                user = await load_user(payload)
         except Exception:
-            raise HTTPException(status_code=401, detail="Invalid or expired token")
+            await self._reject(scope, receive, send, "Invalid or expired token")
+            return
 
         # Attach user to request state
-        request.state.user = user
-        return await call_next(request)
+        scope.setdefault("state", {})["user"] = user
+        if scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        # open the read-your-writes window before the write and extend it after;
+        # the cookie carries it to whichever worker serves the next read
+        recent_writes.mark(user.id)
+
+        async def send_with_cookie(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = recent_writes.cookie(user.id, secure=scope.get("scheme") == "https")
+                MutableHeaders(scope=message).append("set-cookie", cookie)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            recent_writes.mark(user.id)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, detail: str):
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=401,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        await response(scope, receive, send)
 
 
 # --- Combined middleware setup ---------------------------------------------
@@ -73,25 +133,14 @@ def setup_middlewares(app: FastAPI):
     Usage:
       from seedx_support_backend.middleware import setup_middlewares
       setup_middlewares(app)
-    You must also have created a UserService instance and stored it on app.state.user_service.
+    Users are looked up per request through the connection pool (and the
+    user cache), so no UserService needs to be prepared up front.
     """
-    # 1) Apply CORS
-    setup_cors(app)
+    # 1) Add AuthMiddleware
+    app.add_middleware(AuthMiddleware)
 
-    # 2) Ensure UserService is available
-    if not hasattr(app.state, "user_service"):
-        # Construct a UserService from a fresh DB session
-        db = next(get_db())
-        repo = UserRepository(db)
-        svc = UserService(
-            repo=repo,
-            jwt_secret=settings.JWT_SECRET,
-            expire_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-        )
-        app.state.user_service = svc
-
-    # 3) Add AuthMiddleware
-    app.add_middleware(AuthMiddleware, user_svc=app.state.user_service)
+    # 2) Apply CORS outermost, so preflights and 401s carry CORS headers
+    setup_cors(app)
 
 
 # --- Dependencies ----------------------------------------------------------
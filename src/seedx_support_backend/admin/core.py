@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from ..tickets.core import TicketRead
+
+@dataclass(slots=True)
+class AdminTicketPage:
+    items: List[TicketRead]
+    total: int
+    # False when `total` is the planner's row estimate
+    total_exact: bool
+    page_ms: float
+    count_ms: float
+    next_cursor: Optional[str] = None
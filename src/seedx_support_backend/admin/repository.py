@@ -0,0 +1,103 @@
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from ..infrastructure.json import CursorPagination
+from ..tickets.models import Ticket
+
+
+@dataclass
+class TicketFilter:
+    status: str | None = None
+    user_id: uuid.UUID | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) of a statement; binds are compiled with it.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def plan_rows(plan) -> int:
+    # psycopg2 decodes the json column, asyncpg hands it over as text
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def filtered_stmt(flt: TicketFilter) -> Select:
+    stmt = select(Ticket)
+    if flt.status is not None:
+        stmt = stmt.where(Ticket.status == flt.status)
+    if flt.user_id is not None:
+        stmt = stmt.where(Ticket.user_id == flt.user_id)
+    if flt.since is not None:
+        stmt = stmt.where(Ticket.created_at >= flt.since)
+    if flt.until is not None:
+        stmt = stmt.where(Ticket.created_at < flt.until)
+    return stmt
+
+
+def page_stmt(flt: TicketFilter, limit: int, after: CursorPagination | None) -> Select:
+    stmt = filtered_stmt(flt)
+    if after is not None:
+        stmt = stmt.where(tuple_(Ticket.created_at, Ticket.id) < (after.created_at, after.id))
+    return stmt.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit)
+
+
+def bounded_count_stmt(flt: TicketFilter, cap: int) -> Select:
+    """
+    COUNT(*) that stops after `cap` matching rows, so its cost is bounded
+    whatever the size of the filtered set.
+    """
+    ids = filtered_stmt(flt).with_only_columns(Ticket.id).limit(cap).subquery()
+    return select(func.count()).select_from(ids)
+
+
+def estimate_stmt(flt: TicketFilter) -> Explain:
+    return Explain(filtered_stmt(flt).with_only_columns(Ticket.id))
+
+
+class AdminTicketRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def page(self, flt: TicketFilter, limit: int, after: CursorPagination | None = None) -> list[Ticket]:
+        return list(self.db.scalars(page_stmt(flt, limit, after)))
+
+    def bounded_count(self, flt: TicketFilter, cap: int) -> int:
+        return self.db.scalar(bounded_count_stmt(flt, cap))
+
+    def estimate_count(self, flt: TicketFilter) -> int:
+        return plan_rows(self.db.scalar(estimate_stmt(flt)))
+
+
+class AsyncAdminTicketRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def page(self, flt: TicketFilter, limit: int, after: CursorPagination | None = None) -> list[Ticket]:
+        result = await self.db.scalars(page_stmt(flt, limit, after))
+        return list(result.all())
+
+    async def bounded_count(self, flt: TicketFilter, cap: int) -> int:
+        return await self.db.scalar(bounded_count_stmt(flt, cap))
+
+    async def estimate_count(self, flt: TicketFilter) -> int:
+        return plan_rows(await self.db.scalar(estimate_stmt(flt)))
@@ -0,0 +1,55 @@
+from datetime import datetime
+import uuid
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..infrastructure.replicas import get_async_read_db, get_read_db
+from ..infrastructure.json import ConverterJSONResponse, precompile_unstructure
+from ..users.core import Role
+from src.middleware import require_role
+from src.config import settings
+from ..tickets.core import TicketRead
+from .core import AdminTicketPage
+from .repository import AdminTicketRepository, AsyncAdminTicketRepository, TicketFilter
+from .service import AdminTicketService, AsyncAdminTicketService
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+# Same routes on AsyncSession, mounted instead of `router` when DATABASE_ASYNC is set
+async_router = APIRouter(prefix="/admin", tags=["admin"])
+
+precompile_unstructure(ConverterJSONResponse.converter, TicketRead, AdminTicketPage)
+
+@router.get("/tickets", response_model=AdminTicketPage, response_class=ConverterJSONResponse)
+def list_tickets(
+    status: str | None = None,
+    user_id: uuid.UUID | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=require_role(Role.ADMIN.value),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Every user's tickets, newest first, filtered by status, owner and creation
+    time (`since` inclusive, `until` exclusive). `total_exact` is false when
+    `total` is the planner's estimate; `page_ms`/`count_ms` time the two queries.
+    """
+    svc = AdminTicketService(AdminTicketRepository(db))
+    flt = TicketFilter(status=status, user_id=user_id, since=since, until=until)
+    return ConverterJSONResponse(svc.list_tickets(flt, limit, cursor))
+
+@async_router.get("/tickets", response_model=AdminTicketPage, response_class=ConverterJSONResponse)
+async def list_tickets_async(
+    status: str | None = None,
+    user_id: uuid.UUID | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=require_role(Role.ADMIN.value),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    svc = AsyncAdminTicketService(AsyncAdminTicketRepository(db))
+    flt = TicketFilter(status=status, user_id=user_id, since=since, until=until)
+    return ConverterJSONResponse(await svc.list_tickets(flt, limit, cursor))
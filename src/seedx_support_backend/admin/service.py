@@ -0,0 +1,68 @@
+import time
+from src.config import settings
+from ..tickets.models import Ticket
+from ..tickets.service import TicketService
+from .core import AdminTicketPage
+from .repository import AdminTicketRepository, AsyncAdminTicketRepository, TicketFilter
+
+
+def elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+class AdminTicketService:
+    """
+    Ticket listing across all users. `total` is an exact count while the
+    filtered set has at most `exact_count_max` rows; beyond that the count
+    query stops early and the planner's row estimate is returned instead.
+    """
+    def __init__(self, repo: AdminTicketRepository, exact_count_max: int = settings.ADMIN_EXACT_COUNT_MAX):
+        self.repo = repo
+        self.exact_count_max = exact_count_max
+
+    @staticmethod
+    def to_page(tickets: list[Ticket], limit: int, total: int, total_exact: bool, page_ms: float, count_ms: float) -> AdminTicketPage:
+        page = TicketService.to_page(tickets, limit)
+        return AdminTicketPage(
+            items=page.items,
+            total=total,
+            total_exact=total_exact,
+            page_ms=page_ms,
+            count_ms=count_ms,
+            next_cursor=page.next_cursor,
+        )
+
+    def list_tickets(self, flt: TicketFilter, limit: int, cursor: str | None = None) -> AdminTicketPage:
+        after = TicketService.parse_cursor(cursor)
+        started = time.perf_counter()
+        tickets = self.repo.page(flt, limit + 1, after)
+        page_ms = elapsed_ms(started)
+
+        started = time.perf_counter()
+        total = self.repo.bounded_count(flt, self.exact_count_max + 1)
+        total_exact = total <= self.exact_count_max
+        if not total_exact:
+            # the estimate can undershoot; we know there are at least `total` rows
+            total = max(self.repo.estimate_count(flt), total)
+        count_ms = elapsed_ms(started)
+        return self.to_page(tickets, limit, total, total_exact, page_ms, count_ms)
+
+
+class AsyncAdminTicketService:
+    def __init__(self, repo: AsyncAdminTicketRepository, exact_count_max: int = settings.ADMIN_EXACT_COUNT_MAX):
+        self.repo = repo
+        self.exact_count_max = exact_count_max
+
+    async def list_tickets(self, flt: TicketFilter, limit: int, cursor: str | None = None) -> AdminTicketPage:
+        after = TicketService.parse_cursor(cursor)
+        started = time.perf_counter()
+        tickets = await self.repo.page(flt, limit + 1, after)
+        page_ms = elapsed_ms(started)
+
+        started = time.perf_counter()
+        total = await self.repo.bounded_count(flt, self.exact_count_max + 1)
+        total_exact = total <= self.exact_count_max
+        if not total_exact:
+            total = max(await self.repo.estimate_count(flt), total)
+        count_ms = elapsed_ms(started)
+        return AdminTicketService.to_page(tickets, limit, total, total_exact, page_ms, count_ms)
@@ -0,0 +1,187 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Hashable
+
+from fastapi import HTTPException, status
+
+from src.config import settings
+from ..infrastructure.metrics import metrics
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Take one token; returns 0 on success, else the seconds until one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class AdmissionController:
+    """
+    Gate in front of AI streams. Each request takes a token from its user's
+    bucket (`user_rate` per second, up to `user_burst`), then one of
+    `max_concurrent` slots. When all slots are busy it waits in a FIFO queue
+    of at most `queue_size` for up to `max_wait` seconds. Every refusal is an
+    immediate 429 with Retry-After, so overload never turns into timeouts.
+    """
+    def __init__(
+        self,
+        max_concurrent: int,
+        queue_size: int,
+        max_wait: float,
+        user_rate: float,
+        user_burst: float,
+        max_users: int = 10000,
+    ):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_users = max_users
+        self._buckets: OrderedDict[Hashable, TokenBucket] = OrderedDict()
+        self._waiters: deque[asyncio.Future] = deque()
+        self.active = 0
+        self.admitted = 0
+        self.rejected_user_rate = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.queued_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def acquire(self, user_id: Hashable, needs_slot: bool = True) -> "AdmissionGrant":
+        """
+        Admit one request or raise 429. With `needs_slot` False (the request
+        joins an upstream stream that is already running) only the user's
+        rate limit applies. The caller must release the grant.
+        """
+        bucket = self._bucket(user_id)
+        retry_after = bucket.take()
+        if retry_after:
+            self.rejected_user_rate += 1
+            raise self._too_many("Too many AI requests for this user", retry_after)
+        if needs_slot:
+            try:
+                await self._acquire()
+            except HTTPException:
+                bucket.refund()
+                raise
+        self.admitted += 1
+        return AdmissionGrant(self, needs_slot)
+
+    async def _acquire(self):
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected_queue_full += 1
+            raise self._too_many("AI service is at capacity", self.max_wait)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        started = time.monotonic()
+        try:
+            # the slot is handed over by _release, already counted in `active`
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # granted while timing out: give the slot back
+                self._release()
+            else:
+                waiter.cancel()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self.rejected_timeout += 1
+            raise self._too_many("AI service is at capacity", self.max_wait)
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            waited = time.monotonic() - started
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _bucket(self, user_id: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_id)
+        return bucket
+
+    @staticmethod
+    def _too_many(detail: str, retry_after: float) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "queue_depth": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected_user_rate": self.rejected_user_rate,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "queued_total": self.queued_total,
+            "wait_seconds_avg": round(self.wait_seconds_total / self.queued_total, 4) if self.queued_total else 0.0,
+            "wait_seconds_max": round(self.wait_seconds_max, 4),
+        }
+
+
+class AdmissionGrant:
+    """
+    One admitted request. `release` gives its slot back, if it took one; it
+    is idempotent so every exit path of a response may call it.
+    """
+    __slots__ = ("controller", "has_slot")
+
+    def __init__(self, controller: AdmissionController, has_slot: bool):
+        self.controller = controller
+        self.has_slot = has_slot
+
+    def release(self):
+        if self.has_slot:
+            self.has_slot = False
+            self.controller._release()
+
+
+ai_admission = AdmissionController(
+    max_concurrent=settings.AI_MAX_CONCURRENT_STREAMS,
+    queue_size=settings.AI_QUEUE_SIZE,
+    max_wait=settings.AI_QUEUE_TIMEOUT_SECONDS,
+    user_rate=settings.AI_USER_STREAMS_PER_MINUTE / 60,
+    user_burst=settings.AI_USER_STREAM_BURST,
+)
+metrics.register("ai_admission", ai_admission.snapshot)
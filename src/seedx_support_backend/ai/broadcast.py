@@ -0,0 +1,154 @@
+import asyncio
+from typing import AsyncIterator, Callable, Hashable
+
+from ..infrastructure.metrics import metrics
+
+
+class _Flight:
+    def __init__(self, on_finish: Callable[[], None] | None = None):
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+        # replaced after every chunk; waiting subscribers hold the old one
+        self.changed = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.started = False
+        self.on_finish = on_finish
+
+    def publish(self):
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def finish(self):
+        # at most once: from _drive once the upstream is closed, or from
+        # _leave when the task was cancelled before _drive ever ran
+        on_finish, self.on_finish = self.on_finish, None
+        if on_finish is not None:
+            on_finish()
+
+
+class Subscription:
+    """
+    One subscriber of a flight. Iterating replays the chunks emitted so far
+    and then follows live. `close` is idempotent and also works when the
+    subscription was never iterated.
+    """
+    def __init__(self, broadcaster: "StreamBroadcaster", key: Hashable, flight: _Flight):
+        self.broadcaster = broadcaster
+        self.key = key
+        self.flight = flight
+        self.closed = False
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        flight = self.flight
+        try:
+            sent = 0
+            while True:
+                if sent < len(flight.chunks):
+                    chunk = flight.chunks[sent]
+                    sent += 1
+                    yield chunk
+                elif flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                else:
+                    await flight.changed.wait()
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broadcaster._leave(self.key, self.flight)
+
+
+class StreamBroadcaster:
+    """
+    Single-flight coalescing of identical upstream streams. The first
+    subscriber for a key starts the upstream stream; later subscribers for
+    the same key replay the chunks emitted so far and then follow live.
+    The upstream is cancelled once every subscriber has gone away.
+    """
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self.upstream_streams = 0
+        self.coalesced_subscribers = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    def join(
+        self,
+        key: Hashable,
+        open_stream: Callable[[], AsyncIterator[str]],
+        on_finish: Callable[[], None] | None = None,
+    ) -> Subscription:
+        """
+        Subscribe to the flight for `key`, starting it if there is none. This
+        does not suspend, so whether the caller opens the upstream is decided
+        in the same step that registers it. `on_finish` runs once the upstream
+        started by this call has ended and its response is closed; when an
+        existing flight is joined it runs right away.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(on_finish)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._drive(key, flight, open_stream))
+            self.upstream_streams += 1
+        else:
+            self.coalesced_subscribers += 1
+            if on_finish is not None:
+                on_finish()
+        flight.subscribers += 1
+        return Subscription(self, key, flight)
+
+    def _leave(self, key: Hashable, flight: _Flight):
+        flight.subscribers -= 1
+        if flight.subscribers == 0 and not flight.done:
+            # detach first so a new subscriber starts a fresh flight
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.task.cancel()
+            if not flight.started:
+                flight.finish()
+
+    async def _drive(self, key: Hashable, flight: _Flight, open_stream: Callable[[], AsyncIterator[str]]):
+        flight.started = True
+        stream = None
+        try:
+            stream = open_stream()
+            async for chunk in stream:
+                flight.chunks.append(chunk)
+                flight.publish()
+        except asyncio.CancelledError:
+            flight.error = ConnectionAbortedError("Upstream stream cancelled")
+            raise
+        except Exception as exc:
+            flight.error = exc
+        finally:
+            flight.done = True
+            flight.publish()
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            try:
+                # a cancelled stream is not closed by the loop above; close the
+                # upstream response before on_finish hands the admission slot back
+                if stream is not None:
+                    await stream.aclose()
+            finally:
+                flight.finish()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "upstream_streams": self.upstream_streams,
+            # each coalesced subscriber is one upstream call saved
+            "coalesced_subscribers": self.coalesced_subscribers,
+        }
+
+
+stream_broadcaster = StreamBroadcaster()
+metrics.register("ai_streams", stream_broadcaster.snapshot)
@@ -0,0 +1,91 @@
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("AI upstream is unavailable")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Error-rate breaker over the last `window` upstream attempts. Once at
+    least `min_requests` were seen and the failure share reaches
+    `error_rate`, the circuit opens and calls fail fast for `cooldown`
+    seconds; then a single trial call is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+
+    check() hands the trial a token; only record() or abandon() with that
+    token ends the trial, so calls that were already running when the
+    circuit opened cannot decide it.
+    """
+    def __init__(self, window: int, min_requests: int, error_rate: float, cooldown: float):
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._opened_at: float | None = None
+        self._trial: object | None = None
+        self.opened = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def check(self) -> object | None:
+        """
+        Raise CircuitOpenError unless a call may go upstream now. Returns the
+        trial token when the call is the half-open trial, else None; pass it
+        back to record() or abandon().
+        """
+        state = self.state
+        if state == "closed":
+            return None
+        if state == "half_open" and self._trial is None:
+            self._trial = object()
+            return self._trial
+        self.short_circuited += 1
+        remaining = self.cooldown - (time.monotonic() - self._opened_at)
+        raise CircuitOpenError(max(remaining, 1.0))
+
+    def record(self, success: bool, trial: object | None = None):
+        if self._opened_at is not None:
+            # outcomes of calls started before the circuit opened are dropped
+            if trial is None or trial is not self._trial:
+                return
+            self._trial = None
+            if success:
+                self._opened_at = None
+                self._outcomes.clear()
+            else:
+                self._opened_at = time.monotonic()
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.error_rate:
+            self._opened_at = time.monotonic()
+            self.opened += 1
+
+    def abandon(self, trial: object | None = None):
+        """
+        The call ended without an upstream outcome (e.g. the client left);
+        if it was the half-open trial, let the next call be the trial instead.
+        """
+        if trial is not None and trial is self._trial:
+            self._trial = None
+
+    def snapshot(self) -> dict:
+        outcomes = len(self._outcomes)
+        return {
+            "state": self.state,
+            "error_rate": round(self._outcomes.count(False) / outcomes, 4) if outcomes else 0.0,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
@@ -1,8 +1,25 @@
+from fastapi import Request
+
+from src.config import settings
+from ..infrastructure.metrics import metrics
+from .retrieval import TicketRetriever, ticket_index
 from .service import AIService
 
 
-def get_ai_service() -> AIService:
+def create_ai_service() -> AIService:
+    """
+    Build the app-wide AIService; called once from the app lifespan.
+    """
+    retriever = TicketRetriever(ticket_index) if settings.AI_RETRIEVAL_ENABLED else None
+    service = AIService(retriever=retriever)
+    metrics.register("ai_routing", service.snapshot)
+    for provider in service.providers:
+        metrics.register(f"ai_provider_{provider.name}", provider.snapshot)
+    return service
+
+
+def get_ai_service(request: Request) -> AIService:
     """
-    Dependency to provide a singleton AIService instance.
+    Dependency to provide the singleton AIService instance.
     """
-    return AIService()
\ No newline at end of file
+    return request.app.state.ai_service
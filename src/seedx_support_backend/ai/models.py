@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from ..infrastructure.database import Base
+
+class TicketSummary(Base):
+    """
+    Rolling summary of the messages of a ticket that no longer fit in the
+    prompt verbatim. (summarized_until, last_message_id) is the keyset
+    watermark of the newest message already folded into `summary`.
+    """
+    __tablename__ = "ticket_summaries"
+
+    ticket_id = Column(UUID(as_uuid=True), ForeignKey("tickets.id", ondelete="CASCADE"), primary_key=True)
+    summary = Column(String, default="", nullable=False)
+    summarized_until = Column(DateTime, nullable=True)
+    last_message_id = Column(UUID(as_uuid=True), nullable=True)
+    message_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
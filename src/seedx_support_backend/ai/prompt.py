@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field
+from typing import List, Sequence
+
+from src.config import settings
+from ..tickets.core import TicketRead
+from ..messages.core import MessageRead
+
+SYSTEM_LINE = "You are a helpful customer support assistant."
+# framing tokens charged per conversation turn ("User: ", newline, ...)
+TURN_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English text); good
+    enough for budgeting without pulling in the model's tokenizer.
+    """
+    return len(text) // 4 + 1
+
+
+def format_turn(msg: MessageRead) -> str:
+    role = "AI" if msg.is_ai else "User"
+    return f"{role}: {msg.content}"
+
+
+@dataclass
+class ConversationWindow:
+    """
+    What goes into a prompt: a rolling summary of older turns plus the most
+    recent turns verbatim (oldest first).
+    """
+    summary: str = ""
+    recent: List[MessageRead] = field(default_factory=list)
+
+
+class PromptBuilder:
+    """
+    Builds prompts within a token budget. Older turns are folded into a
+    rolling summary of one clipped line per turn; the summary itself is
+    capped at `summary_budget` by dropping its oldest lines. Up to
+    `related_budget` tokens are reserved for similar resolved tickets.
+    """
+    def __init__(
+        self,
+        token_budget: int = settings.AI_PROMPT_TOKEN_BUDGET,
+        summary_budget: int = settings.AI_SUMMARY_TOKEN_BUDGET,
+        recent_turns: int = settings.AI_PROMPT_RECENT_TURNS,
+        summary_line_chars: int = settings.AI_SUMMARY_LINE_CHARS,
+        related_budget: int = settings.AI_RETRIEVAL_TOKEN_BUDGET if settings.AI_RETRIEVAL_ENABLED else 0,
+    ):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.related_budget = related_budget
+        self.recent_turns = recent_turns
+        self.summary_line_chars = summary_line_chars
+
+    def fold(
+        self, ticket: TicketRead, summary: str, pending: List[MessageRead]
+    ) -> tuple[ConversationWindow, List[MessageRead]]:
+        """
+        Split `pending` (messages newer than the summary, oldest first) into
+        the turns kept verbatim and the turns folded into the summary.
+        Returns the new window and the folded messages.
+        """
+        recent_budget = self.token_budget - self.summary_budget - self.related_budget - estimate_tokens(
+            "\n".join(self._header(ticket))
+        )
+        kept = 0
+        used = 0
+        for msg in reversed(pending):
+            cost = estimate_tokens(msg.content) + TURN_OVERHEAD_TOKENS
+            # always keep the newest turn, it is what the AI has to answer
+            if kept and (kept >= self.recent_turns or used + cost > recent_budget):
+                break
+            kept += 1
+            used += cost
+
+        split = len(pending) - kept
+        folded, recent = pending[:split], pending[split:]
+        if folded:
+            summary = self._extend_summary(summary, folded)
+        return ConversationWindow(summary=summary, recent=recent), folded
+
+    def build(self, ticket: TicketRead, window: ConversationWindow, related: Sequence[str] = ()) -> str:
+        prompt_lines = self._header(ticket)
+        related_lines = self._related(related)
+        if related_lines:
+            prompt_lines.append("Similar resolved tickets:")
+            prompt_lines.extend(related_lines)
+        if window.summary:
+            prompt_lines.append("Summary of earlier conversation:")
+            prompt_lines.append(window.summary)
+        prompt_lines.append("Conversation so far:")
+        prompt_lines.extend(format_turn(msg) for msg in window.recent)
+        prompt_lines.append("AI:")
+        return "\n".join(prompt_lines)
+
+    def _header(self, ticket: TicketRead) -> list[str]:
+        return [
+            SYSTEM_LINE,
+            f"Ticket Title: {ticket.title}",
+            f"Description: {ticket.description}",
+        ]
+
+    def _related(self, related: Sequence[str]) -> list[str]:
+        # best match first; stop at the first one that no longer fits
+        lines = []
+        used = 0
+        for line in related:
+            line = "- " + self._clip(line)
+            cost = estimate_tokens(line)
+            if used + cost > self.related_budget:
+                break
+            lines.append(line)
+            used += cost
+        return lines
+
+    def _clip(self, line: str) -> str:
+        if len(line) > self.summary_line_chars:
+            line = line[: self.summary_line_chars - 1] + "…"
+        return line
+
+    def _extend_summary(self, summary: str, folded: List[MessageRead]) -> str:
+        lines = summary.splitlines() if summary else []
+        for msg in folded:
+            lines.append(self._clip(" ".join(format_turn(msg).split())))
+
+        used = sum(estimate_tokens(line) for line in lines)
+        start = 0
+        while used > self.summary_budget and start < len(lines) - 1:
+            used -= estimate_tokens(lines[start])
+            start += 1
+        return "\n".join(lines[start:])
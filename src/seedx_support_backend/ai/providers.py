@@ -0,0 +1,266 @@
+import asyncio
+import random
+from collections import deque
+from typing import AsyncIterator
+
+import httpx
+
+from src.config import settings
+from .circuit import CircuitBreaker, CircuitOpenError
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Keep-alive (and HTTP/2 when the upstream offers it) client, so warm
+    requests skip DNS, TCP and TLS setup.
+    """
+    return httpx.AsyncClient(
+        http2=settings.AI_HTTP2,
+        # reads are bounded per phase by AIProvider (first token / idle deadlines)
+        timeout=httpx.Timeout(None, connect=settings.AI_CONNECT_TIMEOUT, pool=settings.AI_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.AI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.AI_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+class AIUpstreamError(Exception):
+    """
+    The upstream stream failed; `retry_after` is set when the circuit is open.
+    """
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _RetryableError(Exception):
+    pass
+
+
+def create_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        window=settings.AI_BREAKER_WINDOW,
+        min_requests=settings.AI_BREAKER_MIN_REQUESTS,
+        error_rate=settings.AI_BREAKER_ERROR_RATE,
+        cooldown=settings.AI_BREAKER_COOLDOWN_SECONDS,
+    )
+
+
+def backoff_delay(attempt: int, base: float = settings.AI_RETRY_BACKOFF_SECONDS, cap: float = 2.0) -> float:
+    # full jitter, so retries of a burst do not hit the upstream in lockstep
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class LatencyTracker:
+    """
+    Time-to-first-token of a provider: an EWMA for routing and the p95 of
+    the last `window` samples for hedging.
+    """
+    def __init__(self, alpha: float = settings.AI_TTFT_EWMA_ALPHA, window: int = 200):
+        self.alpha = alpha
+        self.ewma: float | None = None
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._update(seconds)
+        self._samples.append(seconds)
+
+    def penalize(self, seconds: float):
+        """
+        A stream that failed before its first token: moves the EWMA, so the
+        provider drops behind measured ones, but stays out of the p95.
+        """
+        self._update(seconds)
+
+    def _update(self, seconds: float):
+        self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+
+    def p95(self) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class AIProvider:
+    """
+    One upstream endpoint (and optional model) with its own connection pool,
+    circuit breaker and latency statistics.
+
+    Every stream has deadlines: connect, first token and the idle gap between
+    chunks. Failures before the first chunk are retried with jittered
+    backoff; once a chunk went out the stream is not replayed. Attempts feed
+    a circuit breaker that fails calls fast while the upstream is unhealthy.
+    """
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        api_key: str,
+        model: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        breaker: CircuitBreaker | None = None,
+        first_token_timeout: float = settings.AI_FIRST_TOKEN_TIMEOUT,
+        idle_timeout: float = settings.AI_IDLE_TIMEOUT,
+        retries: int = settings.AI_RETRIES,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model = model
+        self.client = client or create_http_client()
+        self.breaker = breaker or create_circuit_breaker()
+        self.ttft = LatencyTracker()
+        self.first_token_timeout = first_token_timeout
+        self.idle_timeout = idle_timeout
+        self.retries = retries
+        self.streams = 0
+        self.retried = 0
+        self.timeouts = 0
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.state != "open"
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        body = {"prompt": prompt, "stream": True}
+        if self.model:
+            body["model"] = self.model
+
+        self.streams += 1
+        loop = asyncio.get_running_loop()
+        requested_at = loop.time()
+        attempt = 0
+        while True:
+            try:
+                trial = self.breaker.check()
+            except CircuitOpenError as e:
+                raise AIUpstreamError(str(e), retry_after=e.retry_after) from e
+            started = False
+            outcome = None
+            try:
+                async for chunk in self._stream_once(headers, body):
+                    if not started:
+                        started = True
+                        self.ttft.record(loop.time() - requested_at)
+                    yield chunk
+                outcome = True
+                return
+            except _RetryableError as e:
+                outcome = False
+                if started:
+                    raise AIUpstreamError(f"AI upstream stream interrupted: {e}") from e
+                if attempt >= self.retries:
+                    # counted as at least the whole first-token budget for routing
+                    self.ttft.penalize(max(loop.time() - requested_at, self.first_token_timeout))
+                    raise AIUpstreamError(f"AI upstream unavailable: {e}") from e
+            except httpx.HTTPStatusError as e:
+                # 4xx: our request is wrong, retrying will not help
+                outcome = True
+                raise AIUpstreamError(f"AI upstream rejected the request ({e.response.status_code})") from e
+            finally:
+                if outcome is None:
+                    self.breaker.abandon(trial)
+                else:
+                    self.breaker.record(outcome, trial)
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def _stream_once(self, headers: dict, body: dict) -> AsyncIterator[str]:
+        """
+        One upstream attempt. Every read gets its own deadline: the first-token
+        budget until the first chunk, then `idle_timeout` since the last line.
+        No timer spans a yield, so the consumer may take its time with a chunk
+        and may advance this iterator from any task.
+        """
+        loop = asyncio.get_running_loop()
+        phase = "first token"
+        deadline = loop.time() + self.first_token_timeout
+        resp = None
+        try:
+            request = self.client.build_request("POST", self.base_url, headers=headers, json=body)
+            resp = await asyncio.wait_for(self.client.send(request, stream=True), self.first_token_timeout)
+            if resp.status_code >= 500 or resp.status_code == 429:
+                raise _RetryableError(f"status {resp.status_code}")
+            resp.raise_for_status()
+            lines = resp.aiter_lines()
+            while True:
+                try:
+                    line = await asyncio.wait_for(anext(lines), deadline - loop.time())
+                except StopAsyncIteration:
+                    return
+                if not line:
+                    # keep-alives count as activity once the stream has started
+                    if phase == "idle":
+                        deadline = loop.time() + self.idle_timeout
+                    continue
+                if line.startswith("data:"):
+                    data = line.removeprefix("data:").strip()
+                    if data == "[DONE]":
+                        await self._drain(lines)
+                        return
+                else:
+                    data = line
+                yield data
+                phase = "idle"
+                deadline = loop.time() + self.idle_timeout
+        except TimeoutError as e:
+            self.timeouts += 1
+            raise _RetryableError(f"{phase} deadline exceeded") from e
+        except (httpx.TransportError, httpx.StreamError) as e:
+            raise _RetryableError(type(e).__name__) from e
+        finally:
+            if resp is not None:
+                await resp.aclose()
+
+    async def _drain(self, lines: AsyncIterator[str]):
+        """
+        Read what follows [DONE] up to the end of the body, so the connection
+        goes back to the pool instead of being closed half-read.
+        """
+        try:
+            async with asyncio.timeout(self.idle_timeout):
+                async for _ in lines:
+                    pass
+        except TimeoutError:
+            # the upstream kept the body open; drop the connection instead
+            pass
+
+    def snapshot(self) -> dict:
+        p95 = self.ttft.p95()
+        return {
+            **self.breaker.snapshot(),
+            "streams": self.streams,
+            "ttft_ewma_ms": round(self.ttft.ewma * 1000, 1) if self.ttft.ewma is not None else None,
+            "ttft_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "retried": self.retried,
+            "timeouts": self.timeouts,
+        }
+
+
+def providers_from_settings() -> list[AIProvider]:
+    """
+    AI_PROVIDERS entries (``{"name", "url", "api_key", "model"}``), or the
+    single GROK_API_URL endpoint when none are configured.
+    """
+    if not settings.AI_PROVIDERS:
+        return [AIProvider("default", settings.GROK_API_URL, settings.GROK_API_KEY)]
+    return [
+        AIProvider(
+            name=p.get("name") or f"provider{i}",
+            base_url=p["url"],
+            api_key=p.get("api_key", settings.GROK_API_KEY),
+            model=p.get("model"),
+        )
+        for i, p in enumerate(settings.AI_PROVIDERS)
+    ]
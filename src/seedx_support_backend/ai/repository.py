@@ -0,0 +1,107 @@
+import uuid
+from typing import AsyncIterator, Iterator, Sequence
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..messages.models import Message
+from ..tickets.models import Ticket
+from .models import TicketSummary
+
+# tickets in these states feed the retrieval index
+INDEXED_STATUSES = ("resolved", "closed")
+
+class TicketSummaryRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, ticket_id: uuid.UUID) -> TicketSummary | None:
+        return self.db.get(TicketSummary, ticket_id)
+
+    def save(self, values: dict) -> None:
+        self.db.execute(upsert_summary_stmt(values))
+        self.db.commit()
+
+
+class AsyncTicketSummaryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, ticket_id: uuid.UUID) -> TicketSummary | None:
+        return await self.db.get(TicketSummary, ticket_id)
+
+    async def save(self, values: dict) -> None:
+        await self.db.execute(upsert_summary_stmt(values))
+        await self.db.commit()
+
+
+class ResolvedTicketRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def by_ids(self, ticket_ids: Sequence[uuid.UUID]) -> list[Row]:
+        return self.db.execute(resolved_tickets_stmt(ticket_ids)).all()
+
+    def iter_all(self, batch_size: int) -> Iterator[Row]:
+        """
+        Every resolved ticket, read through a server-side cursor `batch_size` rows at a time.
+        """
+        return iter(self.db.execute(resolved_tickets_stmt().execution_options(yield_per=batch_size)))
+
+
+class AsyncResolvedTicketRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def by_ids(self, ticket_ids: Sequence[uuid.UUID]) -> list[Row]:
+        return (await self.db.execute(resolved_tickets_stmt(ticket_ids))).all()
+
+    async def iter_all(self, batch_size: int) -> AsyncIterator[Row]:
+        result = await self.db.stream(resolved_tickets_stmt().execution_options(yield_per=batch_size))
+        async for row in result:
+            yield row
+
+
+def resolved_tickets_stmt(ticket_ids: Sequence[uuid.UUID] | None = None):
+    """
+    (id, user_id, title, description, resolution) of resolved tickets; the
+    resolution is the newest AI answer, found through the
+    (ticket_id, created_at, id) message index.
+    """
+    resolution = (
+        select(Message.content)
+        .where(Message.ticket_id == Ticket.id, Message.is_ai.is_(True))
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+        .correlate(Ticket)
+        .scalar_subquery()
+    )
+    stmt = select(
+        Ticket.id, Ticket.user_id, Ticket.title, Ticket.description, resolution.label("resolution")
+    ).where(Ticket.status.in_(INDEXED_STATUSES))
+    if ticket_ids is not None:
+        stmt = stmt.where(Ticket.id.in_(ticket_ids))
+    return stmt
+
+
+def upsert_summary_stmt(values: dict):
+    """
+    INSERT .. ON CONFLICT DO UPDATE of a ticket summary. Concurrent first
+    requests for a ticket both insert; the update only applies when it moves
+    the (summarized_until, last_message_id) watermark forward.
+    """
+    stmt = insert(TicketSummary).values(**values)
+    current = tuple_(TicketSummary.summarized_until, TicketSummary.last_message_id)
+    proposed = tuple_(stmt.excluded.summarized_until, stmt.excluded.last_message_id)
+    return stmt.on_conflict_do_update(
+        index_elements=[TicketSummary.ticket_id],
+        set_={
+            "summary": stmt.excluded.summary,
+            "summarized_until": stmt.excluded.summarized_until,
+            "last_message_id": stmt.excluded.last_message_id,
+            "message_count": stmt.excluded.message_count,
+            "updated_at": stmt.excluded.updated_at,
+        },
+        where=or_(TicketSummary.summarized_until.is_(None), current < proposed),
+    )
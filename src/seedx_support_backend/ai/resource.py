@@ -1,49 +1,121 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import json
 from uuid import UUID
 from typing import AsyncIterator
 
-from ..infrastructure.database import get_db
+from ..infrastructure.database import get_db, get_async_db
 from src.middleware import get_current_user
-from ..tickets.repository import TicketRepository
-from ..tickets.service import TicketService
-from ..messages.repository import MessageRepository
-from ..messages.service import MessageService
+from ..tickets.repository import TicketRepository, AsyncTicketRepository
+from ..tickets.core import TicketRead
+from ..tickets.service import TicketService, AsyncTicketService
+from ..messages.repository import MessageRepository, AsyncMessageRepository
+from .admission import ai_admission
+from .broadcast import Subscription, stream_broadcaster
 from .dependencies import get_ai_service
-from .service import AIService
+from .prompt import ConversationWindow
+from .sse import SSEResponse, sse_writer
+from .repository import TicketSummaryRepository, AsyncTicketSummaryRepository
+from .providers import AIUpstreamError
+from .service import AIService, ConversationService, AsyncConversationService
 
 router = APIRouter(prefix="/tickets/{ticket_id}/ai-response", tags=["ai"])
+# Same route on AsyncSession, mounted instead of `router` when DATABASE_ASYNC is set
+async_router = APIRouter(prefix="/tickets/{ticket_id}/ai-response", tags=["ai"])
 
-async def ai_event_generator(
-    ticket_id: UUID,
-    current_user=Depends(get_current_user),
-    db=Depends(get_db),
-    ai_svc: AIService = Depends(get_ai_service),
-) -> AsyncIterator[str]:
-    # Verify ticket ownership
-    ticket_repo = TicketRepository(db)
-    ticket_svc = TicketService(ticket_repo)
-    ticket = ticket_svc.get_ticket(ticket_id)
-    if ticket.user_id != current_user.id:
+def history_key(ticket_id: UUID, window: ConversationWindow) -> tuple:
+    """
+    Coalescing key: the ticket plus its newest message, i.e. the history version.
+    """
+    return ticket_id, window.recent[-1].id if window.recent else None
+
+
+def error_event(error: AIUpstreamError) -> str:
+    """
+    Terminal SSE event; the response status is already sent by the time upstream fails.
+    """
+    payload = {"error": str(error)}
+    if error.retry_after is not None:
+        payload["retry_after"] = round(error.retry_after)
+    return f"event: error\ndata: {json.dumps(payload)}\n\n"
+
+
+def load_window(db: Session, ticket_id: UUID, user_id: UUID) -> tuple[TicketRead, ConversationWindow]:
+    """
+    The caller's ticket and its conversation window (rolling summary + recent turns).
+    """
+    ticket = TicketService(TicketRepository(db)).get_ticket(ticket_id)
+    if ticket.user_id != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    conversation_svc = ConversationService(TicketSummaryRepository(db), MessageRepository(db))
+    return ticket, conversation_svc.window(ticket)
+
+
+async def aload_window(db: AsyncSession, ticket_id: UUID, user_id: UUID) -> tuple[TicketRead, ConversationWindow]:
+    ticket = await AsyncTicketService(AsyncTicketRepository(db)).get_ticket(ticket_id)
+    if ticket.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    conversation_svc = AsyncConversationService(AsyncTicketSummaryRepository(db), AsyncMessageRepository(db))
+    return ticket, await conversation_svc.window(ticket)
+
+
+async def ai_events(subscription: Subscription) -> AsyncIterator[str]:
+    """
+    SSE body: the subscribed AI chunks as coalesced frames.
+    """
+    try:
+        async for frame in sse_writer.frames(subscription):
+            yield frame
+    except AIUpstreamError as e:
+        yield error_event(e)
+    finally:
+        subscription.close()
 
-    # Fetch message history
-    msg_repo = MessageRepository(db)
-    msg_svc = MessageService(msg_repo)
-    history = msg_svc.list_messages(ticket_id)
 
-    # Stream AI chunks as SSE
-    async for chunk in ai_svc.stream_chat_response(ticket, history):
-        payload = {"content": chunk}
-        yield f"data: {json.dumps(payload)}\n\n"
+async def ai_response(ai_svc: AIService, ticket: TicketRead, window: ConversationWindow, user_id: UUID) -> SSEResponse:
+    """
+    Admission (429 when overloaded) happens before the response starts.
+    Concurrent requests for the same history share one upstream stream, and
+    only the request that opens it holds a slot, until the upstream ends.
+    """
+    key = history_key(ticket.id, window)
+    # without a slot acquire() does not suspend, so no flight can start or
+    # end between this check and join(); a slot taken while another request
+    # opened the same stream is handed back by join() right away
+    grant = await ai_admission.acquire(user_id, needs_slot=not stream_broadcaster.in_flight(key))
+    subscription = stream_broadcaster.join(
+        key,
+        lambda: ai_svc.stream_chat_response(ticket, window.recent, window.summary),
+        on_finish=grant.release,
+    )
+    return SSEResponse(ai_events(subscription), on_close=subscription.close)
+
 
 @router.get("", response_model=None)
 async def stream_ai(
     ticket_id: UUID,
-    event_stream: AsyncIterator[str] = Depends(ai_event_generator),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+    ai_svc: AIService = Depends(get_ai_service),
+):
+    """
+    SSE endpoint that streams AI-generated responses for a given ticket.
+    """
+    ticket, window = await run_in_threadpool(load_window, db, ticket_id, current_user.id)
+    return await ai_response(ai_svc, ticket, window, current_user.id)
+
+
+@async_router.get("", response_model=None)
+async def stream_ai_async(
+    ticket_id: UUID,
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    ai_svc: AIService = Depends(get_ai_service),
 ):
     """
     SSE endpoint that streams AI-generated responses for a given ticket.
     """
-    return StreamingResponse(event_stream, media_type="text/event-stream")
+    ticket, window = await aload_window(db, ticket_id, current_user.id)
+    return await ai_response(ai_svc, ticket, window, current_user.id)
@@ -0,0 +1,414 @@
+import asyncio
+import fcntl
+import os
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Sequence
+
+import numpy as np
+import orjson
+
+from src.config import settings
+from ..infrastructure.metrics import metrics
+from ..messages.core import MessageRead
+from ..tickets.core import TicketRead
+
+WORD = re.compile(r"[a-z0-9]+")
+VECTORS_FILE = "vectors.f32"
+META_FILE = "tickets.jsonl"
+LOCK_FILE = ".lock"
+
+
+class HashingVectorizer:
+    """
+    Bag of words and word bigrams hashed (CRC32, signed) into `dim` buckets
+    and L2-normalised, so dot products are cosine similarities. Stateless:
+    no vocabulary to fit, no model to download, and vectors of old and new
+    tickets stay comparable.
+    """
+    def __init__(self, dim: int = settings.AI_RETRIEVAL_DIM):
+        self.dim = dim
+
+    def features(self, text: str) -> list[str]:
+        words = WORD.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            row = out[i]
+            for feature in self.features(text):
+                h = zlib.crc32(feature.encode())
+                row[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        # sublinear term frequency, then unit length
+        np.copysign(np.log1p(np.abs(out)), out, out=out)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+@dataclass(slots=True)
+class IndexedTicket:
+    ticket_id: str
+    user_id: str
+    title: str
+    resolution: str
+
+
+def key64(value: str) -> int:
+    # both halves, so UUIDs that share a prefix still get distinct keys
+    n = int(value.replace("-", ""), 16)
+    return (n >> 64) ^ (n & 0xFFFFFFFFFFFFFFFF)
+
+
+class TicketIndex:
+    """
+    Embeddings of resolved tickets in a directory shared by all workers:
+    `vectors.f32` is one contiguous float32 matrix (row-major, `dim` columns)
+    read through a memory map, `tickets.jsonl` holds one metadata line per
+    row. Writers append both under an exclusive file lock (vectors first),
+    so readers only trust rows present in both files and pick up new rows
+    on their next query. A ticket indexed again (reopened and resolved
+    later) keeps only its newest row live.
+
+    Searches score every live row with blocked matrix products, keeping a
+    running top-k per query, so memory stays bounded by `block_rows`.
+    """
+    def __init__(
+        self,
+        path: str = settings.AI_RETRIEVAL_INDEX_DIR,
+        dim: int = settings.AI_RETRIEVAL_DIM,
+        vectorizer: HashingVectorizer | None = None,
+        block_rows: int = 65536,
+        latency_window: int = 1000,
+    ):
+        self.path = path
+        self.dim = dim
+        self.vectorizer = vectorizer or HashingVectorizer(dim)
+        self.block_rows = block_rows
+        self._lock = threading.Lock()
+        self._reset_state()
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self.queries = 0
+        self.scans = 0
+        self.added = 0
+
+    def _reset_state(self):
+        self._matrix: np.ndarray | None = None
+        self._inode: int | None = None
+        self._meta_read = 0
+        self._offsets = np.zeros(0, dtype=np.int64)
+        self._owners = np.zeros(0, dtype=np.uint64)
+        self._tickets = np.zeros(0, dtype=np.uint64)
+        self._live = np.zeros(0, dtype=bool)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file(LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def add(self, tickets: Sequence[IndexedTicket], texts: Sequence[str]):
+        """
+        Append `tickets`, embedded from `texts` (same order).
+        """
+        if tickets:
+            self.add_vectors(tickets, self.vectorizer.transform(texts))
+
+    def add_vectors(self, tickets: Sequence[IndexedTicket], vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        lines = b"".join(orjson.dumps(t) + b"\n" for t in tickets)
+        with self._write_lock():
+            self._truncate_partial()
+            with open(self._file(VECTORS_FILE), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._file(META_FILE), "ab") as f:
+                f.write(lines)
+        self.added += len(tickets)
+
+    def _truncate_partial(self):
+        """
+        Drop the tail of a writer that died between the two appends, so
+        vector rows and metadata lines stay aligned.
+        """
+        try:
+            with open(self._file(META_FILE), "rb") as f:
+                meta = f.read()
+        except FileNotFoundError:
+            meta = b""
+        complete = meta.rfind(b"\n") + 1
+        if complete != len(meta):
+            os.truncate(self._file(META_FILE), complete)
+        rows = meta.count(b"\n", 0, complete)
+        vectors = self._file(VECTORS_FILE)
+        if os.path.exists(vectors) and os.path.getsize(vectors) != rows * self.dim * 4:
+            os.truncate(vectors, rows * self.dim * 4)
+
+    def clear(self):
+        with self._write_lock():
+            for name in (VECTORS_FILE, META_FILE):
+                try:
+                    os.remove(self._file(name))
+                except FileNotFoundError:
+                    pass
+
+    def refresh(self):
+        """
+        Map rows appended since the last call; reload from scratch when the
+        files were replaced or cleared.
+        """
+        with self._lock:
+            try:
+                meta_stat = os.stat(self._file(META_FILE))
+                vectors_size = os.path.getsize(self._file(VECTORS_FILE))
+            except FileNotFoundError:
+                self._reset_state()
+                return
+            if meta_stat.st_ino != self._inode or meta_stat.st_size < self._meta_read:
+                self._reset_state()
+                self._inode = meta_stat.st_ino
+            if meta_stat.st_size == self._meta_read:
+                return
+
+            with open(self._file(META_FILE), "rb") as f:
+                f.seek(self._meta_read)
+                chunk = f.read(meta_stat.st_size - self._meta_read)
+            chunk = chunk[: chunk.rfind(b"\n") + 1]
+            room = vectors_size // (self.dim * 4) - len(self._offsets)
+            lines = chunk.splitlines(keepends=True)[: max(room, 0)]
+            if not lines:
+                return
+
+            offsets, owners, tickets = [], [], []
+            position = self._meta_read
+            for line in lines:
+                entry = orjson.loads(line)
+                offsets.append(position)
+                owners.append(key64(entry["user_id"]))
+                tickets.append(key64(entry["ticket_id"]))
+                position += len(line)
+            self._meta_read = position
+            self._offsets = np.concatenate([self._offsets, np.array(offsets, dtype=np.int64)])
+            self._owners = np.concatenate([self._owners, np.array(owners, dtype=np.uint64)])
+            self._tickets = np.concatenate([self._tickets, np.array(tickets, dtype=np.uint64)])
+
+            rows = len(self._offsets)
+            # the newest row of each ticket is the live one
+            live = np.zeros(rows, dtype=bool)
+            _, last = np.unique(self._tickets[::-1], return_index=True)
+            live[rows - 1 - last] = True
+            self._live = live
+            self._matrix = np.memmap(self._file(VECTORS_FILE), dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def search_many(
+        self, queries: np.ndarray, k: int, user_id: str | None = None
+    ) -> List[List[tuple[float, IndexedTicket]]]:
+        """
+        Top `k` (score, ticket) per query row, best first; with `user_id`
+        only that user's tickets are candidates.
+        """
+        started = time.perf_counter()
+        self.refresh()
+        with self._lock:
+            matrix, live, owners, offsets = self._matrix, self._live, self._owners, self._offsets
+        if matrix is None or not len(queries):
+            return [[] for _ in queries]
+
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if user_id is not None:
+            rows = np.flatnonzero(live & (owners == np.uint64(key64(user_id))))
+            if not len(rows):
+                return [[] for _ in queries]
+            scores, found = top_k(queries, matrix[rows], k, self.block_rows)
+            found = np.where(found >= 0, rows[np.maximum(found, 0)], -1)
+        else:
+            scores, found = top_k(queries, matrix, k, self.block_rows, None if live.all() else live)
+
+        results = []
+        with open(self._file(META_FILE), "rb") as f:
+            for query_scores, query_rows in zip(scores, found):
+                hits = []
+                for score, row in zip(query_scores, query_rows):
+                    if row < 0 or not np.isfinite(score):
+                        break
+                    f.seek(offsets[row])
+                    hits.append((float(score), IndexedTicket(**orjson.loads(f.readline()))))
+                results.append(hits)
+
+        self.queries += len(queries)
+        self.scans += 1
+        self._latencies.append(time.perf_counter() - started)
+        return results
+
+    def search(self, text: str, k: int, user_id: str | None = None) -> List[tuple[float, IndexedTicket]]:
+        return self.search_many(self.vectorizer.transform([text]), k, user_id)[0]
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def quantile(q: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000, 3)
+
+        return {
+            "rows": len(self._offsets),
+            "live_rows": int(self._live.sum()),
+            "dim": self.dim,
+            "matrix_bytes": len(self._offsets) * self.dim * 4,
+            "added": self.added,
+            "queries": self.queries,
+            "queries_per_scan": round(self.queries / self.scans, 2) if self.scans else 0.0,
+            "scan_ms_p50": quantile(0.5),
+            "scan_ms_p95": quantile(0.95),
+        }
+
+
+def top_k(
+    queries: np.ndarray, matrix: np.ndarray, k: int, block_rows: int, live: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Scores and row numbers of the `k` best rows of `matrix` for each query,
+    best first; missing slots have row -1 and score -inf. The matrix is
+    scanned `block_rows` at a time (one GEMM per block for all queries).
+    """
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+    for start in range(0, len(matrix), block_rows):
+        block = np.asarray(matrix[start:start + block_rows])
+        scores = queries @ block.T
+        if live is not None:
+            scores[:, ~live[start:start + len(block)]] = -np.inf
+        if scores.shape[1] > k:
+            picked = np.argpartition(scores, -k, axis=1)[:, -k:]
+            scores = np.take_along_axis(scores, picked, axis=1)
+        else:
+            picked = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_rows = np.concatenate([best_rows, picked + start], axis=1)
+        keep = np.argpartition(merged_scores, -k, axis=1)[:, -k:]
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_rows = np.take_along_axis(merged_rows, keep, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_rows = np.take_along_axis(best_rows, order, axis=1)
+    best_rows[~np.isfinite(best_scores)] = -1
+    return best_scores, best_rows
+
+
+def ticket_text(title: str, description: str, resolution: str | None) -> str:
+    return "\n".join(part for part in (title, description, resolution) if part)
+
+
+def index_rows(index: TicketIndex, rows: Sequence) -> int:
+    """
+    Add (id, user_id, title, description, resolution) rows from
+    ResolvedTicketRepository; tickets without an AI answer are skipped.
+    Returns how many were indexed.
+    """
+    rows = [row for row in rows if row.resolution]
+    index.add(
+        [IndexedTicket(str(r.id), str(r.user_id), r.title, r.resolution) for r in rows],
+        [ticket_text(r.title, r.description, r.resolution) for r in rows],
+    )
+    return len(rows)
+
+
+class SearchBatcher:
+    """
+    Runs concurrent index-wide searches as one scan: queries arriving while
+    a scan is running are queued and go out together (up to `max_batch`)
+    in the next one. A lone query starts at once, so batching adds no wait;
+    under load the matrix is read once per batch instead of once per query.
+    """
+    def __init__(self, index: TicketIndex, max_batch: int = 64):
+        self.index = index
+        self.max_batch = max_batch
+        self._pending: list[tuple[np.ndarray, int, asyncio.Future]] = []
+        self._drainer: asyncio.Task | None = None
+
+    async def search(self, vector: np.ndarray, k: int) -> List[tuple[float, IndexedTicket]]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((vector, k, future))
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self):
+        while self._pending:
+            batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch:]
+            batch = [item for item in batch if not item[2].done()]
+            if not batch:
+                continue
+            try:
+                results = await asyncio.to_thread(
+                    self.index.search_many, np.stack([v for v, _, _ in batch]), max(k for _, k, _ in batch)
+                )
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, k, future), hits in zip(batch, results):
+                if not future.done():
+                    future.set_result(hits[:k])
+
+
+class TicketRetriever:
+    """
+    Finds resolved tickets similar to the one being answered and renders
+    them as prompt lines. Unless `shared`, only the same user's tickets are
+    searched, so one customer's answers never leak into another's prompt.
+    """
+    def __init__(
+        self,
+        index: TicketIndex,
+        top_k: int = settings.AI_RETRIEVAL_TOP_K,
+        min_score: float = settings.AI_RETRIEVAL_MIN_SCORE,
+        shared: bool = settings.AI_RETRIEVAL_SHARED,
+        query_turns: int = 3,
+    ):
+        self.index = index
+        self.top_k = top_k
+        self.min_score = min_score
+        self.shared = shared
+        self.query_turns = query_turns
+        self.batcher = SearchBatcher(index)
+
+    async def related(self, ticket: TicketRead, history: List[MessageRead]) -> List[str]:
+        """
+        Prompt lines for the best matches. Searches run in a worker thread
+        (numpy releases the GIL for the matrix products).
+        """
+        asked = [m.content for m in history if not m.is_ai][-self.query_turns:]
+        text = ticket_text(ticket.title, ticket.description, "\n".join(asked))
+        vector = self.index.vectorizer.transform([text])
+        # one extra: the ticket itself may be indexed (reopened after resolving)
+        if self.shared:
+            hits = await self.batcher.search(vector[0], self.top_k + 1)
+        else:
+            # a user's own rows are few; gathered and scored without a full scan
+            hits = (await asyncio.to_thread(
+                self.index.search_many, vector, self.top_k + 1, str(ticket.user_id)
+            ))[0]
+        return [
+            f"{hit.title}: {' '.join(hit.resolution.split())}"
+            for score, hit in hits
+            if score >= self.min_score and hit.ticket_id != str(ticket.id)
+        ][: self.top_k]
+
+
+ticket_index = TicketIndex()
+metrics.register("ai_retrieval", ticket_index.snapshot)
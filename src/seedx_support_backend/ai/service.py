@@ -1,4 +1,4 @@
-import httpx
+import asyncio
 from typing import AsyncIterator, List
 from datetime import datetime
 from uuid import UUID
@@ -6,49 +6,258 @@ from uuid import UUID
 from src.config import settings
 from ..tickets.core import TicketRead
 from ..messages.core import MessageRead
+from ..messages.repository import MessageRepository, AsyncMessageRepository
+from ..messages.service import MessageService
+from .models import TicketSummary
+from .prompt import ConversationWindow, PromptBuilder
+from .providers import AIProvider, AIUpstreamError, providers_from_settings
+from .repository import (
+    AsyncResolvedTicketRepository,
+    AsyncTicketSummaryRepository,
+    ResolvedTicketRepository,
+    TicketSummaryRepository,
+)
+from .retrieval import TicketIndex, TicketRetriever, index_rows
+
 
 class AIService:
     """
-    Handles streaming AI responses via Groq API.
+    Handles streaming AI responses over one or more upstream providers.
+    Meant to live for the whole app lifetime: each provider owns a pooled
+    HTTP client.
+
+    Providers are tried in order of their time-to-first-token EWMA, skipping
+    those whose circuit is open; one that fails before its first chunk hands
+    over to the next. With `hedge` on, a second provider is started when the
+    first has not produced a token within its p95 TTFT (at least
+    `hedge_min_delay`), and whichever emits first wins; the other is cancelled.
+
+    With a `retriever`, similar resolved tickets are added to the prompt.
     """
-    def __init__(self, api_key: str = settings.GROK_API_KEY, base_url: str = settings.GROK_API_URL):
-        self.api_key = api_key
-        self.base_url = base_url
+    def __init__(
+        self,
+        providers: List[AIProvider] | None = None,
+        prompt_builder: PromptBuilder | None = None,
+        hedge: bool = settings.AI_HEDGE,
+        hedge_min_delay: float = settings.AI_HEDGE_MIN_DELAY_SECONDS,
+        retriever: TicketRetriever | None = None,
+    ):
+        self.providers = providers or providers_from_settings()
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.retriever = retriever
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    async def aclose(self):
+        for provider in self.providers:
+            await provider.aclose()
+
+    def ranked(self) -> List[AIProvider]:
+        """
+        Providers by TTFT EWMA; ones without samples yet come first so they
+        get measured. A failure before the first token counts as a slow
+        sample (see LatencyTracker.penalize), so a provider that never
+        answers drops behind the measured ones. If every circuit is open
+        they are all returned and fail fast.
+        """
+        available = [p for p in self.providers if p.available] or list(self.providers)
+        return sorted(available, key=lambda p: p.ttft.ewma or 0.0)
+
+    def hedge_delay(self, provider: AIProvider) -> float:
+        return max(self.hedge_min_delay, provider.ttft.p95() or 0.0)
 
     async def stream_chat_response(
         self,
         ticket: TicketRead,
         message_history: List[MessageRead],
+        summary: str = "",
     ) -> AsyncIterator[str]:
+        """
+        `message_history` is the verbatim part of the conversation; older
+        turns arrive condensed in `summary` (see ConversationService).
+        """
+        related = []
+        if self.retriever is not None:
+            related = await self.retriever.related(ticket, message_history)
+
         # Build the prompt
-        prompt_lines = [
-            "You are a helpful customer support assistant.",
-            f"Ticket Title: {ticket.title}",
-            f"Description: {ticket.description}",
-            "Conversation so far:"
-        ]
-        for msg in message_history:
-            role = "AI" if msg.is_ai else "User"
-            prompt_lines.append(f"{role}: {msg.content}")
-        prompt_lines.append("AI:")
-        prompt = "\n".join(prompt_lines)
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        body = {"prompt": prompt, "stream": True}
+        prompt = self.prompt_builder.build(
+            ticket, ConversationWindow(summary=summary, recent=message_history), related
+        )
 
-        async with httpx.AsyncClient(timeout=None) as client:
-            async with client.stream("POST", self.base_url, headers=headers, json=body) as resp:
-                resp.raise_for_status()
-                async for line in resp.aiter_lines():
-                    if not line:
+        ranked = self.ranked()
+        error: AIUpstreamError | None = None
+        while ranked:
+            primary = ranked.pop(0)
+            secondary = ranked.pop(0) if self.hedge and ranked else None
+            if error is not None:
+                self.failovers += 1
+            try:
+                stream, first = await self._first_chunk(prompt, primary, secondary)
+            except AIUpstreamError as e:
+                error = e
+                continue
+            try:
+                if first is not None:
+                    yield first
+                    async for chunk in stream:
+                        yield chunk
+            finally:
+                await stream.aclose()
+            return
+        raise error
+
+    async def _first_chunk(
+        self, prompt: str, primary: AIProvider, secondary: AIProvider | None
+    ) -> tuple[AsyncIterator[str], str | None]:
+        """
+        Open `primary` (and, when hedging, `secondary` after the hedge delay)
+        and return the stream that produced the first chunk, with that chunk.
+        Raises the first AIUpstreamError if every started stream failed.
+        """
+        racers: dict[asyncio.Future, AsyncIterator[str]] = {}
+
+        def start(provider: AIProvider) -> AsyncIterator[str]:
+            stream = provider.stream(prompt)
+            racers[asyncio.ensure_future(anext(stream))] = stream
+            return stream
+
+        start(primary)
+        hedge = None
+        error: AIUpstreamError | None = None
+        try:
+            if secondary is not None:
+                done, _ = await asyncio.wait(racers, timeout=self.hedge_delay(primary))
+                if not done:
+                    self.hedged += 1
+                    hedge = start(secondary)
+                    secondary = None
+            while racers:
+                done, _ = await asyncio.wait(racers, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    winner = racers.pop(task)
+                    try:
+                        first = task.result()
+                    except StopAsyncIteration:
+                        first = None
+                    except AIUpstreamError as e:
+                        error = error or e
+                        # the primary failed before the hedge delay: fail over right away
+                        if secondary is not None:
+                            self.failovers += 1
+                            start(secondary)
+                            secondary = None
                         continue
-                    if line.startswith("data:"):
-                        data = line.removeprefix("data:").strip()
-                        if data == "[DONE]":
-                            break
-                        yield data
-                    else:
-                        yield line
+                    if winner is hedge:
+                        self.hedge_wins += 1
+                    return winner, first
+            raise error
+        finally:
+            # cancel the losers as soon as the winner has emitted
+            for task, loser in racers.items():
+                task.cancel()
+                await asyncio.wait((task,))
+                await loser.aclose()
+
+    def snapshot(self) -> dict:
+        return {
+            "providers": len(self.providers),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+        }
+
+
+class ConversationService:
+    """
+    Maintains the per-ticket rolling summary incrementally: only messages
+    after the stored watermark are read, so building a window costs
+    O(new messages + recent turns) rather than O(all messages).
+    """
+    def __init__(
+        self,
+        summary_repo: TicketSummaryRepository,
+        message_repo: MessageRepository,
+        prompt_builder: PromptBuilder | None = None,
+    ):
+        self.summary_repo = summary_repo
+        self.message_repo = message_repo
+        self.prompt_builder = prompt_builder or PromptBuilder()
+
+    def window(self, ticket: TicketRead) -> ConversationWindow:
+        row = self.summary_repo.get(ticket.id)
+        pending = self.message_repo.list_by_ticket_after(
+            ticket.id,
+            row.summarized_until if row else None,
+            row.last_message_id if row else None,
+        )
+        window, folded = self.prompt_builder.fold(
+            ticket, row.summary if row else "", [MessageService.to_read(o) for o in pending]
+        )
+        if folded:
+            self.summary_repo.save(_advance(row, ticket, window, folded))
+        return window
+
+
+class AsyncConversationService:
+    def __init__(
+        self,
+        summary_repo: AsyncTicketSummaryRepository,
+        message_repo: AsyncMessageRepository,
+        prompt_builder: PromptBuilder | None = None,
+    ):
+        self.summary_repo = summary_repo
+        self.message_repo = message_repo
+        self.prompt_builder = prompt_builder or PromptBuilder()
+
+    async def window(self, ticket: TicketRead) -> ConversationWindow:
+        row = await self.summary_repo.get(ticket.id)
+        pending = await self.message_repo.list_by_ticket_after(
+            ticket.id,
+            row.summarized_until if row else None,
+            row.last_message_id if row else None,
+        )
+        window, folded = self.prompt_builder.fold(
+            ticket, row.summary if row else "", [MessageService.to_read(o) for o in pending]
+        )
+        if folded:
+            await self.summary_repo.save(_advance(row, ticket, window, folded))
+        return window
+
+
+class TicketIndexService:
+    """
+    Incremental updates of the retrieval index as tickets get resolved.
+    """
+    def __init__(self, repo: ResolvedTicketRepository, index: TicketIndex):
+        self.repo = repo
+        self.index = index
+
+    def index_tickets(self, ticket_ids: List[UUID]) -> int:
+        return index_rows(self.index, self.repo.by_ids(ticket_ids))
+
+
+class AsyncTicketIndexService:
+    def __init__(self, repo: AsyncResolvedTicketRepository, index: TicketIndex):
+        self.repo = repo
+        self.index = index
+
+    async def index_tickets(self, ticket_ids: List[UUID]) -> int:
+        rows = await self.repo.by_ids(ticket_ids)
+        return await asyncio.to_thread(index_rows, self.index, rows)
+
+
+def _advance(
+    row: TicketSummary | None, ticket: TicketRead, window: ConversationWindow, folded: List[MessageRead]
+) -> dict:
+    return {
+        "ticket_id": ticket.id,
+        "summary": window.summary,
+        "summarized_until": folded[-1].created_at,
+        "last_message_id": folded[-1].id,
+        "message_count": (row.message_count if row else 0) + len(folded),
+        "updated_at": datetime.utcnow(),
+    }
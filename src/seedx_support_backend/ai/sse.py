@@ -0,0 +1,187 @@
+import asyncio
+import time
+from typing import AsyncIterator, Callable
+
+import orjson
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.config import settings
+from ..infrastructure.metrics import metrics
+
+HEARTBEAT_FRAME = ": keepalive\n\n"
+
+
+def extract_delta(data: str) -> str | None:
+    """
+    Text of one upstream chunk. OpenAI-compatible payloads
+    (``{"choices": [{"delta": {"content": ...}}]}``) are decoded once and
+    reduced to their content; anything that is not JSON is taken as text.
+    Role-only and finish deltas carry no text and give None.
+    """
+    try:
+        payload = orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return data
+    if not isinstance(payload, dict):
+        return data
+    choices = payload.get("choices")
+    if not choices:
+        content = payload.get("content")
+        return content if isinstance(content, str) else None
+    choice = choices[0]
+    delta = choice.get("delta") or {}
+    content = delta.get("content", choice.get("text"))
+    return content or None
+
+
+class SSEStats:
+    def __init__(self):
+        self.streams = 0
+        self.chunks = 0
+        self.frames = 0
+        self.heartbeats = 0
+        self.bytes = 0
+        self.cpu_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "streams": self.streams,
+            "chunks_in": self.chunks,
+            "frames_out": self.frames,
+            "chunks_per_frame": round(self.chunks / self.frames, 2) if self.frames else 0.0,
+            "heartbeats": self.heartbeats,
+            "bytes_out": self.bytes,
+            "cpu_ms_per_stream": round(self.cpu_seconds * 1000 / self.streams, 3) if self.streams else 0.0,
+        }
+
+
+class SSEWriter:
+    """
+    Turns upstream chunks into SSE frames. Chunks arriving within
+    `flush_interval` seconds of the first buffered one are sent as one write,
+    or sooner once `flush_bytes` are buffered. In "coalesce" mode deltas are
+    decoded once and merged into a single ``{"content": ...}`` event; in
+    "passthrough" mode upstream payloads are forwarded as-is, one SSE event
+    each, still batched into one write. A comment frame goes out after
+    `heartbeat` seconds without traffic.
+    """
+    def __init__(
+        self,
+        mode: str = settings.AI_SSE_MODE,
+        flush_interval: float = settings.AI_SSE_FLUSH_MS / 1000,
+        flush_bytes: int = settings.AI_SSE_FLUSH_BYTES,
+        heartbeat: float = settings.AI_SSE_HEARTBEAT_SECONDS,
+        stats: SSEStats | None = None,
+    ):
+        if mode not in ("coalesce", "passthrough"):
+            raise ValueError(f"Unknown SSE mode {mode!r}")
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.heartbeat = heartbeat
+        self.stats = stats or SSEStats()
+
+    def _frame(self, parts: list[str]) -> str:
+        if self.mode == "passthrough":
+            return "".join(f"data: {part}\n\n" for part in parts)
+        return "data: " + orjson.dumps({"content": "".join(parts)}).decode() + "\n\n"
+
+    async def frames(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        SSE frames for `chunks`; upstream errors are raised after whatever
+        was buffered has been flushed.
+        """
+        loop = asyncio.get_running_loop()
+        stats = self.stats
+        stats.streams += 1
+        source = chunks.__aiter__()
+        parts: list[str] = []
+        size = 0
+        first_at = 0.0
+        last_sent = loop.time()
+        pending: asyncio.Future | None = None
+        try:
+            while True:
+                deadline = first_at + self.flush_interval if parts else last_sent + self.heartbeat
+                if pending is None:
+                    pending = asyncio.ensure_future(anext(source))
+                done, _ = await asyncio.wait((pending,), timeout=max(deadline - loop.time(), 0))
+                if not done:
+                    if parts:
+                        frame = self._flush(parts)
+                        parts, size = [], 0
+                    else:
+                        frame = HEARTBEAT_FRAME
+                        stats.heartbeats += 1
+                    last_sent = loop.time()
+                    yield frame
+                    continue
+
+                finished, pending = pending, None
+                try:
+                    data = finished.result()
+                except StopAsyncIteration:
+                    break
+                except BaseException:
+                    if parts:
+                        yield self._flush(parts)
+                    raise
+
+                started = time.thread_time()
+                stats.chunks += 1
+                part = data if self.mode == "passthrough" else extract_delta(data)
+                stats.cpu_seconds += time.thread_time() - started
+                if part is None:
+                    continue
+                if not parts:
+                    first_at = loop.time()
+                parts.append(part)
+                size += len(part)
+                if size >= self.flush_bytes:
+                    frame = self._flush(parts)
+                    parts, size = [], 0
+                    last_sent = loop.time()
+                    yield frame
+            if parts:
+                yield self._flush(parts)
+        finally:
+            if pending is not None:
+                # the generator must be idle before it can be closed
+                pending.cancel()
+                await asyncio.wait((pending,))
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _flush(self, parts: list[str]) -> str:
+        started = time.thread_time()
+        frame = self._frame(parts)
+        self.stats.cpu_seconds += time.thread_time() - started
+        self.stats.frames += 1
+        self.stats.bytes += len(frame)
+        return frame
+
+
+class SSEResponse(StreamingResponse):
+    """
+    text/event-stream response that calls `on_close` once it is done, also
+    when the client went away before the body was ever iterated (then the
+    body generator's own finally never runs). `on_close` must be idempotent.
+    """
+    media_type = "text/event-stream"
+
+    def __init__(self, content: AsyncIterator[str], on_close: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+sse_stats = SSEStats()
+sse_writer = SSEWriter(stats=sse_stats)
+metrics.register("ai_sse", sse_stats.snapshot)
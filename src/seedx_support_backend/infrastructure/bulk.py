@@ -0,0 +1,285 @@
+"""Bulk export/import of tables through PostgreSQL COPY.
+
+Rows never become ORM objects: COPY streams between the server and a file
+through a fixed-size buffer, so memory stays flat whatever the table size.
+Imports are chunked; after each chunk commits its end offset is written to
+a checkpoint file so an interrupted import resumes where it stopped. Chunks
+go through a staging table and ``ON CONFLICT DO NOTHING``, so replaying a
+chunk that committed right before a crash is harmless.
+"""
+
+import json
+import os
+import struct
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Iterator
+
+from ..messages.models import Message
+from ..tickets.models import Ticket
+from ..users.models import User
+
+# Import order matters for foreign keys: users, then tickets, then messages
+TABLES = {
+    "users": User,
+    "tickets": Ticket,
+    "messages": Message,
+}
+FORMATS = ("csv", "binary")
+
+PGCOPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+PGCOPY_HEADER = PGCOPY_SIGNATURE + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+
+
+def copy_columns(table: str) -> list[str]:
+    """
+    Column set of a table as declared on its model; generated columns are
+    left out since they cannot be written.
+    """
+    return [c.name for c in TABLES[table].__table__.columns if c.computed is None]
+
+
+@dataclass
+class ExportFilter:
+    user_id: uuid.UUID | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+
+@dataclass
+class TransferStats:
+    table: str
+    rows: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def report(self, final: bool = False):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        print(
+            f"{self.table}: {self.rows} rows, {self.bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+            f"({self.rows / elapsed:,.0f} rows/s, {self.bytes / 1e6 / elapsed:.1f} MB/s)"
+            + ("" if final else " ..."),
+            file=sys.stderr,
+        )
+
+
+class _CountingWriter:
+    """
+    File wrapper handed to copy_expert that counts bytes and prints progress.
+    """
+    def __init__(self, out: BinaryIO, stats: TransferStats, every: float = 5.0):
+        self.out = out
+        self.stats = stats
+        self.every = every
+        self.last_report = time.monotonic()
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self.stats.bytes += len(data)
+        if time.monotonic() - self.last_report >= self.every:
+            self.stats.report()
+            self.last_report = time.monotonic()
+        return self.out.write(data)
+
+
+def _copy_options(fmt: str, header: bool) -> str:
+    if fmt == "binary":
+        return "(FORMAT binary)"
+    return f"(FORMAT csv, HEADER {'true' if header else 'false'})"
+
+
+def export_query(cursor, table: str, flt: ExportFilter) -> str:
+    cols = ", ".join(copy_columns(table))
+    conditions, params = [], []
+    if flt.user_id is not None:
+        if table == "users":
+            conditions.append("id = %s")
+        elif table == "tickets":
+            conditions.append("user_id = %s")
+        else:
+            conditions.append("ticket_id IN (SELECT id FROM tickets WHERE user_id = %s)")
+        params.append(str(flt.user_id))
+    if flt.since is not None:
+        conditions.append("created_at >= %s")
+        params.append(flt.since)
+    if flt.until is not None:
+        conditions.append("created_at < %s")
+        params.append(flt.until)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    # COPY takes no bind parameters; mogrify quotes them client side
+    return cursor.mogrify(f"SELECT {cols} FROM {table}{where}", params).decode()
+
+
+def export_table(conn, table: str, out: BinaryIO, fmt: str = "csv", flt: ExportFilter | None = None) -> TransferStats:
+    """
+    Stream `table` (optionally filtered) into `out` with COPY .. TO STDOUT.
+    `conn` is a raw psycopg2 connection.
+    """
+    stats = TransferStats(table)
+    with conn.cursor() as cursor:
+        query = export_query(cursor, table, flt or ExportFilter())
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH {_copy_options(fmt, header=True)}", _CountingWriter(out, stats))
+        stats.rows = cursor.rowcount
+    conn.commit()
+    stats.report(final=True)
+    return stats
+
+
+def _csv_chunks(f: BinaryIO, chunk_rows: int) -> Iterator[tuple[bytes, int, int]]:
+    """
+    Split CSV into chunks of whole records; yields (data, rows, end offset).
+    A record only ends on a newline outside quotes, so multi-line fields
+    stay intact.
+    """
+    buf = bytearray()
+    rows = 0
+    quotes = 0
+    offset = f.tell()
+    for line in iter(f.readline, b""):
+        buf += line
+        offset += len(line)
+        quotes += line.count(b'"')
+        if quotes % 2:
+            continue
+        quotes = 0
+        rows += 1
+        if rows >= chunk_rows:
+            yield bytes(buf), rows, offset
+            buf.clear()
+            rows = 0
+    if buf:
+        yield bytes(buf), rows, offset
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated binary COPY file")
+    return data
+
+
+def _binary_chunks(f: BinaryIO, chunk_rows: int) -> Iterator[tuple[bytes, int, int]]:
+    """
+    Split a PGCOPY binary file into self-contained chunks (header + tuples +
+    trailer); yields (data, rows, end offset).
+    """
+    buf = bytearray(PGCOPY_HEADER)
+    rows = 0
+    while True:
+        raw_count = _read_exact(f, 2)
+        (field_count,) = struct.unpack("!h", raw_count)
+        if field_count == -1:
+            break
+        buf += raw_count
+        for _ in range(field_count):
+            raw_len = _read_exact(f, 4)
+            (length,) = struct.unpack("!i", raw_len)
+            buf += raw_len
+            if length > 0:
+                buf += _read_exact(f, length)
+        rows += 1
+        if rows >= chunk_rows:
+            yield bytes(buf + PGCOPY_TRAILER), rows, f.tell()
+            del buf[len(PGCOPY_HEADER):]
+            rows = 0
+    if rows:
+        yield bytes(buf + PGCOPY_TRAILER), rows, f.tell()
+
+
+def _skip_binary_header(f: BinaryIO):
+    if _read_exact(f, len(PGCOPY_SIGNATURE)) != PGCOPY_SIGNATURE:
+        raise ValueError("Not a PGCOPY binary file")
+    _flags, ext_len = struct.unpack("!ii", _read_exact(f, 8))
+    f.seek(ext_len, os.SEEK_CUR)
+
+
+def _load_checkpoint(path: str) -> dict:
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {"offset": 0, "rows": 0}
+
+
+def _save_checkpoint(path: str, checkpoint: dict):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(checkpoint, fh)
+    os.replace(tmp, path)
+
+
+def import_table(
+    conn,
+    table: str,
+    f: BinaryIO,
+    fmt: str = "csv",
+    checkpoint_path: str | None = None,
+    chunk_rows: int = 50_000,
+) -> TransferStats:
+    """
+    Load a file produced by `export_table` into `table`, `chunk_rows` rows
+    per transaction. Progress is recorded in `checkpoint_path` after every
+    committed chunk and picked up again on the next run.
+    """
+    cols = ", ".join(copy_columns(table))
+    stage = f"_bulk_stage_{table}"
+    checkpoint = _load_checkpoint(checkpoint_path) if checkpoint_path else {"offset": 0, "rows": 0}
+    stats = TransferStats(table)
+
+    if fmt == "binary":
+        _skip_binary_header(f)
+        if checkpoint["offset"]:
+            f.seek(checkpoint["offset"])
+        chunks = _binary_chunks(f, chunk_rows)
+    else:
+        if checkpoint["offset"]:
+            f.seek(checkpoint["offset"])
+        else:
+            f.readline()  # header
+        chunks = _csv_chunks(f, chunk_rows)
+    if checkpoint["rows"]:
+        print(f"{table}: resuming after {checkpoint['rows']} rows", file=sys.stderr)
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        conn.commit()
+        for data, rows, offset in chunks:
+            stream = _ChunkReader(data)
+            cursor.copy_expert(f"COPY {stage} ({cols}) FROM STDIN WITH {_copy_options(fmt, header=False)}", stream)
+            cursor.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage} ON CONFLICT DO NOTHING")
+            conn.commit()
+
+            checkpoint = {"offset": offset, "rows": checkpoint["rows"] + rows}
+            if checkpoint_path:
+                _save_checkpoint(checkpoint_path, checkpoint)
+            stats.rows += rows
+            stats.bytes += len(data)
+            stats.report()
+    stats.report(final=True)
+    return stats
+
+
+class _ChunkReader:
+    """
+    Minimal file-like reader over one chunk for copy_expert.
+    """
+    def __init__(self, data: bytes):
+        self.view = memoryview(data)
+        self.pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = len(self.view) - self.pos
+        chunk = self.view[self.pos:self.pos + size]
+        self.pos += len(chunk)
+        return chunk.tobytes()
+
+    def readline(self, size: int = -1) -> bytes:
+        return self.read(size)
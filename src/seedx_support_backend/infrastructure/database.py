@@ -1,13 +1,60 @@
 # src/infrastructure/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from src.config import settings
+from .metrics import metrics
+from .pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolMetrics, instrument_pool
 
-engine = create_engine(settings.DATABASE_URL, future=True)
+
+def to_async_url(url: str) -> str:
+    """
+    Derive an asyncpg URL from a sync PostgreSQL URL, e.g.
+    ``postgresql://u:p@db/support`` -> ``postgresql+asyncpg://u:p@db/support``.
+    """
+    parsed = make_url(url)
+    if parsed.drivername.startswith("postgresql"):
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def pool_options() -> dict:
+    """
+    Pool sizing shared by the sync and async engines. Sizes are per worker
+    process: total connections = workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    """
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    future=True,
+    poolclass=InstrumentedQueuePool,
+    **pool_options(),
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL),
+    poolclass=InstrumentedAsyncQueuePool,
+    **pool_options(),
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+pool_metrics = instrument_pool(engine.pool, PoolMetrics())
+async_pool_metrics = instrument_pool(async_engine.sync_engine.pool, PoolMetrics())
+metrics.register("db_pool", pool_metrics.snapshot)
+metrics.register("db_async_pool", async_pool_metrics.snapshot)
+
 # Dependency for FastAPI
 def get_db():
     db = SessionLocal()
@@ -15,3 +62,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async dependency for FastAPI, used by the routers when DATABASE_ASYNC is set
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
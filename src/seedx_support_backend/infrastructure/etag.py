@@ -0,0 +1,78 @@
+import hashlib
+from collections import OrderedDict
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .metrics import metrics
+
+# clients may cache but must revalidate with If-None-Match every time
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    """
+    Weak validator over the version fields of a representation.
+    """
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class ConditionalGet:
+    """
+    304 handling plus counters. The size of the last body sent for each
+    ETag is remembered (LRU) so every 304 can be credited with the bytes
+    it saved.
+    """
+    def __init__(self, max_sizes: int = 4096):
+        self.max_sizes = max_sizes
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self.full_responses = 0
+        self.not_modified_responses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def has_validator(request: Request) -> bool:
+        return "if-none-match" in request.headers
+
+    def not_modified(self, request: Request, etag: str) -> Response | None:
+        """
+        A 304 for `etag` when the request's If-None-Match matches it, else None.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is None or not etag_matches(if_none_match, etag):
+            return None
+        self.not_modified_responses += 1
+        self.bytes_saved += self._sizes.get(etag, 0)
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    def tagged(self, response: Response, etag: str) -> Response:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        self.full_responses += 1
+        self._sizes[etag] = len(response.body)
+        self._sizes.move_to_end(etag)
+        if len(self._sizes) > self.max_sizes:
+            self._sizes.popitem(last=False)
+        return response
+
+    def snapshot(self) -> dict:
+        total = self.full_responses + self.not_modified_responses
+        return {
+            "full_responses": self.full_responses,
+            "not_modified_responses": self.not_modified_responses,
+            "not_modified_ratio": round(self.not_modified_responses / total, 4) if total else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+conditional_get = ConditionalGet()
+metrics.register("conditional_get", conditional_get.snapshot)
@@ -0,0 +1,184 @@
+"""Ticket events over Postgres LISTEN/NOTIFY.
+
+Writers queue a ``pg_notify`` in the transaction that makes the change, so
+an event is delivered exactly when (and only if) the change commits. Each
+worker holds one dedicated asyncpg connection that LISTENs on the channel
+and fans events out to in-process per-ticket subscriber queues; idle
+watchers therefore cost no queries at all.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import asyncpg
+import orjson
+from sqlalchemy import Text, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import make_url
+
+from src.config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TICKET_EVENTS_CHANNEL = "ticket_events"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7900
+
+
+def encode_event(event: dict, optional: str | None = None) -> str:
+    """
+    JSON payload for NOTIFY. When it is too large, the `optional` field is
+    dropped and the event is flagged `truncated` so clients refetch it.
+    """
+    payload = orjson.dumps(event)
+    if len(payload) > NOTIFY_MAX_BYTES and optional is not None:
+        payload = orjson.dumps({**event, optional: None, "truncated": True})
+    return payload.decode()
+
+
+def notify_stmt(payload: str, channel: str = TICKET_EVENTS_CHANNEL):
+    return select(func.pg_notify(channel, payload))
+
+
+def notify_many_stmt(payloads: list[str], channel: str = TICKET_EVENTS_CHANNEL):
+    # one round trip for a batch: pg_notify runs once per unnested payload
+    return select(func.pg_notify(channel, func.unnest(bindparam("payloads", payloads, type_=ARRAY(Text)))))
+
+
+def listen_dsn(url: str) -> str:
+    # asyncpg takes a plain libpq URL, without a SQLAlchemy driver suffix
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class TicketEventHub:
+    """
+    One LISTEN connection per worker, fanned out to per-ticket queues. The
+    connection is re-established with backoff when it drops; subscribers
+    then get a `resync` event since notifications sent meanwhile are lost.
+    A subscriber that falls `queue_size` events behind loses its oldest ones.
+    """
+    def __init__(self, dsn: str, channel: str = TICKET_EVENTS_CHANNEL, queue_size: int = 100):
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._task: asyncio.Task | None = None
+        self.connected = False
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @asynccontextmanager
+    async def subscribe(self, ticket_id: uuid.UUID) -> AsyncIterator[asyncio.Queue]:
+        """
+        Queue of raw JSON payloads for one ticket, registered for the
+        duration of the `async with` block.
+        """
+        key = str(ticket_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[key].add(queue)
+        try:
+            yield queue
+        finally:
+            watchers = self._subscribers.get(key)
+            if watchers is not None:
+                watchers.discard(queue)
+                if not watchers:
+                    del self._subscribers[key]
+
+    async def _run(self):
+        backoff = 0.5
+        while True:
+            lost = asyncio.Event()
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                if self.reconnects:
+                    self._broadcast(encode_event({"type": "resync"}))
+                self.connected = True
+                backoff = 0.5
+                await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ticket event listener failed, reconnecting in %.1fs", backoff)
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    await asyncio.shield(conn.close())
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str):
+        self.received += 1
+        try:
+            ticket_id = orjson.loads(payload)["ticket_id"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            return
+        for queue in self._subscribers.get(ticket_id, ()):
+            self._put(queue, payload)
+
+    def _broadcast(self, payload: str):
+        for watchers in self._subscribers.values():
+            for queue in watchers:
+                self._put(queue, payload)
+
+    def _put(self, queue: asyncio.Queue, payload: str):
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(payload)
+        self.delivered += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "connected": self.connected,
+            "tickets_watched": len(self._subscribers),
+            "subscribers": sum(len(w) for w in self._subscribers.values()),
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "reconnects": self.reconnects,
+        }
+
+
+async def sse_ticket_events(ticket_id: uuid.UUID, heartbeat: float = settings.TICKET_EVENTS_HEARTBEAT_SECONDS):
+    """
+    SSE body for one ticket's events; comment lines keep idle connections
+    alive through proxies.
+    """
+    async with ticket_events.subscribe(ticket_id) as queue:
+        yield ": connected\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {payload}\n\n"
+
+
+ticket_events = TicketEventHub(listen_dsn(settings.DATABASE_URL))
+metrics.register("ticket_events", ticket_events.snapshot)
@@ -1,15 +1,22 @@
 import datetime
+import functools
 from enum import Enum
 import json
+from json.encoder import encode_basestring_ascii
 import re
-from base64 import b64encode, b64decode
+import uuid
+from base64 import b64encode, b64decode, urlsafe_b64encode, urlsafe_b64decode
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import TypeVar, Union, List
+from typing import TypeVar, Union, List, Optional, Iterable, Iterator, AsyncIterable, AsyncIterator
 from pydantic import EmailStr
 
+import orjson
 import ulid
 from cattr import Converter
+from cattrs.gen import make_dict_unstructure_fn
+from starlette.requests import Request
+from starlette.responses import Response
 from dateutil.parser import parse
 from injector import singleton, provider, Module
 
@@ -119,34 +126,124 @@ def date_to_string(data):
     return data.isoformat()
 
 
+# Mixed-case boundary, e.g. "ticketId" -> "ticket_id", "HTTPStatus" -> "http_status"
+CASE_BOUNDARY = re.compile("((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))")
+# Distinct keys memoized; payload key sets are small, payloads are not
+KEY_CACHE_SIZE = 4096
+_END = object()
+
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
 def convert_to_camel_case(s):
-    a = re.compile("((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))")
-    return a.sub(r"_\1", s).lower()
+    return CASE_BOUNDARY.sub(r"_\1", s).lower()
+
+
+def transform_keys(value, key_fn=convert_to_camel_case):
+    """
+    Copy nested dicts/lists applying `key_fn` to every dict key. Iterative,
+    so arbitrarily deep documents cannot hit the recursion limit.
+    """
+    if isinstance(value, dict):
+        root = {}
+    elif isinstance(value, list):
+        root = []
+    else:
+        return value
+
+    stack = [(value, root)]
+    while stack:
+        source, target = stack.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for k, v in items:
+            if isinstance(v, dict):
+                child = {}
+                stack.append((v, child))
+            elif isinstance(v, list):
+                child = []
+                stack.append((v, child))
+            else:
+                child = v
+            if isinstance(target, dict):
+                target[key_fn(k)] = child
+            else:
+                target.append(child)
+    return root
 
 
 def convert_dict_to_camel_case(j):
-    out = {}
-    for k in j:
-        new_k = convert_to_camel_case(k)
-        if isinstance(j[k], dict):
-            out[new_k] = convert_dict_to_camel_case(j[k])
-        elif isinstance(j[k], list):
-            out[new_k] = convert_array_to_camel_case(j[k])
-        else:
-            out[new_k] = j[k]
-    return out
+    return transform_keys(j)
 
 
 def convert_array_to_camel_case(a):
-    new_arr = []
-    for i in a:
-        if isinstance(i, list):
-            new_arr.append(convert_array_to_camel_case(i))
-        elif isinstance(i, dict):
-            new_arr.append(convert_dict_to_camel_case(i))
+    return transform_keys(a)
+
+
+def _encode_scalar(v) -> str:
+    if isinstance(v, str):
+        return encode_basestring_ascii(v)
+    if v is None:
+        return "null"
+    if v is True:
+        return "true"
+    if v is False:
+        return "false"
+    if isinstance(v, int):
+        return int.__repr__(v)
+    return json.dumps(v, default=json_converter)
+
+
+def iterencode_transformed(value, key_fn=convert_to_camel_case, parts_per_chunk: int = 4096):
+    """
+    Encode `value` as JSON with `key_fn` applied to every key while encoding,
+    yielding str chunks. No transformed copy of the document is built and
+    the traversal is iterative; suitable as a StreamingResponse body.
+    """
+    @functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+    def encode_key(k):
+        return encode_basestring_ascii(key_fn(k)) + ":"
+
+    buf = []
+    stack = []  # frames: [iterator, is_dict, has_items]
+    pending = value
+    while True:
+        if isinstance(pending, dict):
+            buf.append("{")
+            stack.append([iter(pending.items()), True, False])
+        elif isinstance(pending, (list, tuple)):
+            buf.append("[")
+            stack.append([iter(pending), False, False])
+        else:
+            buf.append(_encode_scalar(pending))
+
+        if len(buf) >= parts_per_chunk:
+            yield "".join(buf)
+            buf.clear()
+
+        while stack:
+            frame = stack[-1]
+            item = next(frame[0], _END)
+            if item is _END:
+                stack.pop()
+                buf.append("}" if frame[1] else "]")
+                continue
+            if frame[2]:
+                buf.append(",")
+            frame[2] = True
+            if frame[1]:
+                key, pending = item
+                buf.append(encode_key(key))
+            else:
+                pending = item
+            break
         else:
-            new_arr.append(i)
-    return new_arr
+            break
+
+    if buf:
+        yield "".join(buf)
+
+
+def to_json_transformed(value, key_fn=convert_to_camel_case) -> str:
+    return "".join(iterencode_transformed(value, key_fn))
 
 
 RestConverter = TypeVar("RestConverter", bound=Converter)
@@ -225,6 +322,63 @@ def create_rest_converter() -> RestConverter:
     return atc
 
 
+def precompile_unstructure(converter: Converter, *classes: type):
+    """
+    Generate and register the unstructure function of each dataclass up front
+    instead of on first use. Register nested types before their containers.
+    """
+    for cls in classes:
+        converter.register_unstructure_hook(cls, make_dict_unstructure_fn(cls, converter))
+
+
+rest_converter = create_rest_converter()
+
+
+def orjson_default(o):
+    # orjson only serializes uuid.UUID itself; asyncpg returns a subclass
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    raise TypeError(f"Type is not JSON serializable: {type(o).__name__}")
+
+
+class ConverterJSONResponse(Response):
+    """
+    JSON response for DTOs that are already built: the converter's generated
+    unstructure functions plus orjson replace response_model validation and
+    the stdlib encoder. Return it from the route to bypass response_model.
+    """
+    media_type = "application/json"
+    converter: Converter = rest_converter
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(self.converter.unstructure(content), default=orjson_default)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    """
+    Content negotiation for the streaming mode of list endpoints.
+    """
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def iter_ndjson(items: Iterable, converter: Converter = rest_converter) -> Iterator[bytes]:
+    """
+    One JSON document per line, encoded as each item arrives.
+    """
+    unstructure = converter.unstructure
+    for item in items:
+        yield orjson.dumps(unstructure(item), default=orjson_default, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def aiter_ndjson(items: AsyncIterable, converter: Converter = rest_converter) -> AsyncIterator[bytes]:
+    unstructure = converter.unstructure
+    async for item in items:
+        yield orjson.dumps(unstructure(item), default=orjson_default, option=orjson.OPT_APPEND_NEWLINE)
+
+
 class JsonModule(Module):
     @singleton
     @provider
@@ -246,3 +400,31 @@ class PaginatedResponse:
 class Pagination:
     page: int
     size: int
+
+
+@dataclass
+class CursorPagination:
+    """
+    Keyset position on (created_at, id): the last row of the previous page.
+    """
+    created_at: datetime.datetime
+    id: uuid.UUID
+
+
+def encode_cursor(created_at: datetime.datetime, id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode("ascii")
+    return urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[CursorPagination]:
+    """
+    Inverse of `encode_cursor`; raises ValueError on a malformed cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        created_at, id = raw.split("|", 1)
+        return CursorPagination(datetime.datetime.fromisoformat(created_at), uuid.UUID(id))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
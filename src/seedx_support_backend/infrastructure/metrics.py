@@ -0,0 +1,25 @@
+from threading import Lock
+from typing import Callable
+
+
+class MetricsRegistry:
+    """
+    Process-local registry of metric sources. Each source is a callable that
+    returns a flat dict of counters/gauges; `snapshot()` collects all of them
+    for the /metrics endpoint.
+    """
+    def __init__(self):
+        self._sources: dict[str, Callable[[], dict]] = {}
+        self._lock = Lock()
+
+    def register(self, name: str, source: Callable[[], dict]):
+        with self._lock:
+            self._sources[name] = source
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            sources = dict(self._sources)
+        return {name: source() for name, source in sources.items()}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,102 @@
+import time
+from threading import Lock
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Saturation counters for one connection pool: how long checkouts waited,
+    how many timed out, and how many connections are in use / in overflow.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.in_use = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.pool = None
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def on_checkout(self, *_):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+
+    def on_checkin(self, *_):
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "in_use": self.in_use,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+        if self.pool is not None:
+            data["size"] = self.pool.size()
+            data["overflow"] = max(self.pool.overflow(), 0)
+            data["idle"] = self.pool.checkedin()
+        return data
+
+
+class _TimedCheckoutMixin:
+    """
+    Pool events fire only once a connection has been handed out, so the time
+    spent queueing for a free slot is measured around `_do_get` instead.
+    """
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return conn
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = new_pool
+        return new_pool
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(pool, metrics: PoolMetrics) -> PoolMetrics:
+    """
+    Attach `metrics` to an engine's pool. Checkout/checkin events keep the
+    in-use gauge; Instrumented*QueuePool pools also report wait time.
+    """
+    metrics.pool = pool
+    if isinstance(pool, _TimedCheckoutMixin):
+        pool.metrics = metrics
+    event.listen(pool, "checkout", metrics.on_checkout)
+    event.listen(pool, "checkin", metrics.on_checkin)
+    return metrics
@@ -0,0 +1,238 @@
+"""Read-replica routing for read-only endpoints.
+
+Replicas come from DATABASE_READ_URLS (comma separated). Read sessions go
+round-robin over the replicas that passed their last health check and fall
+back to the primary when none did. Users who wrote recently read from the
+primary for READ_YOUR_WRITES_SECONDS, so replication lag never hides their
+own changes. The window is tracked in the worker that took the write and
+carried to the client in a short-lived signed cookie, so reads landing on
+any other worker honour it too.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from .database import AsyncSessionLocal, SessionLocal, pool_options, to_async_url
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+WRITE_COOKIE = "recent_write"
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(url, future=True, **pool_options())
+        self.session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.async_engine = create_async_engine(to_async_url(url), **pool_options())
+        self.async_session = async_sessionmaker(bind=self.async_engine, autoflush=False, expire_on_commit=False)
+        self.healthy = True
+        self.reads = 0
+        self.failures = 0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def mark_failed(self):
+        self.healthy = False
+        self.failures += 1
+
+
+class ReplicaSet:
+    """
+    Round-robin over healthy replicas, with a background health check that
+    takes replicas out of (and back into) rotation.
+    """
+    def __init__(self, urls: list[str], check_interval: float, check_timeout: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._turn = itertools.count()
+        self._task: asyncio.Task | None = None
+        self.primary_fallbacks = 0
+        self.read_your_writes = 0
+
+    def pick(self) -> Replica | None:
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            if self.replicas:
+                self.primary_fallbacks += 1
+            return None
+        replica = healthy[next(self._turn) % len(healthy)]
+        replica.reads += 1
+        return replica
+
+    async def check(self, replica: Replica):
+        try:
+            async with replica.async_engine.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), self.check_timeout)
+        except Exception:
+            if replica.healthy:
+                logger.warning("Read replica %s failed its health check", replica.name)
+            replica.mark_failed()
+        else:
+            replica.healthy = True
+
+    async def start(self):
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.async_engine.dispose()
+            replica.engine.dispose()
+
+    async def _run(self):
+        while True:
+            await asyncio.gather(*(self.check(r) for r in self.replicas))
+            await asyncio.sleep(self.check_interval)
+
+    def snapshot(self) -> dict:
+        return {
+            "replicas": [
+                {"url": r.name, "healthy": r.healthy, "reads": r.reads, "failures": r.failures}
+                for r in self.replicas
+            ],
+            "primary_fallbacks": self.primary_fallbacks,
+            "read_your_writes": self.read_your_writes,
+        }
+
+
+class RecentWrites:
+    """
+    Users who sent a write request in the last `window` seconds, oldest
+    first; expired entries are pruned as new writes come in.
+
+    The same window travels with the client as a cookie,
+    ``<user id>.<expiry epoch>.<HMAC>``, signed with `secret` so clients
+    cannot extend it or hand it to another user.
+    """
+    def __init__(self, window: float, secret: str):
+        self.window = window
+        self._secret = secret.encode()
+        self._until: OrderedDict[uuid.UUID, float] = OrderedDict()
+
+    def mark(self, user_id: uuid.UUID):
+        now = time.monotonic()
+        self._until[user_id] = now + self.window
+        self._until.move_to_end(user_id)
+        while self._until:
+            oldest, until = next(iter(self._until.items()))
+            if until > now:
+                break
+            del self._until[oldest]
+
+    def active(self, user_id: uuid.UUID, cookie: str | None = None) -> bool:
+        """
+        Whether `user_id` wrote within the window, according to this worker
+        or to a valid WRITE_COOKIE value.
+        """
+        until = self._until.get(user_id)
+        if until is not None and until > time.monotonic():
+            return True
+        return cookie is not None and self._cookie_active(user_id, cookie)
+
+    def cookie(self, user_id: uuid.UUID, secure: bool = False) -> str:
+        """
+        Set-Cookie header value opening the window for `user_id` from now.
+        """
+        payload = f"{user_id}.{math.ceil(time.time() + self.window)}"
+        header = (
+            f"{WRITE_COOKIE}={payload}.{self._sign(payload)}; "
+            f"Max-Age={math.ceil(self.window)}; Path=/; HttpOnly; SameSite=Lax"
+        )
+        return header + "; Secure" if secure else header
+
+    def _cookie_active(self, user_id: uuid.UUID, cookie: str) -> bool:
+        payload, _, signature = cookie.rpartition(".")
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return False
+        owner, _, until = payload.partition(".")
+        return owner == str(user_id) and until.isdigit() and int(until) > time.time()
+
+    def _sign(self, payload: str) -> str:
+        return hmac.new(self._secret, payload.encode(), hashlib.sha256).hexdigest()
+
+
+def parse_urls(urls: str) -> list[str]:
+    return [url.strip() for url in urls.split(",") if url.strip()]
+
+
+def pick_replica(request: Request) -> Replica | None:
+    """
+    Replica to serve this request's reads, or None for the primary.
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None and recent_writes.active(user.id, request.cookies.get(WRITE_COOKIE)):
+        replica_set.read_your_writes += 1
+        return None
+    return replica_set.pick()
+
+
+def read_sessionmaker(request: Request) -> sessionmaker:
+    replica = pick_replica(request)
+    return SessionLocal if replica is None else replica.session
+
+
+def async_read_sessionmaker(request: Request) -> async_sessionmaker:
+    replica = pick_replica(request)
+    return AsyncSessionLocal if replica is None else replica.async_session
+
+
+# Dependency for read-only routes; same as get_db without replicas
+def get_read_db(request: Request):
+    replica = pick_replica(request)
+    db = SessionLocal() if replica is None else replica.session()
+    try:
+        yield db
+    except DBAPIError as e:
+        if replica is not None and e.connection_invalidated:
+            replica.mark_failed()
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    replica = pick_replica(request)
+    factory = AsyncSessionLocal if replica is None else replica.async_session
+    async with factory() as db:
+        try:
+            yield db
+        except DBAPIError as e:
+            if replica is not None and e.connection_invalidated:
+                replica.mark_failed()
+            raise
+
+
+replica_set = ReplicaSet(
+    parse_urls(settings.DATABASE_READ_URLS),
+    settings.REPLICA_HEALTH_INTERVAL_SECONDS,
+    settings.REPLICA_HEALTH_TIMEOUT_SECONDS,
+)
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS, settings.JWT_SECRET)
+metrics.register("db_replicas", replica_set.snapshot)
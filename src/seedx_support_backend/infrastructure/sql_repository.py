@@ -0,0 +1,62 @@
+from typing import Iterator
+
+import ulid
+from sqlalchemy.orm import Session
+
+from .repository import EntityNotFound, EntityType, RepositoryInterface
+
+
+class SQLAlchemyRepository(RepositoryInterface[EntityType]):
+    """
+    RepositoryInterface for one mapped model over a sync Session. Feature
+    repositories subclass it and add their queries; `get` and `create`
+    mirror their AsyncSession twins.
+    """
+    def __init__(self, model: type[EntityType], db: Session):
+        self.model = model
+        self.db = db
+
+    def get(self, id) -> EntityType | None:
+        return self.db.get(self.model, id)
+
+    def create(self, data: dict) -> EntityType:
+        return self.save(self.model(**data))
+
+    def find_all(self) -> Iterator[EntityType]:
+        return iter(self.db.query(self.model).all())
+
+    def save(self, entity: EntityType) -> EntityType:
+        self.db.add(entity)
+        self.db.commit()
+        self.db.refresh(entity)
+        return entity
+
+    def find_one(self, id: ulid.ULID) -> EntityType:
+        entity = self.get(id)
+        if entity is None:
+            raise EntityNotFound(f"{self.model.__name__} with id {id} not found")
+        return entity
+
+    def delete_one(self, id: ulid.ULID):
+        self.db.delete(self.find_one(id))
+        self.db.commit()
+
+    def find_all_by(self, **kwargs) -> Iterator[EntityType]:
+        return iter(self.db.query(self.model).filter_by(**kwargs).all())
+
+    def find_all_by_dict(self, criteria: dict) -> Iterator[EntityType]:
+        return iter(self.db.query(self.model).filter_by(**criteria).all())
+
+    def count_all_by_dict(self, criteria: dict) -> int:
+        return self.db.query(self.model).filter_by(**criteria).count()
+
+    def delete_all(self):
+        self.db.query(self.model).delete()
+        self.db.commit()
+
+    def save_all(self, entities: list[EntityType]):
+        self.db.add_all(entities)
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
@@ -1,17 +1,19 @@
 from dataclasses import dataclass
 from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel, Field
 import uuid
 
-@dataclass
+@dataclass(slots=True)
 class MessageBase:
     content: str = ""
     is_ai: bool = False
 
-class MessageCreate(MessageBase, BaseModel):
-    pass
+class MessageCreate(BaseModel):
+    content: str = ""
+    is_ai: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class MessageRead:
     id: uuid.UUID
     created_at: datetime
@@ -20,3 +22,7 @@ class MessageRead:
     content: str = ""
     is_ai: bool = False
 
+@dataclass(slots=True)
+class MessagePage:
+    items: List[MessageRead]
+    next_cursor: Optional[str] = None
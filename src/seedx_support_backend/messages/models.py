@@ -1,17 +1,25 @@
 from uuid import uuid4
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, FetchedValue, String, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from ..infrastructure.database import Base
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # keyset pagination of a ticket's messages on (created_at, id)
+        Index("ix_messages_ticket_id_created_at", "ticket_id", "created_at", "id"),
+        Index("ix_messages_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     content = Column(String, nullable=False)
     is_ai = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # full-text search document, maintained by the messages_search_vector
+    # trigger (see migration c52a8e0f6d17); deferred so listings never load it
+    search_vector = deferred(Column(TSVECTOR, server_default=FetchedValue(), server_onupdate=FetchedValue()))
 
     ticket_id = Column(UUID(as_uuid=True), ForeignKey("tickets.id"), nullable=False)
     author_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
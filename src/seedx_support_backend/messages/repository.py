@@ -1,11 +1,210 @@
+from datetime import datetime
+from typing import AsyncIterator, Iterator
+from sqlalchemy import case, insert, or_, select, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.seedx_support_backend.infrastructure.repository import RepositoryInterface
+from src.seedx_support_backend.infrastructure.events import encode_event, notify_many_stmt, notify_stmt
+from src.seedx_support_backend.infrastructure.json import CursorPagination
+from src.seedx_support_backend.infrastructure.sql_repository import SQLAlchemyRepository
+from ..tickets.models import Ticket
 from .models import Message
 import uuid
 
-class MessageRepository(RepositoryInterface[Message]):
+# characters of the newest message kept on the ticket for the inbox
+PREVIEW_CHARS = 140
+
+class MessageRepository(SQLAlchemyRepository[Message]):
     def __init__(self, db: Session):
         super().__init__(Message, db)
 
     def list_by_ticket(self, ticket_id: uuid.UUID):
         return self.db.query(self.model).filter(Message.ticket_id == ticket_id).order_by(Message.created_at).all()
+
+    def create_in_ticket(self, data: dict) -> Message:
+        """
+        Insert a message and bump its ticket's inbox aggregates in one transaction.
+        """
+        message = Message(**data)
+        self.db.add(message)
+        self.db.flush()
+        self.db.execute(ticket_stats_stmt(message.ticket_id, 1, message))
+        self.db.execute(notify_stmt(message_event(message)))
+        self.db.commit()
+        self.db.refresh(message)
+        return message
+
+    def create_many(self, rows: list[dict]) -> list[Row]:
+        """
+        Insert all rows in one transaction with a multi-row INSERT .. RETURNING
+        (insertmanyvalues); the returned rows are in input order. The ticket's
+        inbox aggregates are updated in the same transaction.
+        """
+        created = self.db.execute(insert_many_stmt(), rows).all()
+        for stmt in ticket_stats_stmts(created):
+            self.db.execute(stmt)
+        self.db.execute(notify_many_stmt([message_event(row) for row in created]))
+        self.db.commit()
+        return created
+
+    def list_by_ticket_after(
+        self, ticket_id: uuid.UUID, created_at: datetime | None, message_id: uuid.UUID | None
+    ) -> list[Message]:
+        """
+        Messages of a ticket strictly after the (created_at, id) keyset position,
+        oldest first. With no position this is the whole ticket.
+        """
+        query = self.db.query(self.model).filter(Message.ticket_id == ticket_id)
+        if created_at is not None:
+            query = query.filter(tuple_(Message.created_at, Message.id) > (created_at, message_id))
+        return query.order_by(Message.created_at, Message.id).all()
+
+    def latest_key(self, ticket_id: uuid.UUID) -> Row | None:
+        """
+        (created_at, id) of the newest message; an index-only scan of
+        ix_messages_ticket_id_created_at.
+        """
+        return self.db.execute(latest_key_stmt(ticket_id)).first()
+
+    def page_by_ticket(self, ticket_id: uuid.UUID, limit: int, after: CursorPagination | None = None) -> list[Message]:
+        """
+        Oldest first, keyset on (created_at, id). Fetches `limit` rows; callers
+        ask for one extra row to learn whether another page exists.
+        """
+        return list(self.db.scalars(page_by_ticket_stmt(ticket_id, limit, after)))
+
+    def iter_by_ticket(self, ticket_id: uuid.UUID, batch_size: int) -> Iterator[Message]:
+        """
+        All messages of a ticket, oldest first, read through a server-side
+        cursor `batch_size` rows at a time.
+        """
+        return iter(self.db.scalars(iter_by_ticket_stmt(ticket_id, batch_size)))
+
+
+def ticket_stats_stmt(ticket_id: uuid.UUID, added: int, last):
+    """
+    UPDATE of the ticket's message_count and last-message fields. `last` is
+    the newest inserted message; it only replaces the stored last message if
+    it is not older, so concurrent writers cannot move it backwards.
+    """
+    newer = or_(Ticket.last_message_at.is_(None), Ticket.last_message_at <= last.created_at)
+    return (
+        update(Ticket)
+        .where(Ticket.id == ticket_id)
+        .values(
+            message_count=Ticket.message_count + added,
+            last_message_at=case((newer, last.created_at), else_=Ticket.last_message_at),
+            last_message_preview=case((newer, last.content[:PREVIEW_CHARS]), else_=Ticket.last_message_preview),
+            last_message_is_ai=case((newer, last.is_ai), else_=Ticket.last_message_is_ai),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def ticket_stats_stmts(created: list[Row]):
+    by_ticket: dict[uuid.UUID, list[Row]] = {}
+    for row in created:
+        by_ticket.setdefault(row.ticket_id, []).append(row)
+    for ticket_id, rows in by_ticket.items():
+        yield ticket_stats_stmt(ticket_id, len(rows), max(rows, key=lambda r: r.created_at))
+
+
+def message_event(message) -> str:
+    """
+    NOTIFY payload for a new message; delivered to /tickets/{id}/events
+    watchers when the inserting transaction commits.
+    """
+    return encode_event({
+        "type": "message",
+        "ticket_id": str(message.ticket_id),
+        "message": {
+            "id": str(message.id),
+            "created_at": message.created_at.isoformat(),
+            "ticket_id": str(message.ticket_id),
+            "author_id": str(message.author_id),
+            "content": message.content,
+            "is_ai": message.is_ai,
+        },
+    }, optional="message")
+
+
+def insert_many_stmt():
+    # plain column rows rather than ORM objects: nothing to expire on commit;
+    # search_vector is filled by a trigger and never read back
+    columns = [c for c in Message.__table__.c if c.key != "search_vector"]
+    return insert(Message).returning(*columns, sort_by_parameter_order=True)
+
+
+def latest_key_stmt(ticket_id: uuid.UUID):
+    return (
+        select(Message.created_at, Message.id)
+        .where(Message.ticket_id == ticket_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+    )
+
+
+def page_by_ticket_stmt(ticket_id: uuid.UUID, limit: int, after: CursorPagination | None):
+    stmt = select(Message).where(Message.ticket_id == ticket_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(Message.created_at, Message.id) > (after.created_at, after.id))
+    return stmt.order_by(Message.created_at, Message.id).limit(limit)
+
+
+def iter_by_ticket_stmt(ticket_id: uuid.UUID, batch_size: int):
+    return (
+        select(Message)
+        .where(Message.ticket_id == ticket_id)
+        .order_by(Message.created_at, Message.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+
+class AsyncMessageRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_in_ticket(self, data: dict) -> Message:
+        message = Message(**data)
+        self.db.add(message)
+        await self.db.flush()
+        await self.db.execute(ticket_stats_stmt(message.ticket_id, 1, message))
+        await self.db.execute(notify_stmt(message_event(message)))
+        await self.db.commit()
+        await self.db.refresh(message)
+        return message
+
+    async def create_many(self, rows: list[dict]) -> list[Row]:
+        created = (await self.db.execute(insert_many_stmt(), rows)).all()
+        for stmt in ticket_stats_stmts(created):
+            await self.db.execute(stmt)
+        await self.db.execute(notify_many_stmt([message_event(row) for row in created]))
+        await self.db.commit()
+        return created
+
+    async def list_by_ticket(self, ticket_id: uuid.UUID) -> list[Message]:
+        result = await self.db.scalars(
+            select(Message).where(Message.ticket_id == ticket_id).order_by(Message.created_at)
+        )
+        return list(result.all())
+
+    async def list_by_ticket_after(
+        self, ticket_id: uuid.UUID, created_at: datetime | None, message_id: uuid.UUID | None
+    ) -> list[Message]:
+        stmt = select(Message).where(Message.ticket_id == ticket_id)
+        if created_at is not None:
+            stmt = stmt.where(tuple_(Message.created_at, Message.id) > (created_at, message_id))
+        result = await self.db.scalars(stmt.order_by(Message.created_at, Message.id))
+        return list(result.all())
+
+    async def latest_key(self, ticket_id: uuid.UUID) -> Row | None:
+        return (await self.db.execute(latest_key_stmt(ticket_id))).first()
+
+    async def page_by_ticket(self, ticket_id: uuid.UUID, limit: int, after: CursorPagination | None = None) -> list[Message]:
+        result = await self.db.scalars(page_by_ticket_stmt(ticket_id, limit, after))
+        return list(result.all())
+
+    async def iter_by_ticket(self, ticket_id: uuid.UUID, batch_size: int) -> AsyncIterator[Message]:
+        result = await self.db.stream_scalars(iter_by_ticket_stmt(ticket_id, batch_size))
+        async for message in result:
+            yield message
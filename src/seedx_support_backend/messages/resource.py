@@ -1,14 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import uuid
 from typing import List
-from ..infrastructure.database import get_db
+from ..infrastructure.database import get_db, get_async_db, SessionLocal, AsyncSessionLocal
+from ..infrastructure.etag import conditional_get
+from ..infrastructure.replicas import async_read_sessionmaker, get_async_read_db, get_read_db, read_sessionmaker
+from ..infrastructure.json import (
+    ConverterJSONResponse,
+    NDJSON_MEDIA_TYPE,
+    aiter_ndjson,
+    iter_ndjson,
+    precompile_unstructure,
+    wants_ndjson,
+)
 from src.middleware import get_current_user
-from .core import MessageCreate, MessageRead
-from .repository import MessageRepository
-from .service import MessageService
+from src.config import settings
+from ..tickets.repository import TicketRepository, AsyncTicketRepository
+from ..tickets.service import TicketService, AsyncTicketService
+from .core import MessageCreate, MessageRead, MessagePage
+from .repository import MessageRepository, AsyncMessageRepository
+from .service import MessageService, AsyncMessageService
 
 router = APIRouter(prefix="/tickets/{ticket_id}/messages", tags=["messages"])
+# Same routes on AsyncSession, mounted instead of `router` when DATABASE_ASYNC is set
+async_router = APIRouter(prefix="/tickets/{ticket_id}/messages", tags=["messages"])
+
+# Listings return ConverterJSONResponse: the DTOs are built by the service
+# already, so response_model is kept for the schema only.
+precompile_unstructure(ConverterJSONResponse.converter, MessageRead, MessagePage)
 
 @router.post("", response_model=MessageRead)
 def create_message(
@@ -17,18 +38,101 @@ def create_message(
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    # optionally, check ticket exists and belongs to user; omitted for brevity
+    TicketService(TicketRepository(db)).check_access(ticket_id, current_user.id)
     repo = MessageRepository(db)
     svc = MessageService(repo)
     return svc.add_message(ticket_id, current_user.id, msg_in)
 
-@router.get("", response_model=List[MessageRead])
-def list_messages(
+@router.post(":batch", response_model=List[MessageRead])
+def create_messages_batch(
     ticket_id: uuid.UUID,
+    msgs_in: List[MessageCreate],
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    # optionally, check user has access
+    """
+    Insert a list of messages in one transaction, e.g. when importing transcripts.
+    """
+    TicketService(TicketRepository(db)).check_access(ticket_id, current_user.id)
     repo = MessageRepository(db)
     svc = MessageService(repo)
-    return svc.list_messages(ticket_id)
+    return svc.add_messages(ticket_id, current_user.id, msgs_in)
+
+def stream_messages_ndjson(ticket_id: uuid.UUID, session_factory=SessionLocal):
+    # the body outlives the request's dependencies, so it owns its session
+    with session_factory() as db:
+        svc = MessageService(MessageRepository(db))
+        yield from iter_ndjson(svc.iter_messages(ticket_id, settings.STREAM_BATCH_SIZE))
+
+async def astream_messages_ndjson(ticket_id: uuid.UUID, session_factory=AsyncSessionLocal):
+    async with session_factory() as db:
+        svc = AsyncMessageService(AsyncMessageRepository(db))
+        async for line in aiter_ndjson(svc.iter_messages(ticket_id, settings.STREAM_BATCH_SIZE)):
+            yield line
+
+@router.get("", response_model=MessagePage, response_class=ConverterJSONResponse)
+def list_messages(
+    request: Request,
+    ticket_id: uuid.UUID,
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Messages of a ticket, oldest first. Pass `next_cursor` back as `cursor` for the next page.
+    With `Accept: application/x-ndjson` all messages are streamed instead, one per line.
+    """
+    TicketService(TicketRepository(db)).check_access(ticket_id, current_user.id)
+    if wants_ndjson(request):
+        return StreamingResponse(stream_messages_ndjson(ticket_id, read_sessionmaker(request)), media_type=NDJSON_MEDIA_TYPE)
+    repo = MessageRepository(db)
+    svc = MessageService(repo)
+    # the ETag is known before any message is loaded, so a match costs one index probe
+    etag = svc.current_page_etag(ticket_id, limit, cursor)
+    not_modified = conditional_get.not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return conditional_get.tagged(ConverterJSONResponse(svc.list_messages_page(ticket_id, limit, cursor)), etag)
+
+
+@async_router.post("", response_model=MessageRead)
+async def create_message_async(
+    ticket_id: uuid.UUID,
+    msg_in: MessageCreate,
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await AsyncTicketService(AsyncTicketRepository(db)).check_access(ticket_id, current_user.id)
+    svc = AsyncMessageService(AsyncMessageRepository(db))
+    return await svc.add_message(ticket_id, current_user.id, msg_in)
+
+@async_router.post(":batch", response_model=List[MessageRead])
+async def create_messages_batch_async(
+    ticket_id: uuid.UUID,
+    msgs_in: List[MessageCreate],
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await AsyncTicketService(AsyncTicketRepository(db)).check_access(ticket_id, current_user.id)
+    svc = AsyncMessageService(AsyncMessageRepository(db))
+    return await svc.add_messages(ticket_id, current_user.id, msgs_in)
+
+@async_router.get("", response_model=MessagePage, response_class=ConverterJSONResponse)
+async def list_messages_async(
+    request: Request,
+    ticket_id: uuid.UUID,
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    await AsyncTicketService(AsyncTicketRepository(db)).check_access(ticket_id, current_user.id)
+    if wants_ndjson(request):
+        return StreamingResponse(astream_messages_ndjson(ticket_id, async_read_sessionmaker(request)), media_type=NDJSON_MEDIA_TYPE)
+    svc = AsyncMessageService(AsyncMessageRepository(db))
+    etag = await svc.current_page_etag(ticket_id, limit, cursor)
+    not_modified = conditional_get.not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return conditional_get.tagged(ConverterJSONResponse(await svc.list_messages_page(ticket_id, limit, cursor)), etag)
@@ -1,36 +1,132 @@
 from fastapi import HTTPException, status
 import uuid
-from .repository import MessageRepository
-from .core import MessageCreate, MessageRead
+from typing import AsyncIterator, Iterator
+from src.config import settings
+from .repository import MessageRepository, AsyncMessageRepository
+from ..infrastructure.etag import weak_etag
+from ..infrastructure.json import CursorPagination, decode_cursor, encode_cursor
+from .core import MessageCreate, MessageRead, MessagePage
+from .models import Message
 
 class MessageService:
     def __init__(self, repo: MessageRepository):
         self.repo = repo
 
+    @staticmethod
+    def to_read(o: Message) -> MessageRead:
+        return MessageRead(
+            id=o.id,
+            content=o.content,
+            is_ai=o.is_ai,
+            created_at=o.created_at,
+            ticket_id=o.ticket_id,
+            author_id=o.author_id,
+        )
+
+    @staticmethod
+    def parse_cursor(cursor: str | None) -> CursorPagination | None:
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    @staticmethod
+    def page_etag(ticket_id: uuid.UUID, latest, limit: int, cursor: str | None) -> str:
+        """
+        Messages are append-only, so the newest (created_at, id) versions
+        every page of the ticket; the page parameters tell pages apart.
+        """
+        if latest is None:
+            return weak_etag("messages", ticket_id, "", "", limit, cursor or "")
+        return weak_etag("messages", ticket_id, latest.created_at.isoformat(), latest.id, limit, cursor or "")
+
+    @classmethod
+    def to_page(cls, messages: list[Message], limit: int) -> MessagePage:
+        """
+        `messages` holds up to limit + 1 rows; the extra row only signals a next page.
+        """
+        items = [cls.to_read(o) for o in messages[:limit]]
+        next_cursor = None
+        if len(messages) > limit:
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        return MessagePage(items=items, next_cursor=next_cursor)
+
     def add_message(self, ticket_id: uuid.UUID, author_id: uuid.UUID, msg_in: MessageCreate) -> MessageRead:
         # create record
-        db_obj = self.repo.create({
+        db_obj = self.repo.create_in_ticket({
             "content": msg_in.content,
             "is_ai": msg_in.is_ai,
             "ticket_id": ticket_id,
             "author_id": author_id,
         })
-        return MessageRead(
-            id=db_obj.id,
-            content=db_obj.content,
-            is_ai=db_obj.is_ai,
-            created_at=db_obj.created_at,
-            ticket_id=db_obj.ticket_id,
-            author_id=db_obj.author_id,
-        )
+        return self.to_read(db_obj)
+
+    @staticmethod
+    def batch_rows(ticket_id: uuid.UUID, author_id: uuid.UUID, msgs_in: list[MessageCreate]) -> list[dict]:
+        if len(msgs_in) > settings.MESSAGE_BATCH_MAX:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {settings.MESSAGE_BATCH_MAX} messages per batch",
+            )
+        return [{
+            "content": m.content,
+            "is_ai": m.is_ai,
+            "ticket_id": ticket_id,
+            "author_id": author_id,
+        } for m in msgs_in]
+
+    def add_messages(self, ticket_id: uuid.UUID, author_id: uuid.UUID, msgs_in: list[MessageCreate]) -> list[MessageRead]:
+        rows = self.batch_rows(ticket_id, author_id, msgs_in)
+        if not rows:
+            return []
+        return [self.to_read(r) for r in self.repo.create_many(rows)]
 
     def list_messages(self, ticket_id: uuid.UUID) -> list[MessageRead]:
         objs = self.repo.list_by_ticket(ticket_id)
-        return [MessageRead(
-            id=o.id,
-            content=o.content,
-            is_ai=o.is_ai,
-            created_at=o.created_at,
-            ticket_id=o.ticket_id,
-            author_id=o.author_id,
-        ) for o in objs]
+        return [self.to_read(o) for o in objs]
+
+    def iter_messages(self, ticket_id: uuid.UUID, batch_size: int) -> Iterator[MessageRead]:
+        for o in self.repo.iter_by_ticket(ticket_id, batch_size):
+            yield self.to_read(o)
+
+    def current_page_etag(self, ticket_id: uuid.UUID, limit: int, cursor: str | None = None) -> str:
+        return self.page_etag(ticket_id, self.repo.latest_key(ticket_id), limit, cursor)
+
+    def list_messages_page(self, ticket_id: uuid.UUID, limit: int, cursor: str | None = None) -> MessagePage:
+        objs = self.repo.page_by_ticket(ticket_id, limit + 1, self.parse_cursor(cursor))
+        return self.to_page(objs, limit)
+
+
+class AsyncMessageService:
+    def __init__(self, repo: AsyncMessageRepository):
+        self.repo = repo
+
+    async def add_message(self, ticket_id: uuid.UUID, author_id: uuid.UUID, msg_in: MessageCreate) -> MessageRead:
+        db_obj = await self.repo.create_in_ticket({
+            "content": msg_in.content,
+            "is_ai": msg_in.is_ai,
+            "ticket_id": ticket_id,
+            "author_id": author_id,
+        })
+        return MessageService.to_read(db_obj)
+
+    async def add_messages(self, ticket_id: uuid.UUID, author_id: uuid.UUID, msgs_in: list[MessageCreate]) -> list[MessageRead]:
+        rows = MessageService.batch_rows(ticket_id, author_id, msgs_in)
+        if not rows:
+            return []
+        return [MessageService.to_read(r) for r in await self.repo.create_many(rows)]
+
+    async def list_messages(self, ticket_id: uuid.UUID) -> list[MessageRead]:
+        objs = await self.repo.list_by_ticket(ticket_id)
+        return [MessageService.to_read(o) for o in objs]
+
+    async def current_page_etag(self, ticket_id: uuid.UUID, limit: int, cursor: str | None = None) -> str:
+        return MessageService.page_etag(ticket_id, await self.repo.latest_key(ticket_id), limit, cursor)
+
+    async def list_messages_page(self, ticket_id: uuid.UUID, limit: int, cursor: str | None = None) -> MessagePage:
+        objs = await self.repo.page_by_ticket(ticket_id, limit + 1, MessageService.parse_cursor(cursor))
+        return MessageService.to_page(objs, limit)
+
+    async def iter_messages(self, ticket_id: uuid.UUID, batch_size: int) -> AsyncIterator[MessageRead]:
+        async for o in self.repo.iter_by_ticket(ticket_id, batch_size):
+            yield MessageService.to_read(o)
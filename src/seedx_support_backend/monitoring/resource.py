@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from src.middleware import require_role
+from ..infrastructure.metrics import metrics
+from ..users.core import Role
+
+router = APIRouter(prefix="/metrics", tags=["monitoring"])
+
+@router.get("")
+async def get_metrics(current_user=require_role(Role.ADMIN.value)):
+    """
+    Process-local counters (connection pool saturation, caches, ...) for this worker.
+    """
+    return metrics.snapshot()
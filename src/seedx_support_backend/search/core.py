@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+import uuid
+
+@dataclass(slots=True)
+class SearchHit:
+    kind: str  # "ticket" or "message"
+    ticket_id: uuid.UUID
+    title: str
+    snippet: str
+    rank: float
+    created_at: datetime
+    message_id: Optional[uuid.UUID] = None
+
+@dataclass(slots=True)
+class SearchPage:
+    items: List[SearchHit]
+    page: int
+    page_size: int
+    has_more: bool = False
@@ -0,0 +1,80 @@
+import uuid
+from sqlalchemy import Select, cast, func, literal, literal_column, null, select, union_all
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..messages.models import Message
+from ..tickets.models import Ticket
+
+# must match the configuration of the search_vector triggers (migration c52a8e0f6d17)
+TS_CONFIG = literal_column("'english'::regconfig")
+HEADLINE_OPTIONS = "MaxFragments=1, MinWords=8, MaxWords=24"
+
+
+def search_stmt(query: str, user_id: uuid.UUID | None, limit: int, offset: int) -> Select:
+    """
+    Ranked ticket and message hits for a web-search style query, served by
+    the GIN indexes on search_vector. Snippets are only highlighted for the
+    rows of the requested page.
+    """
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, query)
+    ticket_hits = select(
+        literal("ticket").label("kind"),
+        Ticket.id.label("ticket_id"),
+        cast(null(), UUID(as_uuid=True)).label("message_id"),
+        Ticket.title.label("title"),
+        Ticket.description.label("document"),
+        func.ts_rank(Ticket.search_vector, tsquery).label("rank"),
+        Ticket.created_at.label("created_at"),
+    ).where(Ticket.search_vector.op("@@")(tsquery))
+    message_hits = (
+        select(
+            literal("message"),
+            Message.ticket_id,
+            Message.id,
+            Ticket.title,
+            Message.content,
+            func.ts_rank(Message.search_vector, tsquery),
+            Message.created_at,
+        )
+        .join(Ticket, Ticket.id == Message.ticket_id)
+        .where(Message.search_vector.op("@@")(tsquery))
+    )
+    if user_id is not None:
+        ticket_hits = ticket_hits.where(Ticket.user_id == user_id)
+        message_hits = message_hits.where(Ticket.user_id == user_id)
+
+    hits = union_all(ticket_hits, message_hits).subquery("hits")
+    page = (
+        select(hits)
+        .order_by(hits.c.rank.desc(), hits.c.created_at.desc())
+        .limit(limit)
+        .offset(offset)
+        .subquery("page")
+    )
+    return select(
+        page.c.kind,
+        page.c.ticket_id,
+        page.c.message_id,
+        page.c.title,
+        func.ts_headline(TS_CONFIG, page.c.document, tsquery, HEADLINE_OPTIONS).label("snippet"),
+        page.c.rank,
+        page.c.created_at,
+    ).order_by(page.c.rank.desc(), page.c.created_at.desc())
+
+
+class SearchRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self, query: str, user_id: uuid.UUID | None, limit: int, offset: int) -> list[Row]:
+        return self.db.execute(search_stmt(query, user_id, limit, offset)).all()
+
+
+class AsyncSearchRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(self, query: str, user_id: uuid.UUID | None, limit: int, offset: int) -> list[Row]:
+        return (await self.db.execute(search_stmt(query, user_id, limit, offset))).all()
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..infrastructure.replicas import get_async_read_db, get_read_db
+from ..infrastructure.json import ConverterJSONResponse, Pagination, precompile_unstructure
+from src.middleware import get_current_user
+from src.config import settings
+from .core import SearchHit, SearchPage
+from .repository import SearchRepository, AsyncSearchRepository
+from .service import SearchService, AsyncSearchService
+
+router = APIRouter(prefix="/search", tags=["search"])
+# Same routes on AsyncSession, mounted instead of `router` when DATABASE_ASYNC is set
+async_router = APIRouter(prefix="/search", tags=["search"])
+
+precompile_unstructure(ConverterJSONResponse.converter, SearchHit, SearchPage)
+
+@router.get("", response_model=SearchPage, response_class=ConverterJSONResponse)
+def search(
+    q: str = Query(..., min_length=1, max_length=256),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Full-text search over ticket titles/descriptions and message contents,
+    best match first. Scoped to the caller's tickets unless the caller is ADMIN.
+    """
+    svc = SearchService(SearchRepository(db))
+    return ConverterJSONResponse(svc.search(current_user, q, Pagination(page=page, size=page_size)))
+
+@async_router.get("", response_model=SearchPage, response_class=ConverterJSONResponse)
+async def search_async(
+    q: str = Query(..., min_length=1, max_length=256),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    svc = AsyncSearchService(AsyncSearchRepository(db))
+    return ConverterJSONResponse(await svc.search(current_user, q, Pagination(page=page, size=page_size)))
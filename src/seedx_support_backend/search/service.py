@@ -0,0 +1,54 @@
+from sqlalchemy.engine import Row
+from ..infrastructure.json import Pagination
+from ..users.core import Role, UserPublic
+from .core import SearchHit, SearchPage
+from .repository import SearchRepository, AsyncSearchRepository
+
+class SearchService:
+    def __init__(self, repo: SearchRepository):
+        self.repo = repo
+
+    @staticmethod
+    def scope(user: UserPublic):
+        """
+        Admins search every user's tickets, everybody else only their own.
+        """
+        return None if user.role == Role.ADMIN else user.id
+
+    @staticmethod
+    def to_page(rows: list[Row], pagination: Pagination) -> SearchPage:
+        """
+        `rows` holds up to size + 1 hits; the extra one only signals a next page.
+        """
+        items = [SearchHit(
+            kind=r.kind,
+            ticket_id=r.ticket_id,
+            message_id=r.message_id,
+            title=r.title,
+            snippet=r.snippet,
+            rank=r.rank,
+            created_at=r.created_at,
+        ) for r in rows[:pagination.size]]
+        return SearchPage(
+            items=items,
+            page=pagination.page,
+            page_size=pagination.size,
+            has_more=len(rows) > pagination.size,
+        )
+
+    def search(self, user: UserPublic, query: str, pagination: Pagination) -> SearchPage:
+        rows = self.repo.search(
+            query, self.scope(user), pagination.size + 1, (pagination.page - 1) * pagination.size
+        )
+        return self.to_page(rows, pagination)
+
+
+class AsyncSearchService:
+    def __init__(self, repo: AsyncSearchRepository):
+        self.repo = repo
+
+    async def search(self, user: UserPublic, query: str, pagination: Pagination) -> SearchPage:
+        rows = await self.repo.search(
+            query, SearchService.scope(user), pagination.size + 1, (pagination.page - 1) * pagination.size
+        )
+        return SearchService.to_page(rows, pagination)
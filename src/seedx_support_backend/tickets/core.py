@@ -1,20 +1,49 @@
 from dataclasses import dataclass
+from enum import Enum
 from datetime import datetime
+from typing import List, Optional
 from pydantic import BaseModel, Field
 import uuid
 
-@dataclass
+class TicketStatus(str, Enum):
+    OPEN = "open"
+    PENDING = "pending"
+    RESOLVED = "resolved"
+    CLOSED = "closed"
+
+@dataclass(slots=True)
 class TicketBase:
     title: str
     description: str
 
-class TicketCreate(TicketBase, BaseModel):
-    pass
+class TicketCreate(BaseModel):
+    title: str
+    description: str
+
+class TicketStatusUpdate(BaseModel):
+    status: TicketStatus
 
-@dataclass
+@dataclass(slots=True)
 class TicketRead(TicketBase):
     id: uuid.UUID
     status: str
     created_at: datetime
     updated_at: datetime
     user_id: uuid.UUID
+
+@dataclass(slots=True)
+class TicketPage:
+    items: List[TicketRead]
+    next_cursor: Optional[str] = None
+
+@dataclass(slots=True)
+class InboxItem(TicketRead):
+    message_count: int = 0
+    last_message_at: Optional[datetime] = None
+    last_message_preview: Optional[str] = None
+    last_message_is_ai: bool = False
+
+@dataclass(slots=True)
+class InboxPage:
+    items: List[InboxItem]
+    next_cursor: Optional[str] = None
@@ -1,12 +1,20 @@
 from uuid import uuid4
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, FetchedValue, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from ..infrastructure.database import Base
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # keyset pagination of a user's tickets on (created_at, id)
+        Index("ix_tickets_user_id_created_at", "user_id", "created_at", "id"),
+        # admin listing across users, unfiltered and by status
+        Index("ix_tickets_created_at", "created_at", "id"),
+        Index("ix_tickets_status_created_at", "status", "created_at", "id"),
+        Index("ix_tickets_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     title = Column(String, nullable=False)
@@ -14,6 +22,15 @@ class Ticket(Base):
     status = Column(String, default="open", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # full-text search document, maintained by the tickets_search_vector
+    # trigger (see migration c52a8e0f6d17); deferred so listings never load it
+    search_vector = deferred(Column(TSVECTOR, server_default=FetchedValue(), server_onupdate=FetchedValue()))
+
+    # inbox aggregates, maintained by MessageRepository in the inserting transaction
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_message_at = Column(DateTime, nullable=True)
+    last_message_preview = Column(String, nullable=True)
+    last_message_is_ai = Column(Boolean, default=False, server_default="false", nullable=False)
 
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="tickets")
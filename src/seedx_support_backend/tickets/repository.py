@@ -1,11 +1,109 @@
 import uuid
+from typing import AsyncIterator, Iterator
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.seedx_support_backend.infrastructure.repository import RepositoryInterface
+from src.seedx_support_backend.infrastructure.events import encode_event, notify_stmt
+from src.seedx_support_backend.infrastructure.json import CursorPagination
+from src.seedx_support_backend.infrastructure.sql_repository import SQLAlchemyRepository
 from .models import Ticket
 
-class TicketRepository(RepositoryInterface[Ticket]):
+class TicketRepository(SQLAlchemyRepository[Ticket]):
     def __init__(self, db: Session):
         super().__init__(Ticket, db)
 
     def list_by_user(self, user_id: uuid.UUID) -> list[Ticket]:
         return self.db.query(self.model).filter(Ticket.user_id == user_id).all()
+
+    def page_by_user(self, user_id: uuid.UUID, limit: int, after: CursorPagination | None = None) -> list[Ticket]:
+        """
+        Newest first, keyset on (created_at, id). Fetches `limit` rows; callers
+        ask for one extra row to learn whether another page exists.
+        """
+        return list(self.db.scalars(page_by_user_stmt(user_id, limit, after)))
+
+    def iter_by_user(self, user_id: uuid.UUID, batch_size: int) -> Iterator[Ticket]:
+        """
+        All of a user's tickets, newest first, read through a server-side
+        cursor `batch_size` rows at a time.
+        """
+        return iter(self.db.scalars(iter_by_user_stmt(user_id, batch_size)))
+
+    def version(self, ticket_id: uuid.UUID) -> Row | None:
+        """
+        (user_id, updated_at) of a ticket, without loading the row into the session.
+        """
+        return self.db.execute(version_stmt(ticket_id)).first()
+
+    def update_status(self, ticket: Ticket, status: str) -> Ticket:
+        """
+        Set the status and NOTIFY /tickets/{id}/events watchers on commit.
+        """
+        ticket.status = status
+        self.db.execute(notify_stmt(status_event(ticket.id, status)))
+        self.db.commit()
+        self.db.refresh(ticket)
+        return ticket
+
+
+def version_stmt(ticket_id: uuid.UUID):
+    return select(Ticket.user_id, Ticket.updated_at).where(Ticket.id == ticket_id)
+
+
+def status_event(ticket_id: uuid.UUID, status: str) -> str:
+    return encode_event({"type": "status", "ticket_id": str(ticket_id), "status": status})
+
+
+def page_by_user_stmt(user_id: uuid.UUID, limit: int, after: CursorPagination | None):
+    stmt = select(Ticket).where(Ticket.user_id == user_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(Ticket.created_at, Ticket.id) < (after.created_at, after.id))
+    return stmt.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit)
+
+
+def iter_by_user_stmt(user_id: uuid.UUID, batch_size: int):
+    return (
+        select(Ticket)
+        .where(Ticket.user_id == user_id)
+        .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+
+
+class AsyncTicketRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, ticket_id: uuid.UUID) -> Ticket | None:
+        return await self.db.get(Ticket, ticket_id)
+
+    async def create(self, data: dict) -> Ticket:
+        ticket = Ticket(**data)
+        self.db.add(ticket)
+        await self.db.commit()
+        await self.db.refresh(ticket)
+        return ticket
+
+    async def list_by_user(self, user_id: uuid.UUID) -> list[Ticket]:
+        result = await self.db.scalars(select(Ticket).where(Ticket.user_id == user_id))
+        return list(result.all())
+
+    async def page_by_user(self, user_id: uuid.UUID, limit: int, after: CursorPagination | None = None) -> list[Ticket]:
+        result = await self.db.scalars(page_by_user_stmt(user_id, limit, after))
+        return list(result.all())
+
+    async def iter_by_user(self, user_id: uuid.UUID, batch_size: int) -> AsyncIterator[Ticket]:
+        result = await self.db.stream_scalars(iter_by_user_stmt(user_id, batch_size))
+        async for ticket in result:
+            yield ticket
+
+    async def version(self, ticket_id: uuid.UUID) -> Row | None:
+        return (await self.db.execute(version_stmt(ticket_id))).first()
+
+    async def update_status(self, ticket: Ticket, status: str) -> Ticket:
+        ticket.status = status
+        await self.db.execute(notify_stmt(status_event(ticket.id, status)))
+        await self.db.commit()
+        await self.db.refresh(ticket)
+        return ticket
@@ -1,20 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import uuid
 from typing import List
-from ..infrastructure.database import get_db
+from ..infrastructure.database import get_db, get_async_db, SessionLocal, AsyncSessionLocal
+from ..infrastructure.etag import conditional_get
+from ..infrastructure.events import sse_ticket_events
+from ..infrastructure.replicas import async_read_sessionmaker, get_async_read_db, get_read_db, read_sessionmaker
+from ..infrastructure.json import (
+    ConverterJSONResponse,
+    NDJSON_MEDIA_TYPE,
+    aiter_ndjson,
+    iter_ndjson,
+    precompile_unstructure,
+    wants_ndjson,
+)
 from src.middleware import get_current_user
-from .core import TicketCreate, TicketRead
-from .repository import TicketRepository
-from .service import TicketService
+from src.config import settings
+from ..ai.repository import INDEXED_STATUSES, AsyncResolvedTicketRepository, ResolvedTicketRepository
+from ..ai.retrieval import ticket_index
+from ..ai.service import AsyncTicketIndexService, TicketIndexService
+from .core import InboxItem, InboxPage, TicketCreate, TicketRead, TicketPage, TicketStatusUpdate
+from .repository import TicketRepository, AsyncTicketRepository
+from .service import TicketService, AsyncTicketService
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
+# Same routes on AsyncSession, mounted instead of `router` when DATABASE_ASYNC is set
+async_router = APIRouter(prefix="/tickets", tags=["tickets"])
 
-@router.get("", response_model=List[TicketRead])
-def list_tickets(current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+# Read endpoints return ConverterJSONResponse: the DTOs are built by the
+# service already, so response_model is kept for the schema only.
+precompile_unstructure(ConverterJSONResponse.converter, TicketRead, TicketPage, InboxItem, InboxPage)
+
+def stream_tickets_ndjson(user_id: uuid.UUID, session_factory=SessionLocal):
+    # the body outlives the request's dependencies, so it owns its session
+    with session_factory() as db:
+        svc = TicketService(TicketRepository(db))
+        yield from iter_ndjson(svc.iter_tickets(user_id, settings.STREAM_BATCH_SIZE))
+
+async def astream_tickets_ndjson(user_id: uuid.UUID, session_factory=AsyncSessionLocal):
+    async with session_factory() as db:
+        svc = AsyncTicketService(AsyncTicketRepository(db))
+        async for line in aiter_ndjson(svc.iter_tickets(user_id, settings.STREAM_BATCH_SIZE)):
+            yield line
+
+def index_resolved_ticket(ticket_id: uuid.UUID):
+    # runs after the response, so it owns its session
+    with SessionLocal() as db:
+        TicketIndexService(ResolvedTicketRepository(db), ticket_index).index_tickets([ticket_id])
+
+async def aindex_resolved_ticket(ticket_id: uuid.UUID):
+    async with AsyncSessionLocal() as db:
+        await AsyncTicketIndexService(AsyncResolvedTicketRepository(db), ticket_index).index_tickets([ticket_id])
+
+def wants_indexing(status_in: TicketStatusUpdate) -> bool:
+    return settings.AI_RETRIEVAL_ENABLED and status_in.status.value in INDEXED_STATUSES
+
+@router.get("", response_model=TicketPage, response_class=ConverterJSONResponse)
+def list_tickets(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """
+    The caller's tickets, newest first. Pass `next_cursor` back as `cursor` for the next page.
+    With `Accept: application/x-ndjson` all tickets are streamed instead, one per line.
+    """
+    if wants_ndjson(request):
+        return StreamingResponse(stream_tickets_ndjson(current_user.id, read_sessionmaker(request)), media_type=NDJSON_MEDIA_TYPE)
     repo = TicketRepository(db)
     svc = TicketService(repo)
-    return svc.list_tickets(current_user.id)
+    return ConverterJSONResponse(svc.list_tickets_page(current_user.id, limit, cursor))
 
 @router.post("", response_model=TicketRead)
 def create_ticket(ticket_in: TicketCreate, current_user=Depends(get_current_user), db: Session = Depends(get_db)):
@@ -22,11 +81,118 @@ def create_ticket(ticket_in: TicketCreate, current_user=Depends(get_current_user
     svc = TicketService(repo)
     return svc.create_ticket(current_user.id, ticket_in)
 
-@router.get("/{ticket_id}", response_model=TicketRead)
-def get_ticket(ticket_id: uuid.UUID, current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+@router.get("/inbox", response_model=InboxPage, response_class=ConverterJSONResponse)
+def inbox(
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """
+    The caller's tickets, newest first, with message count and last-message preview.
+    """
+    svc = TicketService(TicketRepository(db))
+    return ConverterJSONResponse(svc.inbox_page(current_user.id, limit, cursor))
+
+@router.get("/{ticket_id}", response_model=TicketRead, response_class=ConverterJSONResponse)
+def get_ticket(ticket_id: uuid.UUID, request: Request, current_user=Depends(get_current_user), db: Session = Depends(get_read_db)):
+    """
+    Sends a weak ETag; a matching If-None-Match gets a 304 without loading the ticket.
+    """
     repo = TicketRepository(db)
     svc = TicketService(repo)
+    if conditional_get.has_validator(request):
+        not_modified = conditional_get.not_modified(request, svc.current_etag(ticket_id, current_user.id))
+        if not_modified is not None:
+            return not_modified
     ticket = svc.get_ticket(ticket_id)
     if ticket.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return conditional_get.tagged(ConverterJSONResponse(ticket), TicketService.etag(ticket.id, ticket.updated_at))
+
+@router.patch("/{ticket_id}/status", response_model=TicketRead)
+def update_ticket_status(
+    ticket_id: uuid.UUID,
+    status_in: TicketStatusUpdate,
+    background_tasks: BackgroundTasks,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    svc = TicketService(TicketRepository(db))
+    ticket = svc.update_status(ticket_id, current_user.id, status_in.status)
+    if wants_indexing(status_in):
+        background_tasks.add_task(index_resolved_ticket, ticket_id)
     return ticket
+
+@router.get("/{ticket_id}/events")
+def ticket_events(ticket_id: uuid.UUID, current_user=Depends(get_current_user), db: Session = Depends(get_read_db)):
+    """
+    Server-sent events for new messages and status changes of a ticket,
+    pushed from Postgres NOTIFY; watching costs no queries after this check.
+    """
+    ticket = TicketService(TicketRepository(db)).get_ticket(ticket_id)
+    if ticket.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return StreamingResponse(sse_ticket_events(ticket_id), media_type="text/event-stream")
+
+
+@async_router.get("", response_model=TicketPage, response_class=ConverterJSONResponse)
+async def list_tickets_async(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if wants_ndjson(request):
+        return StreamingResponse(astream_tickets_ndjson(current_user.id, async_read_sessionmaker(request)), media_type=NDJSON_MEDIA_TYPE)
+    svc = AsyncTicketService(AsyncTicketRepository(db))
+    return ConverterJSONResponse(await svc.list_tickets_page(current_user.id, limit, cursor))
+
+@async_router.post("", response_model=TicketRead)
+async def create_ticket_async(ticket_in: TicketCreate, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    svc = AsyncTicketService(AsyncTicketRepository(db))
+    return await svc.create_ticket(current_user.id, ticket_in)
+
+@async_router.get("/inbox", response_model=InboxPage, response_class=ConverterJSONResponse)
+async def inbox_async(
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    svc = AsyncTicketService(AsyncTicketRepository(db))
+    return ConverterJSONResponse(await svc.inbox_page(current_user.id, limit, cursor))
+
+@async_router.get("/{ticket_id}", response_model=TicketRead, response_class=ConverterJSONResponse)
+async def get_ticket_async(ticket_id: uuid.UUID, request: Request, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_async_read_db)):
+    svc = AsyncTicketService(AsyncTicketRepository(db))
+    if conditional_get.has_validator(request):
+        not_modified = conditional_get.not_modified(request, await svc.current_etag(ticket_id, current_user.id))
+        if not_modified is not None:
+            return not_modified
+    ticket = await svc.get_ticket(ticket_id)
+    if ticket.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return conditional_get.tagged(ConverterJSONResponse(ticket), TicketService.etag(ticket.id, ticket.updated_at))
+
+@async_router.patch("/{ticket_id}/status", response_model=TicketRead)
+async def update_ticket_status_async(
+    ticket_id: uuid.UUID,
+    status_in: TicketStatusUpdate,
+    background_tasks: BackgroundTasks,
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    svc = AsyncTicketService(AsyncTicketRepository(db))
+    ticket = await svc.update_status(ticket_id, current_user.id, status_in.status)
+    if wants_indexing(status_in):
+        background_tasks.add_task(aindex_resolved_ticket, ticket_id)
+    return ticket
+
+@async_router.get("/{ticket_id}/events")
+async def ticket_events_async(ticket_id: uuid.UUID, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_async_read_db)):
+    ticket = await AsyncTicketService(AsyncTicketRepository(db)).get_ticket(ticket_id)
+    if ticket.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return StreamingResponse(sse_ticket_events(ticket_id), media_type="text/event-stream")
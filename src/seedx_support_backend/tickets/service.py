@@ -1,15 +1,19 @@
 from fastapi import HTTPException, status
 import uuid
-from .repository import TicketRepository
-from .core import TicketCreate, TicketRead
+from typing import AsyncIterator, Iterator
+from .repository import TicketRepository, AsyncTicketRepository
+from ..infrastructure.etag import weak_etag
+from ..infrastructure.json import CursorPagination, decode_cursor, encode_cursor
+from .core import InboxItem, InboxPage, TicketCreate, TicketRead, TicketPage, TicketStatus
+from .models import Ticket
 
 class TicketService:
     def __init__(self, repo: TicketRepository):
         self.repo = repo
 
-    def list_tickets(self, user_id: uuid.UUID) -> list[TicketRead]:
-        tickets = self.repo.list_by_user(user_id)
-        return [TicketRead(
+    @staticmethod
+    def to_read(t: Ticket) -> TicketRead:
+        return TicketRead(
             id=t.id,
             title=t.title,
             description=t.description,
@@ -17,16 +21,45 @@ class TicketService:
             created_at=t.created_at,
             updated_at=t.updated_at,
             user_id=t.user_id,
-        ) for t in tickets]
+        )
 
-    def create_ticket(self, user_id: uuid.UUID, ticket_in: TicketCreate) -> TicketRead:
-        t = self.repo.create({
-            "title": ticket_in.title,
-            "description": ticket_in.description,
-            "status": "open",
-            "user_id": user_id,
-        })
-        return TicketRead(
+    @staticmethod
+    def etag(ticket_id: uuid.UUID, updated_at) -> str:
+        return weak_etag("ticket", ticket_id, updated_at.isoformat())
+
+    @staticmethod
+    def check_owner(version, user_id: uuid.UUID) -> None:
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+        if version.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    @classmethod
+    def check_version(cls, version, ticket_id: uuid.UUID, user_id: uuid.UUID) -> str:
+        cls.check_owner(version, user_id)
+        return cls.etag(ticket_id, version.updated_at)
+
+    @staticmethod
+    def parse_cursor(cursor: str | None) -> CursorPagination | None:
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    @classmethod
+    def to_page(cls, tickets: list[Ticket], limit: int) -> TicketPage:
+        """
+        `tickets` holds up to limit + 1 rows; the extra row only signals a next page.
+        """
+        items = [cls.to_read(t) for t in tickets[:limit]]
+        next_cursor = None
+        if len(tickets) > limit:
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        return TicketPage(items=items, next_cursor=next_cursor)
+
+    @staticmethod
+    def to_inbox_item(t: Ticket) -> InboxItem:
+        return InboxItem(
             id=t.id,
             title=t.title,
             description=t.description,
@@ -34,18 +67,121 @@ class TicketService:
             created_at=t.created_at,
             updated_at=t.updated_at,
             user_id=t.user_id,
+            message_count=t.message_count,
+            last_message_at=t.last_message_at,
+            last_message_preview=t.last_message_preview,
+            last_message_is_ai=t.last_message_is_ai,
         )
 
+    @classmethod
+    def to_inbox_page(cls, tickets: list[Ticket], limit: int) -> InboxPage:
+        items = [cls.to_inbox_item(t) for t in tickets[:limit]]
+        next_cursor = None
+        if len(tickets) > limit:
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        return InboxPage(items=items, next_cursor=next_cursor)
+
+    def inbox_page(self, user_id: uuid.UUID, limit: int, cursor: str | None = None) -> InboxPage:
+        """
+        The aggregates live on the ticket rows, so this is the plain keyset
+        page query with no join or GROUP BY over messages.
+        """
+        tickets = self.repo.page_by_user(user_id, limit + 1, self.parse_cursor(cursor))
+        return self.to_inbox_page(tickets, limit)
+
+    def list_tickets(self, user_id: uuid.UUID) -> list[TicketRead]:
+        tickets = self.repo.list_by_user(user_id)
+        return [self.to_read(t) for t in tickets]
+
+    def list_tickets_page(self, user_id: uuid.UUID, limit: int, cursor: str | None = None) -> TicketPage:
+        tickets = self.repo.page_by_user(user_id, limit + 1, self.parse_cursor(cursor))
+        return self.to_page(tickets, limit)
+
+    def iter_tickets(self, user_id: uuid.UUID, batch_size: int) -> Iterator[TicketRead]:
+        for t in self.repo.iter_by_user(user_id, batch_size):
+            yield self.to_read(t)
+
+    def create_ticket(self, user_id: uuid.UUID, ticket_in: TicketCreate) -> TicketRead:
+        t = self.repo.create({
+            "title": ticket_in.title,
+            "description": ticket_in.description,
+            "status": "open",
+            "user_id": user_id,
+        })
+        return self.to_read(t)
+
     def get_ticket(self, ticket_id: uuid.UUID) -> TicketRead:
         t = self.repo.get(ticket_id)
         if not t:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
-        return TicketRead(
-            id=t.id,
-            title=t.title,
-            description=t.description,
-            status=t.status,
-            created_at=t.created_at,
-            updated_at=t.updated_at,
-            user_id=t.user_id,
-        )
+        return self.to_read(t)
+
+    def current_etag(self, ticket_id: uuid.UUID, user_id: uuid.UUID) -> str:
+        """
+        ETag of the ticket as stored, from its updated_at; no row is loaded.
+        """
+        return self.check_version(self.repo.version(ticket_id), ticket_id, user_id)
+
+    def check_access(self, ticket_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        """
+        404/403 unless the ticket exists and belongs to `user_id`; no row is loaded.
+        """
+        self.check_owner(self.repo.version(ticket_id), user_id)
+
+    def update_status(self, ticket_id: uuid.UUID, user_id: uuid.UUID, new_status: TicketStatus) -> TicketRead:
+        t = self.repo.get(ticket_id)
+        if not t:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+        if t.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+        return self.to_read(self.repo.update_status(t, new_status.value))
+
+
+class AsyncTicketService:
+    def __init__(self, repo: AsyncTicketRepository):
+        self.repo = repo
+
+    async def list_tickets(self, user_id: uuid.UUID) -> list[TicketRead]:
+        tickets = await self.repo.list_by_user(user_id)
+        return [TicketService.to_read(t) for t in tickets]
+
+    async def list_tickets_page(self, user_id: uuid.UUID, limit: int, cursor: str | None = None) -> TicketPage:
+        tickets = await self.repo.page_by_user(user_id, limit + 1, TicketService.parse_cursor(cursor))
+        return TicketService.to_page(tickets, limit)
+
+    async def inbox_page(self, user_id: uuid.UUID, limit: int, cursor: str | None = None) -> InboxPage:
+        tickets = await self.repo.page_by_user(user_id, limit + 1, TicketService.parse_cursor(cursor))
+        return TicketService.to_inbox_page(tickets, limit)
+
+    async def iter_tickets(self, user_id: uuid.UUID, batch_size: int) -> AsyncIterator[TicketRead]:
+        async for t in self.repo.iter_by_user(user_id, batch_size):
+            yield TicketService.to_read(t)
+
+    async def create_ticket(self, user_id: uuid.UUID, ticket_in: TicketCreate) -> TicketRead:
+        t = await self.repo.create({
+            "title": ticket_in.title,
+            "description": ticket_in.description,
+            "status": "open",
+            "user_id": user_id,
+        })
+        return TicketService.to_read(t)
+
+    async def get_ticket(self, ticket_id: uuid.UUID) -> TicketRead:
+        t = await self.repo.get(ticket_id)
+        if not t:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+        return TicketService.to_read(t)
+
+    async def current_etag(self, ticket_id: uuid.UUID, user_id: uuid.UUID) -> str:
+        return TicketService.check_version(await self.repo.version(ticket_id), ticket_id, user_id)
+
+    async def check_access(self, ticket_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        TicketService.check_owner(await self.repo.version(ticket_id), user_id)
+
+    async def update_status(self, ticket_id: uuid.UUID, user_id: uuid.UUID, new_status: TicketStatus) -> TicketRead:
+        t = await self.repo.get(ticket_id)
+        if not t:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
+        if t.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+        return TicketService.to_read(await self.repo.update_status(t, new_status.value))
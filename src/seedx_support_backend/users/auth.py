@@ -4,7 +4,13 @@ from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from src.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds == default_rounds makes verify_and_update flag hashes made with a lower cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 def hash_password(password: str) -> str:
@@ -15,6 +21,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password; on success also return a fresh hash when the stored
+    one is outdated (deprecated scheme or lower bcrypt cost), else None.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     now = datetime.now(timezone.utc)
@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from src.config import settings
+from ..infrastructure.metrics import metrics
+from .core import UserPublic
+
+
+class UserCache:
+    """
+    Bounded LRU of authenticated users keyed by user id. An entry lives for
+    at most `ttl` seconds and never past the expiry of the JWT that filled it.
+
+    The cache is per worker process: writes through UserRepository invalidate
+    the local entry, other workers converge within `ttl`.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, UserPublic]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id) -> UserPublic | None:
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            deadline, user = entry
+            if deadline <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def put(self, user_id, user: UserPublic, token_exp: float | None = None):
+        """
+        Cache `user`; `token_exp` is the JWT `exp` claim (epoch seconds).
+        """
+        lifetime = self.ttl
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+        if lifetime <= 0 or self.maxsize <= 0:
+            return
+        key = str(user_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + lifetime, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+user_cache = UserCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+metrics.register("user_cache", user_cache.snapshot)
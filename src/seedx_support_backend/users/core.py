@@ -9,19 +9,21 @@ class Role(str, Enum):
     ADMIN = "ADMIN"
     USER = "USER"
 
-@dataclass
+@dataclass(slots=True)
 class UserBase:
     name: str
     email: EmailStr
 
-class UserCreate(UserBase, BaseModel):
+class UserCreate(BaseModel):
+    name: str
+    email: EmailStr
     password: str = Field(min_length=6)
 
 class UserLogin(BaseModel):
     email: EmailStr
     password: str = Field(min_length=6)
 
-@dataclass
+@dataclass(slots=True)
 class UserPublic(UserBase):
     id: uuid.UUID
     role: Role
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+
+from src.config import settings
+from ..infrastructure.metrics import metrics
+from .auth import hash_password, verify_and_update_password
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so login storms neither hold the
+    GIL in the API worker nor starve the request threadpool.
+
+    At most `max_pending` hash/verify jobs may be queued or running; beyond
+    that callers get a 503 straight away instead of queueing without bound.
+    """
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        # bumped from request threads and the pool's callback thread
+        self._stats_lock = threading.Lock()
+        self.rejected = 0
+        self.completed = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # created lazily so importing this module never forks
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future: Future):
+        with self._stats_lock:
+            self.completed += 1
+        self._slots.release()
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(hash_password, password))
+
+    async def averify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        return await asyncio.wrap_future(self._submit(verify_and_update_password, password, hashed))
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            completed, rejected = self.completed, self.rejected
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "completed": completed,
+            "rejected": rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+metrics.register("password_hasher", password_hasher.snapshot)
@@ -1,25 +1,36 @@
 from typing import Iterator
+import uuid
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import NoResultFound
 import ulid
 
-from src.seedx_support_backend.infrastructure.repository import RepositoryInterface, EntityNotFound
+from src.seedx_support_backend.infrastructure.repository import EntityNotFound
+from src.seedx_support_backend.infrastructure.sql_repository import SQLAlchemyRepository
+from .cache import user_cache
 from .models import User
 
 
-class UserRepository(RepositoryInterface[User]):
+class UserRepository(SQLAlchemyRepository[User]):
     def __init__(self, db: Session):
-        self.db = db
+        super().__init__(User, db)
+
+    def get(self, user_id: uuid.UUID | str) -> User | None:
+        return self.db.get(User, uuid.UUID(str(user_id)))
 
     def save(self, entity: User) -> User:
         self.db.add(entity)
         self.db.commit()
         self.db.refresh(entity)
+        user_cache.invalidate(entity.id)
         return entity
 
     def save_all(self, entities: list[User]):
         self.db.add_all(entities)
         self.db.commit()
+        for entity in entities:
+            user_cache.invalidate(entity.id)
 
     def find_all(self) -> Iterator[User]:
         return iter(self.db.query(User).all())
@@ -34,6 +45,7 @@ class UserRepository(RepositoryInterface[User]):
         user = self.find_one(id)
         self.db.delete(user)
         self.db.commit()
+        user_cache.invalidate(user.id)
 
     def find_all_by(self, **kwargs) -> Iterator[User]:
         return iter(self.db.query(User).filter_by(**kwargs).all())
@@ -47,9 +59,36 @@ class UserRepository(RepositoryInterface[User]):
     def delete_all(self):
         self.db.query(User).delete()
         self.db.commit()
+        user_cache.clear()
 
     def close(self):
         self.db.close()
 
     def get_by_email(self, email: str) -> User | None:
         return self.db.query(User).filter(User.email == email).first()
+
+
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, user_id: uuid.UUID | str) -> User | None:
+        return await self.db.get(User, uuid.UUID(str(user_id)))
+
+    async def create(self, data: dict) -> User:
+        user = User(**data)
+        self.db.add(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user
+
+    async def save(self, entity: User) -> User:
+        self.db.add(entity)
+        await self.db.commit()
+        await self.db.refresh(entity)
+        user_cache.invalidate(entity.id)
+        return entity
+
+    async def get_by_email(self, email: str) -> User | None:
+        result = await self.db.scalars(select(User).where(User.email == email))
+        return result.first()
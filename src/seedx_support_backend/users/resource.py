@@ -1,22 +1,39 @@
 from fastapi import APIRouter, Depends
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..infrastructure.database import get_db
+from ..infrastructure.database import get_db, get_async_db
 from .core import UserCreate, UserLogin, AuthResponse, UserPublic
-from .repository import UserRepository
-from .service import UserService
+from .repository import UserRepository, AsyncUserRepository
+from .service import UserService, AsyncUserService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
+# Same routes on AsyncSession, mounted instead of `router` when DATABASE_ASYNC is set
+async_router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/signup", response_model=UserPublic)
-def signup(user_in: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_in: UserCreate, db: Session = Depends(get_db)):
     repo = UserRepository(db)
     svc = UserService(repo)
-    return svc.register_user(user_in)
+    return await svc.register_user(user_in)
 
 @router.post("/login", response_model=AuthResponse)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     repo = UserRepository(db)
     svc = UserService(repo)
-    token = svc.authenticate_user(credentials.email, credentials.password)
-    user = svc.validate_token(token)
+    token = await svc.authenticate_user(credentials.email, credentials.password)
+    user = await run_in_threadpool(svc.validate_token, token)
+    return AuthResponse(access_token=token, user=user)
+
+
+@async_router.post("/signup", response_model=UserPublic)
+async def signup_async(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    svc = AsyncUserService(AsyncUserRepository(db))
+    return await svc.register_user(user_in)
+
+@async_router.post("/login", response_model=AuthResponse)
+async def login_async(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    svc = AsyncUserService(AsyncUserRepository(db))
+    token = await svc.authenticate_user(credentials.email, credentials.password)
+    user = await svc.validate_token(token)
     return AuthResponse(access_token=token, user=user)
@@ -1,7 +1,10 @@
 from datetime import datetime
 from fastapi import HTTPException, status
-from .repository import UserRepository
-from .auth import hash_password, verify_password, create_access_token, decode_token
+from starlette.concurrency import run_in_threadpool
+from .repository import UserRepository, AsyncUserRepository
+from .cache import user_cache
+from .auth import create_access_token, decode_token
+from .hashing import password_hasher
 from .core import UserCreate, Role, UserPublic
 from typing import Optional
 
@@ -18,11 +21,15 @@ class UserService:
         self.jwt_secret = jwt_secret
         self.expire_minutes = expire_minutes
 
-    def register_user(self, user_in: UserCreate) -> UserPublic:
-        if self.repo.get_by_email(user_in.email):
+    async def register_user(self, user_in: UserCreate) -> UserPublic:
+        """
+        The sync repository runs in the threadpool and bcrypt is awaited on the
+        password hasher's pool, so no request thread blocks on the hash.
+        """
+        if await run_in_threadpool(self.repo.get_by_email, user_in.email):
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-        hashed = hash_password(user_in.password)
-        user = self.repo.create({
+        hashed = await password_hasher.ahash(user_in.password)
+        user = await run_in_threadpool(self.repo.create, {
             "name": user_in.name,
             "email": user_in.email,
             "hashed_password": hashed,
@@ -37,18 +44,57 @@ class UserService:
             updated_at=user.updated_at,
         )
 
-    def authenticate_user(self, email: str, password: str) -> str:
-        user = self.repo.get_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+    async def authenticate_user(self, email: str, password: str) -> str:
+        user = await run_in_threadpool(self.repo.get_by_email, email)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect credentials")
+        valid, new_hash = await password_hasher.averify_and_update(password, user.hashed_password)
+        if not valid:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect credentials")
+        if new_hash:
+            # stored hash predates the current bcrypt cost; upgrade it transparently
+            user.hashed_password = new_hash
+            await run_in_threadpool(self.repo.save, user)
         return create_access_token({"sub": str(user.id)})
 
     def validate_token(self, token: str) -> UserPublic:
         payload = decode_token(token)
+        cached = user_cache.get(payload.get("sub"))
+        if cached is not None:
+            return cached
+        return self.load_user(payload)
+
+    def load_user(self, payload: dict) -> UserPublic:
+        """
+        Fetch the user named by a decoded token and cache it until the token expires.
+        """
         user_id = payload.get("sub")
         user = self.repo.get(user_id)
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        public = UserPublic(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            role=Role(user.role),
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+        user_cache.put(user_id, public, payload.get("exp"))
+        return public
+
+
+
+class AsyncUserService:
+    """
+    AsyncSession flavour of UserService. bcrypt runs in the password hasher's
+    process pool, so the event loop is never blocked on it.
+    """
+    def __init__(self, repo: AsyncUserRepository):
+        self.repo = repo
+
+    @staticmethod
+    def _to_public(user) -> UserPublic:
         return UserPublic(
             id=user.id,
             name=user.name,
@@ -57,3 +103,43 @@ class UserService:
             created_at=user.created_at,
             updated_at=user.updated_at,
         )
+
+    async def register_user(self, user_in: UserCreate) -> UserPublic:
+        if await self.repo.get_by_email(user_in.email):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
+        hashed = await password_hasher.ahash(user_in.password)
+        user = await self.repo.create({
+            "name": user_in.name,
+            "email": user_in.email,
+            "hashed_password": hashed,
+            "role": Role.USER.value,
+        })
+        return self._to_public(user)
+
+    async def authenticate_user(self, email: str, password: str) -> str:
+        user = await self.repo.get_by_email(email)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect credentials")
+        valid, new_hash = await password_hasher.averify_and_update(password, user.hashed_password)
+        if not valid:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect credentials")
+        if new_hash:
+            user.hashed_password = new_hash
+            await self.repo.save(user)
+        return create_access_token({"sub": str(user.id)})
+
+    async def validate_token(self, token: str) -> UserPublic:
+        payload = decode_token(token)
+        cached = user_cache.get(payload.get("sub"))
+        if cached is not None:
+            return cached
+        return await self.load_user(payload)
+
+    async def load_user(self, payload: dict) -> UserPublic:
+        user_id = payload.get("sub")
+        user = await self.repo.get(user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        public = self._to_public(user)
+        user_cache.put(user_id, public, payload.get("exp"))
+        return public
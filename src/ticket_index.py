@@ -0,0 +1,101 @@
+"""
+Build and benchmark the retrieval index of resolved tickets.
+
+  python ticket_index.py build                  # index every resolved ticket
+  python ticket_index.py build --rebuild        # start from an empty index
+  python ticket_index.py bench --rows 1000000   # query latency on a synthetic index
+
+Tickets resolved while the app runs are added incrementally; `build` is for
+the first load, or to rebuild after changing AI_RETRIEVAL_DIM.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from seedx_support_backend.ai.repository import ResolvedTicketRepository
+from seedx_support_backend.ai.retrieval import IndexedTicket, TicketIndex, index_rows
+from seedx_support_backend.infrastructure.database import SessionLocal
+from src.config import settings
+
+
+def build(index: TicketIndex, batch_size: int, rebuild: bool):
+    if rebuild:
+        index.clear()
+    started = time.perf_counter()
+    total = 0
+    with SessionLocal() as db:
+        batch = []
+        for row in ResolvedTicketRepository(db).iter_all(batch_size):
+            batch.append(row)
+            if len(batch) == batch_size:
+                total += index_rows(index, batch)
+                batch = []
+        total += index_rows(index, batch)
+    elapsed = time.perf_counter() - started
+    print(f"indexed {total} tickets in {elapsed:.1f}s", file=sys.stderr)
+
+
+def bench(rows: int, dim: int, queries: int, batch: int, k: int, chunk_rows: int = 100_000):
+    """
+    Fill a throwaway index with `rows` random unit vectors and time `queries`
+    searches, `batch` queries per matrix product.
+    """
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as path:
+        index = TicketIndex(path, dim)
+        user_id = "00000000-0000-0000-0000-000000000000"
+        for start in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - start)
+            vectors = rng.standard_normal((n, dim), dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            # the scan cost does not depend on the text, so skip the vectorizer
+            index.add_vectors(
+                [IndexedTicket(f"00000000-0000-0000-0000-{start + i:012x}", user_id, "", "") for i in range(n)],
+                vectors,
+            )
+        started = time.perf_counter()
+        index.refresh()
+        print(f"{rows} rows x {dim} dims ({rows * dim * 4 / 2**20:.0f} MiB), loaded in {time.perf_counter() - started:.2f}s")
+
+        latencies = []
+        for _ in range(0, queries, batch):
+            q = rng.standard_normal((batch, dim), dtype=np.float32)
+            started = time.perf_counter()
+            index.search_many(q, k)
+            latencies.append((time.perf_counter() - started) / batch)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        print(f"batch {batch}, top {k}: p50 {p50:.2f} ms/query, p95 {p95:.2f} ms/query")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("build", help="index resolved tickets from the database")
+    load.add_argument("--batch-size", type=int, default=1000)
+    load.add_argument("--rebuild", action="store_true", help="clear the index first")
+
+    timing = sub.add_parser("bench", help="time searches on a synthetic index")
+    timing.add_argument("--rows", type=int, default=1_000_000)
+    timing.add_argument("--dim", type=int, default=settings.AI_RETRIEVAL_DIM)
+    timing.add_argument("--queries", type=int, default=64)
+    timing.add_argument("--batch", type=int, default=1, help="queries per matrix product")
+    timing.add_argument("--k", type=int, default=settings.AI_RETRIEVAL_TOP_K)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "build":
+        build(TicketIndex(), args.batch_size, args.rebuild)
+    else:
+        bench(args.rows, args.dim, args.queries, args.batch, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import os
+
+# Settings() requires these; unit tests never reach the database or upstream
+for name, value in {
+    "DATABASE_URL": "postgresql://test@localhost/test",
+    "JWT_SECRET": "test",
+    "GROK_API_KEY": "test",
+    "GROK_API_URL": "http://upstream.test/v1",
+    "ALLOWED_ORIGINS": "*",
+}.items():
+    os.environ.setdefault(name, value)
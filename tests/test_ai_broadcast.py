@@ -0,0 +1,64 @@
+import asyncio
+
+from seedx_support_backend.ai.broadcast import StreamBroadcaster
+
+CLOSE_DELAY = 0.05
+
+
+def upstream(events: list[str], *chunks: str, hang: bool = True):
+    """
+    open_stream for join(): yields `chunks`, then waits forever if `hang`.
+    Closing it takes CLOSE_DELAY, like shutting down an HTTP response.
+    """
+    async def stream():
+        try:
+            for chunk in chunks:
+                yield chunk
+            if hang:
+                await asyncio.Event().wait()
+        finally:
+            await asyncio.sleep(CLOSE_DELAY)
+            events.append("closed")
+    return stream
+
+
+async def test_slot_is_released_after_the_cancelled_upstream_is_closed():
+    events = []
+    broadcaster = StreamBroadcaster()
+    subscription = broadcaster.join("key", upstream(events, "a"), on_finish=lambda: events.append("released"))
+    async for chunk in subscription:
+        assert chunk == "a"
+        break
+    # what SSEResponse's on_close does when the client goes away
+    subscription.close()
+    flight = subscription.flight
+
+    # the last subscriber left: the upstream is cancelled but still shutting down
+    assert flight.subscribers == 0
+    assert events == []
+    await asyncio.wait((flight.task,))
+    assert events == ["closed", "released"]
+    assert not broadcaster.in_flight("key")
+
+
+async def test_slot_is_released_when_the_flight_is_cancelled_before_it_ran():
+    events = []
+    broadcaster = StreamBroadcaster()
+    subscription = broadcaster.join("key", upstream(events, "a"), on_finish=lambda: events.append("released"))
+    subscription.close()
+
+    assert events == ["released"]
+    await asyncio.wait((subscription.flight.task,))
+    assert events == ["released"]
+
+
+async def test_completed_stream_releases_once_for_every_subscriber():
+    events = []
+    broadcaster = StreamBroadcaster()
+    first = broadcaster.join("key", upstream(events, "a", "b", hang=False), on_finish=lambda: events.append("released"))
+    second = broadcaster.join("key", upstream(events), on_finish=lambda: events.append("joined"))
+
+    assert [c async for c in first] == ["a", "b"]
+    assert [c async for c in second] == ["a", "b"]
+    await asyncio.wait((first.flight.task,))
+    assert events == ["joined", "closed", "released"]
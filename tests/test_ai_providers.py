@@ -0,0 +1,327 @@
+import asyncio
+
+import httpx
+import pytest
+
+from seedx_support_backend.ai import providers
+from seedx_support_backend.ai.circuit import CircuitBreaker, CircuitOpenError
+from seedx_support_backend.ai.providers import AIProvider, AIUpstreamError
+from seedx_support_backend.ai.service import AIService
+
+FAST = 0.0
+SLOW = 0.3
+DEADLINE = 0.1
+
+
+class ScriptedBody(httpx.AsyncByteStream):
+    """
+    Response body sending `lines` as (delay, bytes) pairs; an exception in
+    place of the bytes is raised mid-stream.
+    """
+    def __init__(self, lines):
+        self.lines = lines
+        self.finished = False
+        self.closed = False
+
+    async def __aiter__(self):
+        for delay, line in self.lines:
+            await asyncio.sleep(delay)
+            if isinstance(line, Exception):
+                raise line
+            yield line
+        self.finished = True
+
+    async def aclose(self):
+        self.closed = True
+
+
+class Upstream:
+    """
+    MockTransport handler playing one scripted reply per attempt: an
+    exception to raise, or (status, lines) for the response.
+    """
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = 0
+        self.bodies: list[ScriptedBody] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        reply = self.replies[min(self.requests, len(self.replies) - 1)]
+        self.requests += 1
+        if isinstance(reply, Exception):
+            raise reply
+        status, lines = reply
+        self.bodies.append(ScriptedBody(lines))
+        return httpx.Response(status, stream=self.bodies[-1])
+
+
+def sse(*chunks, delay=FAST):
+    return 200, [(delay, f"data: {c}\n\n".encode()) for c in chunks] + [(FAST, b"data: [DONE]\n\n")]
+
+
+def make_provider(
+    upstream: Upstream, retries: int = 2, breaker: CircuitBreaker | None = None, name: str = "test"
+) -> AIProvider:
+    return AIProvider(
+        name,
+        "http://upstream.test/v1",
+        "key",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(upstream)),
+        breaker=breaker or CircuitBreaker(window=20, min_requests=20, error_rate=1.0, cooldown=60),
+        first_token_timeout=DEADLINE,
+        idle_timeout=DEADLINE,
+        retries=retries,
+    )
+
+
+async def collect(provider: AIProvider, received: list | None = None) -> list[str]:
+    received = [] if received is None else received
+    async for chunk in provider.stream("prompt"):
+        received.append(chunk)
+    return received
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(providers, "backoff_delay", lambda attempt: 0)
+
+
+async def test_streams_data_lines_until_done():
+    upstream = Upstream(sse("a", "b", "c"))
+    assert await collect(make_provider(upstream)) == ["a", "b", "c"]
+    assert upstream.requests == 1
+
+
+async def test_body_is_read_to_the_end_after_done():
+    # a half-read body cannot go back to the connection pool
+    upstream = Upstream((200, [(FAST, b"data: a\n\n"), (FAST, b"data: [DONE]\n\n"), (FAST, b"\n")]))
+    assert await collect(make_provider(upstream)) == ["a"]
+    assert upstream.bodies[0].finished
+
+
+async def test_first_token_timeout_is_retried_then_fails():
+    upstream = Upstream(sse("late", delay=SLOW))
+    provider = make_provider(upstream, retries=1)
+    with pytest.raises(AIUpstreamError, match="first token deadline exceeded"):
+        await collect(provider)
+    assert upstream.requests == 2
+    assert provider.timeouts == 2
+
+
+async def test_keepalives_do_not_extend_the_first_token_deadline():
+    upstream = Upstream((200, [(DEADLINE / 2, b"\n")] * 4 + [(FAST, b"data: a\n\n")]))
+    with pytest.raises(AIUpstreamError, match="first token deadline exceeded"):
+        await collect(make_provider(upstream, retries=0))
+
+
+async def test_idle_timeout_after_first_chunk_is_not_replayed():
+    upstream = Upstream((200, [(FAST, b"data: a\n\n"), (SLOW, b"data: b\n\n")]))
+    provider = make_provider(upstream)
+    received = []
+    with pytest.raises(AIUpstreamError, match="interrupted: idle deadline exceeded"):
+        await collect(provider, received)
+    assert received == ["a"]
+    assert upstream.requests == 1
+
+
+async def test_idle_deadline_holds_when_the_first_chunk_is_pulled_from_another_task():
+    upstream = Upstream((200, [(FAST, b"data: a\n\n"), (SLOW, b"data: b\n\n")]))
+    stream = make_provider(upstream).stream("prompt")
+    assert await asyncio.ensure_future(anext(stream)) == "a"
+    with pytest.raises(AIUpstreamError, match="idle deadline exceeded"):
+        await anext(stream)
+
+
+async def test_slow_consumer_does_not_trip_the_idle_deadline():
+    upstream = Upstream(sse("a", "b", "c"))
+    stream = make_provider(upstream).stream("prompt")
+    # the router pulls the first chunk from a separate task
+    received = [await asyncio.ensure_future(anext(stream))]
+    async for chunk in stream:
+        await asyncio.sleep(SLOW)
+        received.append(chunk)
+    assert received == ["a", "b", "c"]
+
+
+async def test_failures_before_the_first_chunk_are_retried():
+    upstream = Upstream((503, []), httpx.ConnectError("refused"), sse("a", "b"))
+    provider = make_provider(upstream, retries=2)
+    assert await collect(provider) == ["a", "b"]
+    assert upstream.requests == 3
+    assert provider.retried == 2
+
+
+async def test_failure_after_the_first_chunk_is_not_replayed():
+    upstream = Upstream((200, [(FAST, b"data: a\n\n"), (FAST, httpx.ReadError("reset"))]), sse("again"))
+    received = []
+    with pytest.raises(AIUpstreamError, match="interrupted"):
+        await collect(make_provider(upstream), received)
+    assert received == ["a"]
+    assert upstream.requests == 1
+
+
+async def test_client_errors_are_not_retried():
+    upstream = Upstream((400, []))
+    with pytest.raises(AIUpstreamError, match="rejected the request \\(400\\)"):
+        await collect(make_provider(upstream))
+    assert upstream.requests == 1
+
+
+def failing_breaker() -> CircuitBreaker:
+    return CircuitBreaker(window=4, min_requests=2, error_rate=0.5, cooldown=DEADLINE)
+
+
+async def test_breaker_opens_and_fails_fast():
+    upstream = Upstream((503, []))
+    provider = make_provider(upstream, retries=0, breaker=failing_breaker())
+    for _ in range(2):
+        with pytest.raises(AIUpstreamError, match="unavailable: status 503"):
+            await collect(provider)
+    assert provider.breaker.state == "open"
+
+    with pytest.raises(AIUpstreamError) as exc:
+        await collect(provider)
+    assert exc.value.retry_after is not None
+    assert upstream.requests == 2
+
+
+async def test_half_open_trial_success_closes_the_breaker():
+    upstream = Upstream((503, []), (503, []), sse("a"))
+    provider = make_provider(upstream, retries=0, breaker=failing_breaker())
+    for _ in range(2):
+        with pytest.raises(AIUpstreamError):
+            await collect(provider)
+    await asyncio.sleep(DEADLINE)
+    assert provider.breaker.state == "half_open"
+
+    assert await collect(provider) == ["a"]
+    assert provider.breaker.state == "closed"
+
+
+async def test_half_open_lets_one_trial_through_and_reopens_on_failure():
+    upstream = Upstream((503, []), (503, []), (503, [(SLOW, b"")]))
+    provider = make_provider(upstream, retries=0, breaker=failing_breaker())
+    for _ in range(2):
+        with pytest.raises(AIUpstreamError):
+            await collect(provider)
+    await asyncio.sleep(DEADLINE)
+
+    trial = asyncio.ensure_future(collect(provider))
+    await asyncio.sleep(0)
+    # a second call during the trial is short-circuited without a request
+    with pytest.raises(AIUpstreamError) as exc:
+        await collect(provider)
+    assert exc.value.retry_after is not None
+    with pytest.raises(AIUpstreamError, match="status 503"):
+        await trial
+    assert upstream.requests == 3
+    assert provider.breaker.state == "open"
+
+
+async def half_open_with_stale_call() -> tuple[CircuitBreaker, object | None, object]:
+    """
+    A breaker in half-open with its trial running, and the token of a call
+    that started while it was still closed.
+    """
+    breaker = failing_breaker()
+    stale = breaker.check()
+    breaker.record(False)
+    breaker.record(False)
+    await asyncio.sleep(DEADLINE)
+    trial = breaker.check()
+    assert trial is not None
+    return breaker, stale, trial
+
+
+async def test_abandoned_stale_call_does_not_let_a_second_trial_in():
+    breaker, stale, trial = await half_open_with_stale_call()
+    breaker.abandon(stale)
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    breaker.abandon(trial)
+    assert breaker.check() is not None
+
+
+async def test_stale_call_outcome_does_not_decide_the_trial():
+    breaker, stale, trial = await half_open_with_stale_call()
+    breaker.record(True, stale)
+    breaker.record(False, stale)
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    breaker.record(False, trial)
+    assert breaker.state == "open"
+
+
+# --- routing across providers (AIService) ----------------------------------
+
+class FixedPrompt:
+    def build(self, *args) -> str:
+        return "prompt"
+
+
+def make_service(*provider_list: AIProvider, hedge: bool = False) -> AIService:
+    return AIService(providers=list(provider_list), prompt_builder=FixedPrompt(), hedge=hedge, hedge_min_delay=DEADLINE / 2)
+
+
+async def ask(service: AIService) -> list[str]:
+    return [chunk async for chunk in service.stream_chat_response(None, [])]
+
+
+async def test_providers_are_tried_fastest_first():
+    slow, fast = Upstream(sse("slow")), Upstream(sse("fast"))
+    service = make_service(make_provider(slow, name="slow"), make_provider(fast, name="fast"))
+    service.providers[0].ttft.record(0.5)
+    service.providers[1].ttft.record(0.01)
+
+    assert await ask(service) == ["fast"]
+    assert (slow.requests, fast.requests) == (0, 1)
+
+
+async def test_failure_before_the_first_chunk_fails_over_to_the_next_provider():
+    broken, healthy = Upstream((500, [])), Upstream(sse("a"))
+    service = make_service(make_provider(broken, retries=0, name="broken"), make_provider(healthy, name="healthy"))
+
+    assert await ask(service) == ["a"]
+    assert service.failovers == 1
+
+
+async def test_provider_that_never_answers_drops_behind_measured_ones():
+    broken, healthy = Upstream((500, [])), Upstream(sse("a"))
+    service = make_service(make_provider(broken, retries=0, name="broken"), make_provider(healthy, name="healthy"))
+    await ask(service)
+
+    # unmeasured providers go first once; the failure then counts as a slow sample
+    assert [p.name for p in service.ranked()] == ["healthy", "broken"]
+    await ask(service)
+    assert broken.requests == 1
+
+
+async def test_hedge_wins_and_the_slow_primary_is_cancelled():
+    slow, fast = Upstream(sse("slow", delay=DEADLINE * 0.9)), Upstream(sse("fast"))
+    service = make_service(make_provider(slow, name="slow"), make_provider(fast, name="fast"), hedge=True)
+
+    assert await ask(service) == ["fast"]
+    assert (service.hedged, service.hedge_wins) == (1, 1)
+    # the loser's upstream response was closed before it sent anything
+    assert slow.bodies[0].closed and not slow.bodies[0].finished
+
+
+async def test_no_hedge_when_the_primary_answers_in_time():
+    primary, secondary = Upstream(sse("a")), Upstream(sse("b"))
+    service = make_service(make_provider(primary, name="primary"), make_provider(secondary, name="secondary"), hedge=True)
+
+    assert await ask(service) == ["a"]
+    assert service.hedged == 0
+    assert secondary.requests == 0
+
+
+async def test_hedged_primary_failing_hands_over_to_the_secondary():
+    broken, healthy = Upstream((500, [])), Upstream(sse("a", delay=DEADLINE / 4))
+    service = make_service(make_provider(broken, retries=0, name="broken"), make_provider(healthy, name="healthy"), hedge=True)
+
+    assert await ask(service) == ["a"]
+    assert service.hedged == 0
+    assert service.failovers == 1
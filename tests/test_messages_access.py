@@ -0,0 +1,67 @@
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from seedx_support_backend.infrastructure.database import get_async_db, get_db
+from seedx_support_backend.messages import resource
+from seedx_support_backend.messages.service import AsyncMessageService, MessageService
+from src.middleware import get_current_user
+
+CALLER = SimpleNamespace(id=uuid.uuid4())
+OWNER = uuid.uuid4()
+
+
+class Result:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class OtherUsersTicket:
+    """
+    Session stub: every ticket belongs to OWNER, and nothing else is queried.
+    """
+    def execute(self, stmt):
+        return Result(SimpleNamespace(user_id=OWNER, updated_at=None))
+
+
+class AsyncOtherUsersTicket(OtherUsersTicket):
+    async def execute(self, stmt):
+        return super().execute(stmt)
+
+
+def make_app(router, db_dependency, session) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_user] = lambda: CALLER
+    app.dependency_overrides[db_dependency] = lambda: session
+    return app
+
+
+@pytest.fixture(autouse=True)
+def no_inserts(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("message inserted into another user's ticket")
+    for svc in (MessageService, AsyncMessageService):
+        monkeypatch.setattr(svc, "add_message", fail)
+        monkeypatch.setattr(svc, "add_messages", fail)
+
+
+@pytest.mark.parametrize("router, db_dependency, session", [
+    (resource.router, get_db, OtherUsersTicket()),
+    (resource.async_router, get_async_db, AsyncOtherUsersTicket()),
+], ids=["sync", "async"])
+@pytest.mark.parametrize("path, body", [
+    ("", {"content": "hello"}),
+    (":batch", [{"content": "hello"}]),
+], ids=["single", "batch"])
+async def test_posting_to_another_users_ticket_is_forbidden(router, db_dependency, session, path, body):
+    transport = httpx.ASGITransport(app=make_app(router, db_dependency, session))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(f"/tickets/{uuid.uuid4()}/messages{path}", json=body)
+    assert response.status_code == 403
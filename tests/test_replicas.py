@@ -0,0 +1,72 @@
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI, Request
+
+from seedx_support_backend.infrastructure import replicas
+from seedx_support_backend.infrastructure.replicas import WRITE_COOKIE, RecentWrites, pick_replica, recent_writes, replica_set
+from seedx_support_backend.users.auth import create_access_token
+from seedx_support_backend.users.cache import user_cache
+from seedx_support_backend.users.core import Role, UserPublic
+from src.middleware import AuthMiddleware
+
+USER = uuid.uuid4()
+
+
+def cookie_value(header: str) -> str:
+    return header.split(";", 1)[0].removeprefix(f"{WRITE_COOKIE}=")
+
+
+def test_cookie_opens_the_window_on_another_worker():
+    cookie = cookie_value(RecentWrites(5, "secret").cookie(USER))
+    other_worker = RecentWrites(5, "secret")
+    assert not other_worker.active(USER)
+    assert other_worker.active(USER, cookie)
+
+
+def test_cookie_is_rejected_when_tampered_with_or_for_another_user():
+    writes = RecentWrites(5, "secret")
+    user, until, signature = cookie_value(writes.cookie(USER)).split(".")
+    assert not writes.active(USER, f"{user}.{int(until) + 3600}.{signature}")
+    assert not writes.active(uuid.uuid4(), f"{user}.{until}.{signature}")
+    assert not RecentWrites(5, "other secret").active(USER, f"{user}.{until}.{signature}")
+    assert not writes.active(USER, "garbage")
+
+
+def test_cookie_expires_with_the_window(monkeypatch):
+    writes = RecentWrites(5, "secret")
+    cookie = cookie_value(writes.cookie(USER))
+    later = time.time() + 10
+    monkeypatch.setattr(replicas.time, "time", lambda: later)
+    assert not writes.active(USER, cookie)
+
+
+async def test_reads_after_a_write_stay_on_the_primary_across_workers(monkeypatch):
+    now = datetime.now(timezone.utc)
+    user_cache.put(USER, UserPublic(name="u", email="u@example.com", id=USER, role=Role.USER, created_at=now, updated_at=now))
+    routed = []
+    app = FastAPI()
+
+    @app.post("/write")
+    def write():
+        return {}
+
+    @app.get("/read")
+    def read(request: Request):
+        routed.append(pick_replica(request))
+        return {}
+
+    app.add_middleware(AuthMiddleware)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(USER)})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/write", headers=headers)
+        assert WRITE_COOKIE in response.cookies
+        # the next read lands on a worker that never saw the write
+        monkeypatch.setattr(recent_writes, "_until", type(recent_writes._until)())
+        before = replica_set.read_your_writes
+        await client.get("/read", headers=headers)
+    assert routed == [None]
+    assert replica_set.read_your_writes == before + 1